@@ -0,0 +1,217 @@
+# Python libraries
+import json
+import os
+import threading
+from collections import OrderedDict
+# External modules
+from PIL import Image, ImageFont
+# Typing
+from typing import Dict, Hashable, Tuple, Union
+
+class AssetManager:
+    """Loads the static assets (markers, ribbons, logo and fonts) for all
+    modules of the program.
+
+    Every image is decoded once, when it is used for the first time. Derived
+    variants, i.e. resized images and fonts at a certain size, are kept in a
+    bounded least recently used cache. Hits and misses of both are counted.
+    Stages running in parallel threads may use the manager at the same time.
+    The assets are never changed, so processes forked from a warmed up parent
+    (see `warm_up`) share them copy-on-write instead of decoding them again.
+
+    Args:
+    -----
+        config_path (str, optional): Path to the configuration. Defaults to 'config.json'.
+        max_variants (int, optional): The maximum number of cached variants. Defaults to 256.
+    """
+
+    __shared: Dict[str, 'AssetManager'] = {}
+    __directories = {
+        'markers': os.path.join('data', 'img'),
+        'fonts': os.path.join('data', 'fonts'),
+        'assets': 'data'
+    }
+
+    def __init__(self, config_path: str = 'config.json', max_variants: int = 256):
+        with open(config_path, 'r') as config_file:
+            config = json.load(config_file)
+        self.__config = {section: config.get(section, {}) for section in self.__directories}
+        self.max_variants = max_variants
+        self.__images: Dict[str, Image.Image] = {}
+        self.__sizes: Dict[str, Tuple[int, int]] = {}
+        self.__variants: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.RLock()
+
+
+    @classmethod
+    def shared(cls, config_path: str = 'config.json') -> 'AssetManager':
+        """Returns the asset manager which is shared within the process.
+
+        Args:
+        -----
+            config_path (str, optional): Path to the configuration. Defaults to 'config.json'.
+
+        Returns:
+        --------
+            AssetManager: The asset manager.
+        """
+        if config_path not in cls.__shared:
+            cls.__shared[config_path] = cls(config_path)
+
+        return cls.__shared[config_path]
+
+
+    def resolve(self, section: str, name: str) -> str:
+        """Resolves the name of an asset configured in `config.json`.
+
+        Args:
+        -----
+            section (str): 'markers', 'fonts' or 'assets'.
+            name (str): The key of the asset in the section.
+
+        Raises:
+        -------
+            KeyError: If the asset is not configured.
+
+        Returns:
+        --------
+            str: The path to the asset.
+        """
+        return os.path.join(self.__directories[section], self.__config[section][name])
+
+
+    def image(self, path: str) -> Image.Image:
+        """Returns the decoded image. It is shared, so it must not be changed.
+
+        Args:
+        -----
+            path (str): Path to the image.
+
+        Returns:
+        --------
+            Image.Image: The image.
+        """
+        with self.__lock:
+            img = self.__images.get(path)
+            if img is not None:
+                self.hits += 1
+                return img
+
+            self.misses += 1
+            img = Image.open(path)
+            img.load()
+            self.__images[path] = img
+            self.__sizes[path] = img.size
+
+            return img
+
+
+    def warm_up(self) -> None:
+        """Decodes the configured markers, the ribbons and the logo up front."""
+        paths = [self.resolve('markers', name) for name in self.__config['markers'] if name != 'heraldry']
+        ribbon_path = self.resolve('assets', 'ribbons')
+        paths += [os.path.join(ribbon_path, file_name) for file_name in sorted(os.listdir(ribbon_path))]
+        paths.append(self.resolve('assets', 'logo'))
+        for path in paths:
+            self.image(path)
+
+
+    def size(self, path: str) -> Tuple[int, int]:
+        """Returns the size of an image without decoding it.
+
+        Args:
+        -----
+            path (str): Path to the image.
+
+        Returns:
+        --------
+            Tuple[int, int]: Width and height.
+        """
+        with self.__lock:
+            if path not in self.__sizes:
+                with Image.open(path) as img:
+                    self.__sizes[path] = img.size
+
+            return self.__sizes[path]
+
+
+    def resized(self, path: str, size: Tuple[int, int]) -> Image.Image:
+        """Returns the image resized to the size. It is shared, so it must not
+        be changed. JPEGs which are not decoded yet are decoded at a fraction
+        of their size, if that suffices.
+
+        Args:
+        -----
+            path (str): Path to the image.
+            size (Tuple[int, int]): Width and height.
+
+        Returns:
+        --------
+            Image.Image: The resized image.
+        """
+        def create_resized() -> Image.Image:
+            if path in self.__images:
+                return self.__images[path].resize(size)
+            with Image.open(path) as img:
+                img.draft(img.mode, size)
+                return img.resize(size)
+
+        return self.__variant(('resized', path, tuple(size)), create_resized)
+
+
+    def font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        """Returns the font at the size.
+
+        Args:
+        -----
+            path (str): Path to the truetype font.
+            size (int): The size of the font.
+
+        Returns:
+        --------
+            ImageFont.FreeTypeFont: The font.
+        """
+        return self.__variant(('font', path, size), lambda: ImageFont.truetype(path, size))
+
+
+    def report(self) -> str:
+        """Describes the use of the caches.
+
+        Returns:
+        --------
+            str: The description.
+        """
+        return (
+            f'Assets: {len(self.__images)} images decoded, {len(self.__variants)} variants cached, '
+            f'{self.hits} hits, {self.misses} misses.'
+        )
+
+
+    def __variant(self, key: Hashable, create) -> Union[Image.Image, ImageFont.FreeTypeFont]:
+        """Returns a cached variant or creates it, evicting the least recently
+        used variant if the cache is full.
+
+        Args:
+        -----
+            key (Hashable): Identifies the variant.
+            create (Callable): Creates the variant.
+
+        Returns:
+        --------
+            Union[Image.Image, ImageFont.FreeTypeFont]: The variant.
+        """
+        with self.__lock:
+            if key in self.__variants:
+                self.hits += 1
+                self.__variants.move_to_end(key)
+                return self.__variants[key]
+
+            self.misses += 1
+            variant = create()
+            self.__variants[key] = variant
+            if len(self.__variants) > self.max_variants:
+                self.__variants.popitem(last = False)
+
+            return variant
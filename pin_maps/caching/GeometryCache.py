@@ -0,0 +1,154 @@
+# Python libraries
+import math
+import os
+# External modules
+import cartopy.io.shapereader as shpreader
+import numpy as np
+from shapely.geometry import MultiPolygon, Polygon
+from shapely.geometry.polygon import orient
+# Typing
+from typing import List, Tuple, Union
+
+class GeometryCache:
+    """Converts shapefiles once into simplified NumPy coordinate arrays, which
+    are memory-mapped when they are loaded.
+
+    Parsing a shapefile with several hundred thousand points takes more than
+    a second, although a poster only shows a fraction of these details. For
+    every level of detail, the rings of the polygons are therefore simplified
+    to the size of half a pixel and stored as three arrays: the coordinates of
+    all rings, the start and end of every ring and the bounding box of every
+    ring. Exterior rings run counterclockwise and holes clockwise, such that
+    all rings can be drawn as one path.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the cached arrays. Defaults to 'data/geometry-cache'.
+        shapefile_directory (str, optional): The directory of the shapefiles. Defaults to 'data/shapefiles'.
+    """
+
+    __array_names = ['coords', 'rings', 'bboxes']
+
+    def __init__(
+        self,
+        directory: str = os.path.join('data', 'geometry-cache'),
+        shapefile_directory: str = os.path.join('data', 'shapefiles')
+    ):
+        self.directory = directory
+        self.shapefile_directory = shapefile_directory
+        os.makedirs(self.directory, exist_ok = True)
+
+
+    @staticmethod
+    def detail_level(extent: List[float], width_px: int) -> int:
+        """Finds the level of detail at which the simplification stays below
+        half a pixel. Level `n` simplifies to 2^-n degrees.
+
+        Args:
+        -----
+            extent (List[float]): The extent drawn (west, east, south, north).
+            width_px (int): The width in pixels of the drawn extent.
+
+        Returns:
+        --------
+            int: The level of detail.
+        """
+        half_px_degrees = (extent[1] - extent[0]) / width_px / 2
+        return max(0, math.ceil(math.log2(1 / half_px_degrees)))
+
+
+    def load(
+        self,
+        shapefile_name: str,
+        level: int,
+        extent: Union[None, List[float]] = None
+    ) -> List[np.ndarray]:
+        """Loads the rings of a shapefile, converting it on first use.
+
+        Args:
+        -----
+            shapefile_name (str): Name of the shapefile.
+            level (int): The level of detail, see `detail_level`.
+            extent (Union[None, List[float]], optional): Only rings overlapping
+            the extent (west, east, south, north) are returned. Defaults to None.
+
+        Returns:
+        --------
+            List[np.ndarray]: The rings, each an array of (longitude, latitude)
+            points, read-only views into the memory-mapped coordinates.
+        """
+        paths = self.__paths(shapefile_name, level)
+        shapefile_mtime = os.path.getmtime(os.path.join(self.shapefile_directory, shapefile_name))
+        if not os.path.exists(paths[0]) or os.path.getmtime(paths[0]) < shapefile_mtime:
+            self.__convert(shapefile_name, level)
+        coords, rings, bboxes = [np.load(path, mmap_mode = 'r') for path in paths]
+
+        if extent is not None:
+            west, east, south, north = extent
+            overlapping = (
+                (bboxes[:, 0] <= east) & (bboxes[:, 2] >= west) &
+                (bboxes[:, 1] <= north) & (bboxes[:, 3] >= south)
+            )
+            rings = rings[overlapping]
+
+        return [coords[start:end] for start, end in rings]
+
+
+    def __convert(self, shapefile_name: str, level: int) -> None:
+        """Simplifies the polygons of a shapefile and stores them as arrays.
+
+        Args:
+        -----
+            shapefile_name (str): Name of the shapefile.
+            level (int): The level of detail.
+        """
+        tolerance = 2.0 ** -level
+        ring_coords = []
+        reader = shpreader.Reader(os.path.join(self.shapefile_directory, shapefile_name))
+        for geometry in reader.geometries():
+            polygons = geometry.geoms if isinstance(geometry, MultiPolygon) else [geometry]
+            for polygon in polygons:
+                # Collapsed polygons are empty after the simplification.
+                polygon = polygon.simplify(tolerance, preserve_topology = True)
+                if polygon.is_empty or not isinstance(polygon, Polygon):
+                    continue
+                polygon = orient(polygon, sign = 1.0)
+                ring_coords.append(np.asarray(polygon.exterior.coords)[:, :2])
+                ring_coords.extend(np.asarray(interior.coords)[:, :2] for interior in polygon.interiors)
+        reader.close()
+
+        ring_lengths = np.array([len(coords) for coords in ring_coords], dtype = np.int64)
+        ring_ends = np.cumsum(ring_lengths)
+        arrays = [
+            np.concatenate(ring_coords) if ring_coords else np.empty((0, 2)),
+            np.stack([ring_ends - ring_lengths, ring_ends], axis = 1),
+            np.array([
+                (*coords.min(axis = 0), *coords.max(axis = 0)) for coords in ring_coords
+            ]).reshape(-1, 4) # (west, south, east, north)
+        ]
+
+        # Arrays are replaced atomically, the coordinates last, such that they
+        # only exist once the other arrays are complete.
+        for path, array in reversed(list(zip(self.__paths(shapefile_name, level), arrays))):
+            partial_path = f'{path}.{os.getpid()}.part'
+            with open(partial_path, 'wb') as array_file:
+                np.save(array_file, array)
+            os.replace(partial_path, path)
+
+
+    def __paths(self, shapefile_name: str, level: int) -> Tuple[str, str, str]:
+        """The paths of the arrays of a shapefile at a level of detail.
+
+        Args:
+        -----
+            shapefile_name (str): Name of the shapefile.
+            level (int): The level of detail.
+
+        Returns:
+        --------
+            Tuple[str, str, str]: Paths of coordinates, rings and bounding boxes.
+        """
+        name = os.path.splitext(shapefile_name)[0]
+        return tuple(
+            os.path.join(self.directory, f'{name}-{level}-{array_name}.npy') for array_name in self.__array_names
+        )
@@ -0,0 +1,262 @@
+# Python libraries
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+# Internal modules
+from heraldry_transforms.Normalization import Normalization
+# External modules
+from PIL import Image
+# Typing
+from typing import Dict, Tuple, Union
+
+class HeraldryStore:
+    """Stores the coats of arms in one SQLite database.
+
+    New coats are ingested in a canonical form (see `Normalization`): without
+    background, cut to their content and at most `canonical_width` pixels wide.
+    Their size before the normalization is kept with them. Coats stored by
+    older versions are normalized by `migrate` (see also `import_heraldry.py`).
+
+    The pixels are stored zlib compressed without any PNG filtering, which
+    decodes faster than the PNG files of the former pin cache. The names and
+    digests of all coats are held in memory, so membership tests and
+    fingerprints do not touch the disk. Reads use SQLite's memory mapping.
+    Concurrent workers may insert at the same time: the database runs in WAL
+    mode and every insert is a single transaction. Threads of one process
+    share the connection, one at a time.
+
+    If the database does not exist yet, the coats of the former pin cache
+    directory are imported (see also `import_heraldry.py`).
+
+    Args:
+    -----
+        path (str, optional): Path to the database. Defaults to 'data/heraldry.sqlite'.
+        import_dir (Union[None, str], optional): Directory of `<name>-pin.png` files
+        imported into a new database. Defaults to 'data/img/pin-cache'.
+        canonical_width (int, optional): The width coats are scaled down to when they are ingested. Defaults to 440.
+    """
+
+    __shared: Dict[str, 'HeraldryStore'] = {}
+    __mmap_bytes = 2 ** 28
+    __storable_modes = ['L', 'LA', 'RGB', 'RGBA']
+
+    def __init__(
+        self,
+        path: str = os.path.join('data', 'heraldry.sqlite'),
+        import_dir: Union[None, str] = os.path.join('data', 'img', 'pin-cache'),
+        canonical_width: int = 440
+    ):
+        self.path = path
+        self.normalization = Normalization(canonical_width)
+        is_new = not os.path.exists(path)
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(path, timeout = 30, isolation_level = None, check_same_thread = False)
+        self.__connection.execute('PRAGMA journal_mode = WAL')
+        self.__connection.execute(f'PRAGMA mmap_size = {self.__mmap_bytes}')
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS coats ('
+            'name TEXT PRIMARY KEY, mode TEXT, width INTEGER, height INTEGER, digest TEXT, pixels BLOB, '
+            'source_width INTEGER, source_height INTEGER, normalized INTEGER DEFAULT 0)'
+        )
+        self.__add_missing_columns()
+        self.__pid = os.getpid()
+        self.__digests = dict(self.__connection.execute('SELECT name, digest FROM coats'))
+
+        if is_new and import_dir is not None and os.path.isdir(import_dir):
+            self.import_dir(import_dir)
+
+
+    @classmethod
+    def shared(cls, path: str = os.path.join('data', 'heraldry.sqlite')) -> 'HeraldryStore':
+        """Returns the store of the path which is shared within the process.
+
+        Args:
+        -----
+            path (str, optional): Path to the database. Defaults to 'data/heraldry.sqlite'.
+
+        Returns:
+        --------
+            HeraldryStore: The store.
+        """
+        store = cls.__shared.get(path)
+        # A forked worker must not use the connection of its parent.
+        if store is None or store.__pid != os.getpid():
+            store = cls(path)
+            cls.__shared[path] = store
+
+        return store
+
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.__digests
+
+
+    def __len__(self) -> int:
+        return len(self.__digests)
+
+
+    def get(self, name: str) -> Image.Image:
+        """Loads a coat of arms.
+
+        Args:
+        -----
+            name (str): The name of the town.
+
+        Raises:
+        -------
+            LookupError: If the coat is not stored.
+
+        Returns:
+        --------
+            Image.Image: The coat of arms.
+        """
+        name = name.lower()
+        # Coats inserted by other processes are not in the index yet.
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT mode, width, height, digest, pixels FROM coats WHERE name = ?', (name, )
+            ).fetchone()
+        if row is None:
+            raise LookupError(f'{name} is not yet cached.')
+        mode, width, height, digest, pixels = row
+        self.__digests[name] = digest
+
+        return Image.frombytes(mode, (width, height), zlib.decompress(pixels))
+
+
+    def put(self, name: str, coat: Image.Image, source_size: Union[None, Tuple[int, int]] = None) -> None:
+        """Stores a coat of arms as it is, replacing an older one of the same name.
+
+        Args:
+        -----
+            name (str): The name of the town.
+            coat (Image.Image): The coat of arms.
+            source_size (Union[None, Tuple[int, int]], optional): The size of the coat
+            before it was normalized. Defaults to None, i.e. the coat is not normalized.
+        """
+        name = name.lower()
+        if coat.mode not in self.__storable_modes:
+            coat = coat.convert('RGBA')
+        raw = coat.tobytes()
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+
+        source_width, source_height = (None, None) if source_size is None else source_size
+        pixels = zlib.compress(raw, 6)
+        with self.__lock:
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO coats '
+                '(name, mode, width, height, digest, pixels, source_width, source_height, normalized) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    name, coat.mode, coat.width, coat.height, digest, pixels,
+                    source_width, source_height, int(source_size is not None)
+                )
+            )
+            self.__digests[name] = digest
+
+
+    def ingest(self, name: str, coat: Image.Image) -> Image.Image:
+        """Normalizes a new coat of arms and stores it.
+
+        Args:
+        -----
+            name (str): The name of the town.
+            coat (Image.Image): The coat of arms as downloaded.
+
+        Returns:
+        --------
+            Image.Image: The normalized coat of arms.
+        """
+        normalized_coat = self.normalization(coat)
+        self.put(name, normalized_coat, coat.size)
+
+        return normalized_coat
+
+
+    def fingerprint(self, name: str) -> str:
+        """Identifies the version of a stored coat of arms.
+
+        Args:
+        -----
+            name (str): The name of the town.
+
+        Returns:
+        --------
+            str: The fingerprint, 'missing' if the coat is not stored.
+        """
+        name = name.lower()
+        return f'{name}:{self.__digests.get(name, "missing")}'
+
+
+    def import_dir(self, directory: str) -> int:
+        """Ingests all `<name>-pin.png` files of a directory.
+
+        Args:
+        -----
+            directory (str): The directory, e.g. the former pin cache.
+
+        Returns:
+        --------
+            int: The number of imported coats.
+        """
+        suffix = '-pin.png'
+        imported = 0
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                for file_name in sorted(os.listdir(directory)):
+                    if not file_name.endswith(suffix):
+                        continue
+                    with Image.open(os.path.join(directory, file_name)) as coat:
+                        coat.load()
+                        self.ingest(file_name[:-len(suffix)], coat)
+                    imported += 1
+            except BaseException:
+                self.__rollback()
+                raise
+            self.__connection.execute('COMMIT')
+
+        return imported
+
+
+    def migrate(self) -> int:
+        """Normalizes the coats which were stored before coats were normalized on ingest.
+
+        Returns:
+        --------
+            int: The number of normalized coats.
+        """
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                names = [name for name, in self.__connection.execute('SELECT name FROM coats WHERE NOT normalized')]
+                for name in names:
+                    self.ingest(name, self.get(name))
+            except BaseException:
+                self.__rollback()
+                raise
+            self.__connection.execute('COMMIT')
+
+        return len(names)
+
+
+    def __add_missing_columns(self) -> None:
+        """Adds the columns of the metadata to databases of older versions."""
+        columns = {row[1] for row in self.__connection.execute('PRAGMA table_info(coats)')}
+        for column, column_type in [
+            ('source_width', 'INTEGER'), ('source_height', 'INTEGER'), ('normalized', 'INTEGER DEFAULT 0')
+        ]:
+            if column in columns:
+                continue
+            try:
+                self.__connection.execute(f'ALTER TABLE coats ADD COLUMN {column} {column_type}')
+            except sqlite3.OperationalError:
+                pass # Added by a concurrent process.
+
+
+    def __rollback(self) -> None:
+        """Rolls a failed transaction back and forgets its coats."""
+        self.__connection.execute('ROLLBACK')
+        self.__digests = dict(self.__connection.execute('SELECT name, digest FROM coats'))
@@ -0,0 +1,127 @@
+# Python libraries
+import csv
+import io
+import os
+import time
+import uuid
+# Typing
+from typing import Dict, Tuple, Union
+
+class NegativeCache:
+    """Remembers towns which could not be resolved to coordinates or have no
+    coat of arms, such that later runs skip them at once instead of asking
+    Nominatim and Wikipedia again. Network errors are not remembered.
+
+    Every failure is appended as a row of kind, name, reason and time to a CSV
+    file shared by all runs. A failure is forgotten after `ttl_seconds`, since
+    the town may have been added to the sources meanwhile; with a TTL of zero
+    every failure is tried again, but still recorded.
+
+    The file is read once per instance. If at least `compaction_share` of its
+    rows are expired or superseded by a later failure of the same town, it is
+    rewritten without them. A failure which another run records meanwhile may
+    get lost, which only means that its town is asked again.
+
+    Args:
+    -----
+        path (str, optional): The path of the file. Defaults to 'data/failure-cache.csv'.
+        ttl_seconds (float, optional): How long failures are remembered. Defaults to one week.
+    """
+
+    compaction_share = 0.5
+
+    def __init__(self, path: str = os.path.join('data', 'failure-cache.csv'), ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # The last failure by kind and lower case name, read at the first lookup.
+        self.__failures: Union[None, Dict[Tuple[str, str], Tuple[str, float]]] = None
+
+
+    def lookup(self, kind: str, name: str) -> Union[Tuple[str, float], None]:
+        """Returns the last failure of a town which is not yet expired.
+
+        Args:
+        -----
+            kind (str): What failed, e.g. 'coordinates' or 'heraldry'.
+            name (str): The name of the town.
+
+        Returns:
+        --------
+            Union[Tuple[str, float], None]: The reason and time of the failure or None.
+        """
+        if self.ttl_seconds <= 0:
+            return None
+
+        failure = self.__load().get((kind, name.lower()))
+        if failure is None or time.time() - failure[1] > self.ttl_seconds:
+            return None
+        return failure
+
+
+    def record(self, kind: str, name: str, reason: str) -> None:
+        """Remembers a failure.
+
+        Args:
+        -----
+            kind (str): What failed, e.g. 'coordinates' or 'heraldry'.
+            name (str): The name of the town.
+            reason (str): Why it failed.
+        """
+        failed_at = time.time()
+        row = io.StringIO()
+        csv.writer(row).writerow([kind, name.lower(), reason, str(failed_at)])
+        # One write in append mode, such that rows of concurrent workers do not interleave.
+        cache_fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(cache_fd, row.getvalue().encode('utf-8'))
+        finally:
+            os.close(cache_fd)
+        if self.__failures is not None:
+            self.__failures[(kind, name.lower())] = (reason, failed_at)
+
+
+    def __load(self) -> Dict[Tuple[str, str], Tuple[str, float]]:
+        """Reads the failures which are not expired and compacts the file if
+        most of its rows are not needed anymore.
+
+        Returns:
+        --------
+            Dict[Tuple[str, str], Tuple[str, float]]: Reason and time of the last failure by kind and name.
+        """
+        if self.__failures is not None:
+            return self.__failures
+
+        failures = {}
+        row_count = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding = 'utf-8', newline = '') as cache_file:
+                for row in csv.reader(cache_file):
+                    # Skips a row which another worker is still appending.
+                    if len(row) != 4:
+                        continue
+                    try:
+                        failures[(row[0], row[1])] = (row[2], float(row[3]))
+                    except ValueError:
+                        continue
+                    row_count += 1
+
+        now = time.time()
+        self.__failures = {
+            key: failure for key, failure in failures.items() if now - failure[1] <= self.ttl_seconds
+        }
+        stale_count = row_count - len(self.__failures)
+        if stale_count > 0 and stale_count >= row_count * self.compaction_share:
+            self.__compact()
+
+        return self.__failures
+
+
+    def __compact(self) -> None:
+        """Rewrites the file atomically with one row per failure which is not expired."""
+        # Process IDs are not unique across the machines sharing the file.
+        partial_path = f'{self.path}.{uuid.uuid4().hex[:12]}.part'
+        with open(partial_path, 'w', encoding = 'utf-8', newline = '') as cache_file:
+            writer = csv.writer(cache_file)
+            for (kind, name), (reason, failed_at) in self.__failures.items():
+                writer.writerow([kind, name, reason, str(failed_at)])
+        os.replace(partial_path, self.path)
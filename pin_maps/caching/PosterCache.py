@@ -0,0 +1,135 @@
+# Python libraries
+import hashlib
+import json
+import os
+import shutil
+import uuid
+# Typing
+from typing import Any
+
+class PosterCache:
+    """Stores finished, encoded posters under a hash of everything they depend
+    on: the parameters of the poster and the versions of the code and assets.
+    A repeated order is copied from the cache instead of being rendered.
+
+    Posters are only stored after they were written completely, so failed or
+    partial renders never enter the cache. If the cache grows larger than
+    `max_mb`, the least recently used posters are deleted.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the cache. Defaults to 'data/poster-cache'.
+        max_mb (int, optional): The maximum size of the cache in megabytes. Defaults to 4096.
+        refresh (bool, optional): Ignores the cached posters but stores new ones. Defaults to False.
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'poster-cache'), max_mb: int = 4096, refresh: bool = False):
+        self.directory = directory
+        self.max_bytes = max_mb * 2 ** 20
+        self.refresh = refresh
+        os.makedirs(self.directory, exist_ok = True)
+
+
+    @staticmethod
+    def key(spec: Any) -> str:
+        """Hashes the canonical form of everything the poster depends on.
+
+        Args:
+        -----
+            spec (Any): JSON serializable parameters and versions of the poster.
+
+        Returns:
+        --------
+            str: The key of the poster.
+        """
+        serialized = json.dumps(spec, sort_keys = True, default = str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:32]
+
+
+    def load(self, key: str, path: str) -> bool:
+        """Copies a cached poster to the path. The file is replaced atomically,
+        so an interrupted copy never leaves a partial poster at the path.
+
+        Args:
+        -----
+            key (str): The key of the poster.
+            path (str): The path the poster is copied to.
+
+        Returns:
+        --------
+            bool: Whether the poster was cached.
+        """
+        if self.refresh:
+            return False
+
+        cached_path = self.__path(key, path)
+        # The output path may lie on a file system shared by the workers of several machines.
+        partial_path = f'{path}.{uuid.uuid4().hex[:12]}.part'
+        try:
+            shutil.copyfile(cached_path, partial_path)
+            # Marks the poster as recently used.
+            os.utime(cached_path)
+        except FileNotFoundError:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
+        os.replace(partial_path, path)
+
+        return True
+
+
+    def store(self, key: str, path: str) -> None:
+        """Stores a completely written poster. The file is replaced atomically,
+        so concurrent runs never see a partially copied poster.
+
+        Args:
+        -----
+            key (str): The key of the poster.
+            path (str): The path of the written poster.
+        """
+        cached_path = self.__path(key, path)
+        partial_path = f'{cached_path}.{os.getpid()}.part'
+        shutil.copyfile(path, partial_path)
+        os.replace(partial_path, cached_path)
+
+        self.__evict()
+
+
+    def __path(self, key: str, path: str) -> str:
+        """The path of a cached poster, which keeps the extension of the poster.
+
+        Args:
+        -----
+            key (str): The key of the poster.
+            path (str): The path of the poster.
+
+        Returns:
+        --------
+            str: The path in the cache.
+        """
+        return os.path.join(self.directory, key + os.path.splitext(path)[1])
+
+
+    def __evict(self) -> None:
+        """Deletes the least recently used posters while the cache is too large."""
+        posters = []
+        total_bytes = 0
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.part'):
+                continue
+            cached_path = os.path.join(self.directory, file_name)
+            try:
+                size = os.path.getsize(cached_path)
+                posters.append((os.path.getmtime(cached_path), size, cached_path))
+            except FileNotFoundError:
+                continue # Deleted by a concurrent run.
+            total_bytes += size
+
+        posters.sort()
+        while total_bytes > self.max_bytes and posters:
+            _, size, cached_path = posters.pop(0)
+            try:
+                os.remove(cached_path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
@@ -0,0 +1,197 @@
+# Python libraries
+import hashlib
+import json
+import os
+# External modules
+import numpy as np
+from PIL import Image
+# Typing
+from typing import Any, Dict, Tuple, Union
+
+class StageCache:
+    """Stores the results of pipeline stages on disk under a hash of their inputs.
+
+    A result consists of an optional image and JSON serializable data. The
+    inputs of a stage are hashed together with the keys of the stages it
+    depends on, so a changed input invalidates every later stage, while
+    unchanged branches are reused. Images are stored as uncompressed NumPy
+    arrays, which load much faster than PNGs. They are memory-mapped, so
+    processes rendering from the same results share their pages; an image is
+    only copied when it is changed. If the cache grows larger than `max_mb`,
+    the least recently used results are deleted.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the cache. Defaults to 'data/stage-cache'.
+        max_mb (int, optional): The maximum size of the cache in megabytes. Defaults to 2048.
+        version (str, optional): Version of the code, part of every key. Defaults to ''.
+        refresh (bool, optional): Ignores the cached results but stores new ones. Defaults to False.
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'stage-cache'), max_mb: int = 2048, version: str = '', refresh: bool = False):
+        self.directory = directory
+        self.max_bytes = max_mb * 2 ** 20
+        self.version = version
+        self.refresh = refresh
+        os.makedirs(self.directory, exist_ok = True)
+
+
+    def key(self, stage_name: str, inputs: Any) -> str:
+        """Hashes the inputs of a stage.
+
+        Args:
+        -----
+            stage_name (str): The name of the stage.
+            inputs (Any): JSON serializable inputs including the keys of earlier stages.
+
+        Returns:
+        --------
+            str: The key of the result.
+        """
+        serialized = json.dumps([self.version, stage_name, inputs], sort_keys = True, default = str)
+        return stage_name + '-' + hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:32]
+
+
+    def load(self, key: str) -> Union[Tuple[Union[Image.Image, None], Dict[str, Any]], None]:
+        """Loads a result.
+
+        Args:
+        -----
+            key (str): The key of the result.
+
+        Returns:
+        --------
+            Union[Tuple[Union[Image.Image, None], Dict[str, Any]], None]: The
+            image and the data or None, if the result is not cached.
+        """
+        if self.refresh:
+            return None
+
+        data_path, img_path = self.__paths(key)
+        try:
+            with open(data_path, 'r', encoding = 'utf-8') as data_file:
+                data = json.load(data_file)
+            img = None
+            if data.pop('__has_img'):
+                # Read-only images are copied by PIL before they are changed.
+                img = Image.fromarray(np.load(img_path, mmap_mode = 'r'))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+        # Marks the result as recently used.
+        os.utime(data_path)
+        return img, data
+
+
+    def store(self, key: str, img: Union[Image.Image, None], data: Union[Dict[str, Any], None] = None) -> None:
+        """Stores a result. Files are replaced atomically, so concurrent runs
+        never see partially written results.
+
+        Args:
+        -----
+            key (str): The key of the result.
+            img (Union[Image.Image, None]): The image of the result.
+            data (Union[Dict[str, Any], None], optional): Further data of the result. Defaults to None.
+        """
+        data_path, img_path = self.__paths(key)
+        data = {} if data is None else dict(data)
+        data['__has_img'] = img is not None
+
+        if img is not None:
+            partial_img_path = f'{img_path}.{os.getpid()}.part'
+            with open(partial_img_path, 'wb') as img_file:
+                np.save(img_file, np.asarray(img))
+            os.replace(partial_img_path, img_path)
+
+        # The data file is written last since it marks the result as complete.
+        partial_data_path = f'{data_path}.{os.getpid()}.part'
+        with open(partial_data_path, 'w', encoding = 'utf-8') as data_file:
+            json.dump(data, data_file)
+        os.replace(partial_data_path, data_path)
+
+        self.__evict()
+
+
+    @staticmethod
+    def file_fingerprint(path: str) -> str:
+        """Identifies the version of a file by its size and modification time.
+
+        Args:
+        -----
+            path (str): Path to the file.
+
+        Returns:
+        --------
+            str: The fingerprint, 'missing' if there is no such file.
+        """
+        try:
+            stat = os.stat(path)
+            return f'{path}:{stat.st_size}:{stat.st_mtime_ns}'
+        except FileNotFoundError:
+            return f'{path}:missing'
+
+
+    @staticmethod
+    def source_fingerprint(directory: str) -> str:
+        """Hashes all Python sources below the directory, such that changed code
+        invalidates the cached results.
+
+        Args:
+        -----
+            directory (str): The directory of the sources.
+
+        Returns:
+        --------
+            str: The hash.
+        """
+        source_hash = hashlib.sha256()
+        for root, dirs, files in sorted(os.walk(directory)):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith('.py'):
+                    with open(os.path.join(root, file_name), 'rb') as source_file:
+                        source_hash.update(source_file.read())
+
+        return source_hash.hexdigest()[:16]
+
+
+    def __paths(self, key: str) -> Tuple[str, str]:
+        """The paths of the data and the image of a result.
+
+        Args:
+        -----
+            key (str): The key of the result.
+
+        Returns:
+        --------
+            Tuple[str, str]: Data path and image path.
+        """
+        return os.path.join(self.directory, key + '.json'), os.path.join(self.directory, key + '.npy')
+
+
+    def __evict(self) -> None:
+        """Deletes the least recently used results while the cache is too large."""
+        results = []
+        total_bytes = 0
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json'):
+                continue
+            key = file_name[:-len('.json')]
+            data_path, img_path = self.__paths(key)
+            try:
+                size = os.path.getsize(data_path)
+                size += os.path.getsize(img_path) if os.path.exists(img_path) else 0
+                results.append((os.path.getmtime(data_path), size, key))
+            except FileNotFoundError:
+                continue # Deleted by a concurrent run.
+            total_bytes += size
+
+        results.sort()
+        while total_bytes > self.max_bytes and results:
+            _, size, key = results.pop(0)
+            for path in self.__paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass # Deleted by a concurrent run or still mapped on Windows.
+            total_bytes -= size
@@ -0,0 +1,197 @@
+# Python libraries
+import json
+import math
+import os
+# External modules
+import numpy as np
+from PIL import Image
+# Typing
+from typing import List, Tuple
+
+class WallpaperPyramid:
+    """Preprocesses a wallpaper once into a pyramid of levels, each half the
+    size of the one before, stored as uint8 tiles in memory-mapped arrays.
+
+    A map only reads the tiles covering its extent from the smallest level
+    which still has at least the resolution of the figure. So a small extent
+    reads a few tiles, a preview reads a small level and a wallpaper of any
+    size never has to be decoded as a whole again.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the pyramids. Defaults to 'data/wallpaper-pyramids'.
+        tile_size (int, optional): Width and height of the tiles in px. Defaults to 256.
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'wallpaper-pyramids'), tile_size: int = 256):
+        self.directory = directory
+        self.tile_size = tile_size
+
+
+    def read(
+        self,
+        wallpaper_path: str,
+        wallpaper_extent: Tuple[float, float, float, float],
+        extent: List[float],
+        px_per_degree: float
+    ) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+        """Reads the part of the wallpaper covering the extent, building the
+        pyramid on first use.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+            wallpaper_extent (Tuple[float, float, float, float]): The extent of the
+            whole wallpaper (west, east, south, north).
+            extent (List[float]): The extent requested (west, east, south, north).
+            px_per_degree (float): The horizontal resolution needed.
+
+        Returns:
+        --------
+            Tuple[np.ndarray, Tuple[float, float, float, float]]: The uint8 pixels
+            and their extent, the requested extent snapped to whole pixels.
+        """
+        meta = self.__load_meta(wallpaper_path)
+        west, east, south, north = wallpaper_extent
+
+        # The smallest level with enough resolution, else the largest one.
+        level = 0
+        for level_num, (level_width, _) in enumerate(meta['sizes']):
+            if level_width / (east - west) >= px_per_degree:
+                level = level_num
+        width, height = meta['sizes'][level]
+        x_per_degree, y_per_degree = width / (east - west), height / (north - south)
+
+        # Window in pixels covering the requested extent, clipped to the wallpaper.
+        left = min(max(math.floor((extent[0] - west) * x_per_degree), 0), width)
+        right = min(max(math.ceil((extent[1] - west) * x_per_degree), left), width)
+        top = min(max(math.floor((north - extent[3]) * y_per_degree), 0), height)
+        bottom = min(max(math.ceil((north - extent[2]) * y_per_degree), top), height)
+
+        tiles = np.load(self.__level_path(wallpaper_path, level), mmap_mode = 'r')
+        first_row, first_col = top // self.tile_size, left // self.tile_size
+        last_row, last_col = math.ceil(bottom / self.tile_size), math.ceil(right / self.tile_size)
+        block = tiles[first_row:last_row, first_col:last_col]
+        rows, cols, _, _, channels = block.shape
+        # Tiles are stored as (row, column, y, x, channel).
+        window = block.transpose(0, 2, 1, 3, 4).reshape(rows * self.tile_size, cols * self.tile_size, channels)
+        window_top, window_left = first_row * self.tile_size, first_col * self.tile_size
+        pixels = np.array(window[top - window_top:bottom - window_top, left - window_left:right - window_left])
+
+        pixel_extent = (
+            west + left / x_per_degree, west + right / x_per_degree,
+            north - bottom / y_per_degree, north - top / y_per_degree
+        )
+        return pixels, pixel_extent
+
+
+    def __load_meta(self, wallpaper_path: str) -> dict:
+        """Loads the description of the pyramid and builds the pyramid, if it
+        is missing or older than the wallpaper.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+
+        Returns:
+        --------
+            dict: Sizes of the levels and the version of the wallpaper.
+        """
+        stat = os.stat(wallpaper_path)
+        version = [stat.st_size, stat.st_mtime_ns, self.tile_size]
+        try:
+            with open(self.__meta_path(wallpaper_path), 'r') as meta_file:
+                meta = json.load(meta_file)
+            if meta['version'] == version:
+                return meta
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+        return self.__build(wallpaper_path, version)
+
+
+    def __build(self, wallpaper_path: str, version: list) -> dict:
+        """Builds the levels of the pyramid down to a single tile.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+            version (list): Size and modification time of the wallpaper and the tile size.
+
+        Returns:
+        --------
+            dict: Sizes of the levels and the version of the wallpaper.
+        """
+        os.makedirs(os.path.dirname(self.__meta_path(wallpaper_path)), exist_ok = True)
+        with Image.open(wallpaper_path) as wallpaper:
+            level_img = wallpaper.convert('RGBA' if 'A' in wallpaper.getbands() else 'RGB')
+
+        sizes = []
+        while True:
+            sizes.append(list(level_img.size))
+            self.__save_level(wallpaper_path, len(sizes) - 1, np.asarray(level_img))
+            if max(level_img.size) <= self.tile_size:
+                break
+            level_img = level_img.reduce(2)
+
+        # The description is written last since it marks the pyramid as complete.
+        meta = {'version': version, 'sizes': sizes}
+        partial_path = f'{self.__meta_path(wallpaper_path)}.{os.getpid()}.part'
+        with open(partial_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(partial_path, self.__meta_path(wallpaper_path))
+
+        return meta
+
+
+    def __save_level(self, wallpaper_path: str, level: int, pixels: np.ndarray) -> None:
+        """Splits a level into tiles, padded at the right and bottom, and saves them.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+            level (int): Number of the level.
+            pixels (np.ndarray): The pixels of the level.
+        """
+        height, width, channels = pixels.shape
+        rows, cols = math.ceil(height / self.tile_size), math.ceil(width / self.tile_size)
+        padded = np.zeros((rows * self.tile_size, cols * self.tile_size, channels), dtype = np.uint8)
+        padded[:height, :width] = pixels
+        tiles = padded.reshape(rows, self.tile_size, cols, self.tile_size, channels).transpose(0, 2, 1, 3, 4)
+
+        level_path = self.__level_path(wallpaper_path, level)
+        partial_path = f'{level_path}.{os.getpid()}.part'
+        with open(partial_path, 'wb') as level_file:
+            np.save(level_file, np.ascontiguousarray(tiles))
+        os.replace(partial_path, level_path)
+
+
+    def __meta_path(self, wallpaper_path: str) -> str:
+        """The path of the description of the pyramid.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+
+        Returns:
+        --------
+            str: The path.
+        """
+        name = os.path.splitext(os.path.basename(wallpaper_path))[0]
+        return os.path.join(self.directory, name, 'pyramid.json')
+
+
+    def __level_path(self, wallpaper_path: str, level: int) -> str:
+        """The path of the tiles of a level.
+
+        Args:
+        -----
+            wallpaper_path (str): Path to the wallpaper.
+            level (int): Number of the level.
+
+        Returns:
+        --------
+            str: The path.
+        """
+        name = os.path.splitext(os.path.basename(wallpaper_path))[0]
+        return os.path.join(self.directory, name, f'level-{level}.npy')
@@ -0,0 +1 @@
+"""Contains the caches which keep repeated work out of the poster pipeline."""
\ No newline at end of file
@@ -18,6 +18,12 @@ class CompleteImageTransform(ABC):
         pass
 
     
+    def prepare(self) -> None:
+        """Loads what the transformation needs ahead of time, e.g. while the
+        image is still being drawn. Does nothing by default."""
+        pass
+
+
     def __call__(self, img: Image.Image) -> Image.Image:
         return self.transform(img)
 
@@ -1,17 +1,14 @@
 # Internal imports
+from caching.AssetManager import AssetManager
 from complete_image_transforms.CompleteImageTransform import CompleteImageTransform
 # External modules
 from PIL import Image
-# Python libraries
-import os
 # Typing
 from typing import Tuple
 
 class Logo(CompleteImageTransform):
     """Inserts the Logo into the image."""
 
-    __logo_path = os.path.join('data', 'img', 'brainrain-logo-lang.jpg')
-
     def __init__(self, target_height: int, frame_width: int):
         """
         Args:
@@ -24,25 +21,37 @@ class Logo(CompleteImageTransform):
 
 
     @staticmethod
-    def __proportional_size(set_height: int, img: Image.Image) -> Tuple[int, int]:
+    def __proportional_size(set_height: int, size: Tuple[int, int]) -> Tuple[int, int]:
         """Calculates the the width of an image given its resized height.
 
         Args:
             set_height (int): The new height to which width should be adapted.
-            img (Image.Image): The image that gets resized.
+            size (Tuple[int, int]): The size of the image that gets resized.
 
         Returns:
             Tuple[int, int]: The proportional width.
         """
-        current_w, current_h = img.size
+        current_w, current_h = size
         max_w, max_h = current_w, set_height,
         resize_ratio = min(max_w / current_w, max_h / current_h)
         return (round(resize_ratio * current_w), round(resize_ratio * current_h))
 
 
+    def __resized_logo(self) -> Image.Image:
+        """The logo at the target height, resized once per process."""
+        assets = AssetManager.shared()
+        logo_path = assets.resolve('assets', 'logo')
+        logo_size = self.__proportional_size(self.__target_height, assets.size(logo_path))
+        return assets.resized(logo_path, logo_size)
+
+
+    # Override from CompleteImageTransform
+    def prepare(self) -> None:
+        self.__resized_logo()
+
+
     def transform(self, img: Image.Image) -> Image.Image:
-        logo = Image.open(self.__logo_path)
-        logo = logo.resize(self.__proportional_size(self.__target_height, logo))
+        logo = self.__resized_logo()
         logo_width, logo_height = logo.size
         
         half_img_width = round(img.width / 2)
@@ -6,16 +6,39 @@ from complete_image_transforms.CompleteImageTransform import CompleteImageTransf
 from cv2 import dnn_superres
 import numpy as np
 from PIL import Image
+# Typing
+from typing import Iterator, Union
 
 class Superscale(CompleteImageTransform):
-    """Upscales the image using superresolution neural networks."""
+    """Upscales the image using superresolution neural networks or, as the
+    fastest fallback, classic Lanczos interpolation (model 'lanczos')."""
 
-    available_models = {'espcn', 'fsrcnn', 'lapsrn'}
+    available_models = {'espcn', 'fsrcnn', 'lapsrn', 'lanczos'}
+    interpolation_models = {'lanczos'}
     available_scale_factors = {4}
+    # The factor of the poster, which layout and memory projection are based on too.
+    scale_factor = 4
+    # Rows of context above and below each band so that band borders are invisible.
+    band_overlap = 8
+    # The loaded models of this process, by model name and scale factor.
+    __superscalers = {}
 
-    def __init__(self, scale_factor: int = 4, model_name: str = 'lapsrn'):
+    def __init__(
+        self,
+        scale_factor: Union[None, int] = None,
+        model_name: str = 'lapsrn',
+        band_height: Union[None, int] = None
+    ):
+        """
+        Args:
+            scale_factor (Union[None, int], optional): The factor of the upscaling. Defaults to None, i.e. 4.
+            model_name (str, optional): The superresolution model or 'lanczos'. Defaults to 'lapsrn'.
+            band_height (Union[None, int], optional): If set, the image is upscaled
+            in bands of this many rows to limit the memory used. Defaults to None.
+        """
         super().__init__()
 
+        scale_factor = self.scale_factor if scale_factor is None else scale_factor
         if scale_factor not in self.available_scale_factors:
             err_message = (f'Scale factor {scale_factor} unavailable. Available: ' +
             ', '.join(fac for fac in available_scale_factors) + '.')
@@ -27,6 +50,77 @@ class Superscale(CompleteImageTransform):
             ', '.join(self.available_models) + '.')
             raise ValueError(err_message)
         self.model_name = model_name
+        self.band_height = band_height
+
+
+    def __create_superscaler(self) -> dnn_superres.DnnSuperResImpl:
+        """Loads the superresolution model once per process. Processes forked
+        after the model was loaded share it.
+
+        Returns:
+            dnn_superres.DnnSuperResImpl: The model ready for upsampling.
+        """
+        model_key = (self.model_name, self.scale_factor)
+        if model_key not in self.__superscalers:
+            superscaler = dnn_superres.DnnSuperResImpl_create()
+            model_path = os.path.join('data', 'models', f'{self.model_name.upper()}_x{self.scale_factor}.pb')
+            superscaler.readModel(model_path)
+            superscaler.setModel(self.model_name, self.scale_factor)
+            self.__superscalers[model_key] = superscaler
+
+        return self.__superscalers[model_key]
+
+
+    def warm_up(self) -> None:
+        """Loads the model up front, e.g. before worker processes are forked."""
+        if self.model_name not in self.interpolation_models:
+            self.__create_superscaler()
+
+
+    def __upsample(self, img_arr: np.ndarray) -> np.ndarray:
+        """Upscales an RGB array with the model.
+
+        Args:
+            img_arr (np.ndarray): The RGB pixels.
+
+        Returns:
+            np.ndarray: The upscaled RGB pixels.
+        """
+        if self.model_name in self.interpolation_models:
+            img = Image.fromarray(img_arr, 'RGB')
+            scaled_dims = (img.width * self.scale_factor, img.height * self.scale_factor)
+            return np.asarray(img.resize(scaled_dims, Image.LANCZOS))
+
+        return self.__create_superscaler().upsample(img_arr)
+
+
+    def superscale_bands(self, img: Image.Image, band_height: int) -> Iterator[Image.Image]:
+        """Upscales the image band by band from top to bottom. Each band is 
+        upsampled with a few rows of context above and below which are cut 
+        off afterwards.
+
+        Args:
+            img (Image.Image): Image to be upscaled.
+            band_height (int): Rows of the unscaled image per band.
+
+        Yields:
+            Image.Image: The upscaled bands, each `band_height * scale_factor` rows high
+            except for the last one.
+        """
+        img_arr = np.asarray(img.convert('RGB'))
+        img_height = img_arr.shape[0]
+
+        for band_start in range(0, img_height, band_height):
+            band_end = min(band_start + band_height, img_height)
+            context_start = max(band_start - self.band_overlap, 0)
+            context_end = min(band_end + self.band_overlap, img_height)
+
+            band = np.ascontiguousarray(img_arr[context_start:context_end])
+            band = self.__upsample(band)
+            crop_start = (band_start - context_start) * self.scale_factor
+            crop_end = crop_start + (band_end - band_start) * self.scale_factor
+            
+            yield Image.fromarray(band[crop_start:crop_end].astype('uint8', copy = False), 'RGB')
 
 
     def superscale(self, img: Image.Image) -> Image.Image:
@@ -46,15 +140,19 @@ class Superscale(CompleteImageTransform):
         Returns:
             Image.Image: The upsampled image.
         """
-        superscaler = dnn_superres.DnnSuperResImpl_create()
-        model_path = os.path.join('data', 'models', f'{self.model_name.upper()}_x{self.scale_factor}.pb')
-        superscaler.readModel(model_path)
-        superscaler.setModel(self.model_name, self.scale_factor)
-
-        img = img.convert('RGB')
-        img = np.array(img)
-        img = superscaler.upsample(img)
-        img = Image.fromarray(img.astype('uint8'), 'RGB')
+        if self.band_height is not None:
+            scaled_dims = (img.width * self.scale_factor, img.height * self.scale_factor)
+            scaled_img = Image.new('RGB', scaled_dims)
+            band_start = 0
+            for band in self.superscale_bands(img, self.band_height):
+                scaled_img.paste(band, (0, band_start))
+                band_start += band.height
+
+            return scaled_img
+
+        img = np.asarray(img.convert('RGB'))
+        img = self.__upsample(img)
+        img = Image.fromarray(img.astype('uint8', copy = False), 'RGB')
 
         return img
     
@@ -1,10 +1,11 @@
 # Python libraries
 import os
 # Internal modules
+from caching.WallpaperPyramid import WallpaperPyramid
+from draw.MaskRasterizer import MaskRasterizer
 from draw.Pin import Pin
 # External modules
 import cartopy.crs as ccrs
-import cartopy.io.shapereader as shpreader
 import matplotlib.pyplot as plt
 import numpy as np
 from PIL import Image
@@ -12,45 +13,98 @@ from PIL import Image
 from typing import List, Tuple
 
 class Map:
-    """Represents the map on which one can draw.
-    
+    """Represents the map on which one can draw. The figure is only created
+    when the pin-free map is rendered (see `render_base`), such that pins can
+    be placed onto a cached rendering without matplotlib.
+
+    The axes fill the whole figure, so the rendering shows exactly the extent.
+    Its height follows from the width, the extent and the aspect ratio.
+
     Args:
     -----
         shapefile_name (str): Name of the shapefile.
         background_name (str): Name of the background file.
-        extent (List[float]): Extent of the map.
+        extent (List[float]): Extent of the map (west, east, south, north).
+        background_extent (List[float]): Extent of the background (west, east, south, north).
         aspect_ratio (float, optional): Aspect ratio of the map. Defaults to 1.49.
+        width (int, optional): Width of the map at full resolution in px. Defaults to 1460.
+        scale (float, optional): Scale of the rendering, e.g. below 1 for previews. Defaults to 1.0.
+        shaped (bool, optional): Whether the shapefile is drawn over the background to give it the
+        shape of the country. Defaults to False.
     """
-    width = 2000
-    height = 3000
     dpi = 96
     projection = ccrs.PlateCarree()
 
     def __init__(
         self,
         shapefile_name: str,
-        background_name: str, 
+        background_name: str,
         extent: List[float],
-        aspect_ratio: float = 1.49
+        background_extent: List[float],
+        aspect_ratio: float = 1.49,
+        width: int = 1460,
+        scale: float = 1.0,
+        shaped: bool = False
     ):
+        self.shapefile_name = shapefile_name
+        self.background_name = background_name
+        self.extent = extent
+        self.background_extent = background_extent
         self.aspect_ratio = aspect_ratio
-        self.fig = plt.figure(figsize = (self.width / self.dpi, self.height / self.dpi), dpi = self.dpi, frameon = False)
-        self.ax = plt.axes(projection = self.projection)
-        self.ax.set_extent(extent, self.projection)
-        
-        # shape_path = os.path.join('data', 'shapefiles', shapefile_name)
-        # shape = list(shpreader.Reader(shape_path).geometries())
-        # self.ax.add_geometries(shape, self.projection, edgecolor = 'white', facecolor = 'white', zorder = 10)
-
-        background_path = os.path.join('data', 'img', background_name)
-        background = plt.imread(background_path)
-        # background_extent = (5.5, 15.3, 47.0, 55.5) # (west, east, south, north)
-        background_extent = (5.82, 15.12, 47.19, 55.31) # (west, east, south, north)
-
-        self.ax.imshow(background, origin = 'upper', extent = background_extent)
+        self.width = width
+        self.scale = scale
+        self.shaped = shaped
+        self.fig = None
+        self.ax = None
         self.pins = []
 
 
+    @property
+    def size(self) -> Tuple[int, int]:
+        """The size of the rendering.
+
+        Returns:
+        --------
+            Tuple[int, int]: Width and height in px.
+        """
+        west, east, south, north = self.extent
+        height = self.width * self.aspect_ratio * (north - south) / (east - west)
+
+        return round(self.width * self.scale), round(height * self.scale)
+
+
+    def render_base(self) -> Tuple[Image.Image, Tuple[int, int, int, int], Tuple[float, float, float, float]]:
+        """Renders the map without pins. The figure stays alive until `close` is called.
+
+        Returns:
+        --------
+            Tuple[Image.Image, Tuple[int, int, int, int], Tuple[float, float, float, float]]:
+            The rendering, the box of the axes in pixels (left, top, right, bottom) and
+            the extent shown in the axes (west, east, south, north).
+        """
+        self.__draw_background()
+        self.fig.canvas.draw()
+        base = Image.frombuffer(
+            'RGBA', self.fig.canvas.get_width_height(), self.fig.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1
+        ).copy()
+
+        # Matplotlib measures from the bottom, images from the top.
+        window = self.ax.get_window_extent()
+        axes_box = (
+            round(window.x0), round(base.height - window.y1),
+            round(window.x1), round(base.height - window.y0)
+        )
+        axes_extent = tuple(float(value) for value in self.ax.get_extent(self.projection))
+
+        if self.shaped:
+            # Lays the shape over the background like a white layer between background and pins.
+            mask_size = (axes_box[2] - axes_box[0], axes_box[3] - axes_box[1])
+            mask = MaskRasterizer().mask(self.shapefile_name, axes_extent, mask_size)
+            MaskRasterizer.apply(base, mask, axes_box)
+
+        return base, axes_box, axes_extent
+
+
     def add_pin(self, pin: Pin, lat_width: float = 0.6, shadow_factor: float = 1.35) -> None:
         """Add a pin to the map.
 
@@ -60,15 +114,33 @@ class Map:
             lat_width (float): The width of the pin itself (not of a ribbon, if given) in degrees. Defaults to 0.6.
             shadow_factor (float): A rescaling factor for heraldry with a shadow below it.
         """
-        pin_img = pin.img
-        width, height = pin_img.size
-        pin_arr = np.array(pin_img) / 255.0
-        lon, lat = pin.position
-       
+        self.add_pin_img(pin.img, pin.position, lat_width, shadow_factor)
+
+
+    def add_pin_img(
+        self,
+        pin_img: Image.Image,
+        position: Tuple[float, float],
+        lat_width: float = 0.6,
+        shadow_factor: float = 1.35
+    ) -> None:
+        """Add the image of a pin to the map.
+
+        Args:
+        -----
+            pin_img (Image.Image): The image of the pin.
+            position (Tuple[float, float]): The coordinates of the pin.
+            lat_width (float): The width of the pin itself (not of a ribbon, if given) in degrees. Defaults to 0.6.
+            shadow_factor (float): A rescaling factor for heraldry with a shadow below it.
+        """
+        pin_img = pin_img.convert('RGBA')
+        pin_arr = np.asarray(pin_img)
+        lon, lat = position
+
         # Find rescaling of width such that heraldry itself (not the ribbon!) is all the same size.
         # Idea: find out by how much more ribbon in width there is by measuring amount of empty px in width in middle height.
         height, width, channels = pin_arr.shape
-       
+
         # Before, problem was that at prop. height 0.5, there could be a gap between label and heraldry.
         # This resulted in no heraldry being detected and cartopy wanted to make the pin infinitly large.
         # So now, if there is now heraldry detected, test at 0.6, then 0.7 and so on.
@@ -78,7 +150,7 @@ class Map:
             heraldry_prop_in_img = 1.0 - (np.sum(px_slice == 0) / slice_width)
             if heraldry_prop_in_img != 0.0:
                 break
-        
+
         assert heraldry_prop_in_img != 0.0
         lat_width = lat_width / (heraldry_prop_in_img * slice_width) * slice_width
 
@@ -87,24 +159,72 @@ class Map:
             # lon -= 0.2
             lat -= 0.25
         elif lon > 53.5:
-            lon += 0.1 
+            lon += 0.1
 
         # Calculate height including the shadow below.
         lon_height = lat_width / width * (height / shadow_factor)
-        
+
         # "Middle out" such that the middle of the image is directly above the location.
         lat_start = lat - 0.5 * lat_width
         lat_end = lat + 0.5 * lat_width
         extent = (lat_start, lat_end, lon, lon + lon_height)
-        
+
         # Add values to list. Actual drawing happens in the save method.
         self.pins.append({
-            'img': pin_arr,
+            'img': pin_img,
             'extent': extent,
             'lon': lon
         })
 
-    
+
+    def composite_pins(
+        self,
+        base: Image.Image,
+        axes_box: Tuple[int, int, int, int],
+        axes_extent: Tuple[float, float, float, float]
+    ) -> Image.Image:
+        """Draws the pins onto a rendering of the map without pins.
+
+        Args:
+        -----
+            base (Image.Image): The rendering of the map, see `render_base`.
+            axes_box (Tuple[int, int, int, int]): The box of the axes in pixels.
+            axes_extent (Tuple[float, float, float, float]): The extent shown in the axes.
+
+        Returns:
+        --------
+            Image.Image: The map with pins.
+        """
+        img = base.convert('RGBA')
+        box_left, box_top, box_right, box_bottom = axes_box
+        west, east, south, north = axes_extent
+        px_per_lon = (box_right - box_left) / (east - west)
+        px_per_lat = (box_bottom - box_top) / (north - south)
+
+        # Order pins by longitude, so no shadow is drawn on top of other pin.
+        for pin in sorted(self.pins, key = lambda pin: pin['lon'], reverse = True):
+            pin_west, pin_east, pin_south, pin_north = pin['extent']
+            left = box_left + (pin_west - west) * px_per_lon
+            top = box_top + (north - pin_north) * px_per_lat
+            size = (round((pin_east - pin_west) * px_per_lon), round((pin_north - pin_south) * px_per_lat))
+            if size[0] < 1 or size[1] < 1:
+                continue
+            pin_img = pin['img'].resize(size, Image.LANCZOS)
+
+            # Like the axes of the figure, the map clips the pins at its border.
+            left, top = round(left), round(top)
+            visible = (
+                max(left, box_left), max(top, box_top),
+                min(left + size[0], box_right), min(top + size[1], box_bottom)
+            )
+            if visible[0] >= visible[2] or visible[1] >= visible[3]:
+                continue
+            pin_img = pin_img.crop((visible[0] - left, visible[1] - top, visible[2] - left, visible[3] - top))
+            img.alpha_composite(pin_img, (visible[0], visible[1]))
+
+        return img
+
+
     def save(self, file_name: str) -> None:
         """First, draws list of pins, then saves the file in the output directory.
 
@@ -112,12 +232,35 @@ class Map:
         -----
             file_name (str): The name the file (file only!). The output directory is hard-coded.
         """
-        # Order pins by longitude, so no shadow is drawn on top of other pin.
-        self.pins.sort(key = lambda pin: pin['lon'])
-        self.pins.reverse()
-        for pin in self.pins:
-            self.ax.imshow(pin['img'], origin = 'upper', extent = pin['extent'], transform = self.projection, zorder = 11)
+        img = self.composite_pins(*self.render_base())
+        img.save(os.path.join('output', file_name))
+
+
+    def close(self) -> None:
+        """Frees the figure including the decoded background."""
+        if self.fig is not None:
+            plt.close(self.fig)
+        self.fig = None
+        self.ax = None
 
-        self.ax.set_aspect(self.aspect_ratio)
-        plt.savefig(os.path.join('output', file_name))
 
+    def __draw_background(self) -> None:
+        """Creates the figure and draws the background into it."""
+        # The figure has exactly the size of the map, no margins are cropped afterwards.
+        width, height = self.size
+        self.fig = plt.figure(figsize = (width / self.dpi, height / self.dpi), dpi = self.dpi, frameon = False)
+        self.ax = self.fig.add_axes([0, 0, 1, 1], projection = self.projection)
+        self.ax.spines['geo'].set_visible(False)
+        self.ax.set_extent(self.extent, self.projection)
+
+        # Only the part of the background in the extent is read, at the resolution of the figure.
+        background_path = os.path.join('data', 'img', self.background_name)
+        px_per_degree = self.width * self.scale / (self.extent[1] - self.extent[0])
+        background, background_extent = WallpaperPyramid().read(
+            background_path, self.background_extent, self.extent, px_per_degree
+        )
+
+        self.ax.imshow(background, origin = 'upper', extent = background_extent)
+        # The size of the figure already has the aspect ratio.
+        self.ax.set_aspect('auto')
+        self.ax.set_extent(self.extent, self.projection)
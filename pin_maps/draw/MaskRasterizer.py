@@ -0,0 +1,116 @@
+# Python libraries
+import hashlib
+import json
+import os
+# Internal modules
+from caching.GeometryCache import GeometryCache
+# External modules
+import cv2
+import numpy as np
+from PIL import Image
+# Typing
+from typing import List, Tuple, Union
+
+class MaskRasterizer:
+    """Fills the polygons of a shapefile into a mask at the resolution of the
+    poster, e.g. to lay the negative shape of a country over the wallpaper.
+
+    All rings are filled at once with OpenCV, holes included, with anti-aliased
+    edges at subpixel precision. The masks are cached per shapefile, extent and
+    size and memory-mapped when they are loaded again.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the cached masks. Defaults to 'data/mask-cache'.
+        geometry_cache (Union[None, GeometryCache], optional): The source of the rings.
+        Defaults to a new `GeometryCache`.
+    """
+
+    __shift_bits = 4 # Subpixel precision of the polygon corners.
+
+    def __init__(
+        self,
+        directory: str = os.path.join('data', 'mask-cache'),
+        geometry_cache: Union[None, GeometryCache] = None
+    ):
+        self.directory = directory
+        self.geometry_cache = GeometryCache() if geometry_cache is None else geometry_cache
+        os.makedirs(self.directory, exist_ok = True)
+
+
+    def mask(self, shapefile_name: str, extent: List[float], size: Tuple[int, int]) -> np.ndarray:
+        """Returns the mask of the shapefile, rasterizing it on first use.
+
+        Args:
+        -----
+            shapefile_name (str): Name of the shapefile.
+            extent (List[float]): The extent covered by the mask (west, east, south, north).
+            size (Tuple[int, int]): Width and height of the mask.
+
+        Returns:
+        --------
+            np.ndarray: The mask of shape (height, width), 255 inside the polygons.
+        """
+        shapefile_path = os.path.join(self.geometry_cache.shapefile_directory, shapefile_name)
+        shapefile_stat = os.stat(shapefile_path)
+        key = json.dumps([shapefile_name, shapefile_stat.st_size, shapefile_stat.st_mtime_ns, list(extent), list(size)])
+        mask_path = os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '.npy')
+        if os.path.exists(mask_path):
+            return np.load(mask_path, mmap_mode = 'r')
+
+        mask = self.rasterize(
+            self.geometry_cache.load(shapefile_name, GeometryCache.detail_level(extent, size[0]), extent), extent, size
+        )
+        partial_path = f'{mask_path}.{os.getpid()}.part'
+        with open(partial_path, 'wb') as mask_file:
+            np.save(mask_file, mask)
+        os.replace(partial_path, mask_path)
+
+        return mask
+
+
+    @classmethod
+    def rasterize(cls, rings: List[np.ndarray], extent: List[float], size: Tuple[int, int]) -> np.ndarray:
+        """Fills the rings into a mask. Areas covered by an odd number of
+        rings are inside, so holes stay empty.
+
+        Args:
+        -----
+            rings (List[np.ndarray]): Rings of (longitude, latitude) points.
+            extent (List[float]): The extent covered by the mask (west, east, south, north).
+            size (Tuple[int, int]): Width and height of the mask.
+
+        Returns:
+        --------
+            np.ndarray: The mask of shape (height, width), 255 inside the polygons.
+        """
+        width, height = size
+        west, east, south, north = extent
+        mask = np.zeros((height, width), dtype = np.uint8)
+        if not rings:
+            return mask
+
+        # Pixel centers lie at integer positions for OpenCV.
+        subpixels = 2 ** cls.__shift_bits
+        to_px = np.array([width / (east - west), -height / (north - south)])
+        origin = np.array([west, north])
+        polygons = [
+            np.round(((np.asarray(ring) - origin) * to_px - 0.5) * subpixels).astype(np.int32) for ring in rings
+        ]
+        cv2.fillPoly(mask, polygons, 255, cv2.LINE_AA, cls.__shift_bits)
+
+        return mask
+
+
+    @staticmethod
+    def apply(img: Image.Image, mask: np.ndarray, box: Tuple[int, int, int, int]) -> None:
+        """Covers the masked area of the image in white. The mask is used as
+        alpha of one white layer, which is blended in place.
+
+        Args:
+        -----
+            img (Image.Image): An RGB or RGBA image, changed in place.
+            mask (np.ndarray): The mask, see `mask`.
+            box (Tuple[int, int, int, int]): The region of the image covered by the mask (left, top, right, bottom).
+        """
+        img.paste((255, ) * len(img.getbands()), box, Image.fromarray(np.asarray(mask)))
@@ -0,0 +1,177 @@
+# External modules
+from matplotlib import rc_context
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+# Typing
+from typing import List, Tuple, Union
+
+class VectorPoster:
+    """A poster whose text and lines stay vector graphics when it is saved as
+    PDF or SVG, while pasted images, e.g. the map and the coats of arms, are
+    embedded at their own resolution.
+
+    It offers the few operations the poster is drawn with under the names and
+    signatures of PIL, so the functions writing heading, body text, frame and
+    logo draw into it like into an image (see `drawing`). Positions are pixels
+    of the raster poster, the page is `page_width` inches wide. PDFs embed the
+    TrueType fonts, SVGs contain the glyphs as paths.
+
+    Args:
+    -----
+        size (Tuple[int, int]): Width and height in px.
+        page_width (float, optional): The width of the page in inches. Defaults to 12.
+    """
+
+    mode = 'RGB'
+
+    def __init__(self, size: Tuple[int, int], page_width: float = 12):
+        self.size = size
+        self.page_width = page_width
+        # Kind and arguments of every element in the order of drawing.
+        self.__elements: List[Tuple[str, tuple]] = []
+
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+
+    @staticmethod
+    def drawing(img: Union[Image.Image, 'VectorPoster']) -> Union[ImageDraw.ImageDraw, 'VectorPoster']:
+        """Returns what text and lines are drawn with: the poster itself or the
+        `ImageDraw` of a raster image.
+
+        Args:
+        -----
+            img (Union[Image.Image, VectorPoster]): The poster.
+
+        Returns:
+        --------
+            Union[ImageDraw.ImageDraw, VectorPoster]: The drawing interface.
+        """
+        return img if isinstance(img, VectorPoster) else ImageDraw.Draw(img)
+
+
+    def paste(self, img: Image.Image, box: Tuple[int, int], mask: Union[None, Image.Image] = None) -> None:
+        """Embeds an image like `Image.paste`.
+
+        Args:
+        -----
+            img (Image.Image): The image.
+            box (Tuple[int, int]): The position of its upper left corner.
+            mask (Union[None, Image.Image], optional): The transparency, e.g. the image itself. Defaults to None.
+        """
+        img = img.convert('RGBA') if mask is not None or 'A' in img.getbands() else img.convert('RGB')
+        if mask is not None:
+            img.putalpha(mask.getchannel('A') if 'A' in mask.getbands() else mask.convert('L'))
+        self.__elements.append(('image', (img, tuple(box[:2]))))
+
+
+    def text(
+        self,
+        xy: Tuple[int, int],
+        text: str,
+        fill: Union[None, str, Tuple[int, ...]] = None,
+        font: Union[None, ImageFont.FreeTypeFont] = None
+    ) -> None:
+        """Writes text like `ImageDraw.text`, i.e. `xy` is the left end of the
+        ascender line.
+
+        Args:
+        -----
+            xy (Tuple[int, int]): The position.
+            text (str): The text.
+            fill (Union[None, str, Tuple[int, ...]], optional): The color. Defaults to None, black.
+            font (Union[None, ImageFont.FreeTypeFont], optional): A TrueType font. Defaults to None.
+        """
+        if font is None or not hasattr(font, 'path'):
+            raise ValueError('Vector posters need TrueType fonts.')
+        ascent, _ = font.getmetrics()
+        self.__elements.append(('text', (tuple(xy), text, self.__color(fill), font.path, font.size, ascent)))
+
+
+    def line(
+        self,
+        xy: List[Tuple[float, float]],
+        fill: Union[None, str, Tuple[int, ...]] = None,
+        width: int = 1
+    ) -> None:
+        """Draws a line through the points like `ImageDraw.line`.
+
+        Args:
+        -----
+            xy (List[Tuple[float, float]]): The points.
+            fill (Union[None, str, Tuple[int, ...]], optional): The color. Defaults to None, black.
+            width (int, optional): The width in px. Defaults to 1.
+        """
+        self.__elements.append(('line', (list(xy), self.__color(fill), width)))
+
+
+    def save(self, path: str, format: str) -> None:
+        """Writes the poster.
+
+        Args:
+        -----
+            path (str): The path of the file.
+            format (str): 'pdf' or 'svg'.
+        """
+        dpi = self.width / self.page_width
+        figure = Figure(figsize = (self.page_width, self.height / dpi), dpi = dpi, facecolor = 'white')
+        for kind, args in self.__elements:
+            if kind == 'image':
+                img, (left, top) = args
+                # Axes exactly covering the image, which is embedded without resampling.
+                axes = figure.add_axes([
+                    left / self.width, 1 - (top + img.height) / self.height,
+                    img.width / self.width, img.height / self.height
+                ])
+                axes.set_axis_off()
+                axes.imshow(np.asarray(img), interpolation = 'none', aspect = 'auto')
+            elif kind == 'text':
+                (left, top), text, color, font_path, font_size, ascent = args
+                figure.text(
+                    left / self.width, 1 - (top + ascent) / self.height, text, color = color,
+                    fontproperties = FontProperties(fname = font_path, size = font_size * 72 / dpi),
+                    ha = 'left', va = 'baseline'
+                )
+            elif kind == 'line':
+                points, color, width = args
+                figure.add_artist(Line2D(
+                    [x / self.width for x, _ in points], [1 - y / self.height for _, y in points],
+                    color = color, linewidth = width * 72 / dpi, solid_joinstyle = 'miter'
+                ))
+
+        with rc_context({'pdf.fonttype': 42, 'svg.fonttype': 'path'}):
+            figure.savefig(path, format = format, dpi = dpi, facecolor = 'white')
+
+
+    @classmethod
+    def from_image(cls, img: Image.Image) -> 'VectorPoster':
+        """Wraps a finished raster poster, e.g. to write it as PDF or SVG anyway.
+
+        Args:
+        -----
+            img (Image.Image): The poster.
+
+        Returns:
+        --------
+            VectorPoster: The poster consisting of the image.
+        """
+        poster = cls(img.size)
+        poster.paste(img, (0, 0))
+        return poster
+
+
+    @staticmethod
+    def __color(fill: Union[None, str, Tuple[int, ...]]) -> Tuple[float, ...]:
+        """Converts a color of PIL into one of matplotlib."""
+        rgb = ImageColor.getrgb(fill) if isinstance(fill, str) else (0, 0, 0) if fill is None else fill
+        return tuple(channel / 255 for channel in rgb)
@@ -0,0 +1,220 @@
+# Python libraries
+import io
+import re
+import requests
+# External modules
+from PIL import Image
+# Internal modules
+from caching.HeraldryStore import HeraldryStore
+from caching.NegativeCache import NegativeCache
+from heraldry_sources.HeraldrySource import HeraldrySource
+from heraldry_sources.WikidataSource import WikidataSource
+from heraldry_sources.WikipediaSource import WikipediaSource
+# Typing
+from typing import Dict, List, Union
+
+class HeraldryFetcher:
+    """Fetches the coats of arms of towns which are not in the heraldry store yet.
+
+    The sources are asked in order, each in batches of its `batch_size`; a source
+    only gets the towns the sources before it did not find. The images are
+    downloaded as thumbnails at the width in which the store keeps them and
+    ingested into the store.
+
+    Args:
+    -----
+        heraldry_store (Union[None, HeraldryStore], optional): The store of the coats of arms.
+        Defaults to the store shared within the process.
+        sources (Union[None, List[HeraldrySource]], optional): The sources. Defaults to
+        Wikidata with the Wikipedia pages as fallback.
+        failure_cache (Union[None, NegativeCache], optional): Remembers towns without
+        coat of arms. Defaults to None, i.e. the sources are asked every time.
+    """
+
+    # Images of Wikimedia, either thumbnails or originals: base, hash directories and file name.
+    __thumb_pattern = re.compile(r'^(.*/wikipedia/[^/]+/)thumb/([0-9a-f]/[0-9a-f]{2}/[^/]+)/\d+px-([^/]+)$')
+    __original_pattern = re.compile(r'^(.*/wikipedia/[^/]+/)([0-9a-f]/[0-9a-f]{2}/([^/]+))$')
+    # Links to files on Wikimedia Commons, as given by Wikidata.
+    __file_path_pattern = re.compile(r'^https?://commons\.wikimedia\.org/wiki/Special:FilePath/[^?]+$')
+    __max_download_bytes = 2 ** 23
+
+    def __init__(
+        self,
+        heraldry_store: Union[None, HeraldryStore] = None,
+        sources: Union[None, List[HeraldrySource]] = None,
+        failure_cache: Union[None, NegativeCache] = None
+    ):
+        self.__heraldry_store = HeraldryStore.shared() if heraldry_store is None else heraldry_store
+        self.sources = [WikidataSource(), WikipediaSource()] if sources is None else sources
+        self.__failure_cache = failure_cache
+        # Towns which have no coat of arms, such that they are asked for once per fetcher.
+        self.__missing: Dict[str, LookupError] = {}
+
+
+    def fetch(self, town_names: List[str]) -> Dict[str, Exception]:
+        """Fetches the coats of arms of the towns which are not stored yet.
+
+        Args:
+        -----
+            town_names (List[str]): The names of the towns.
+
+        Returns:
+        --------
+            Dict[str, Exception]: Why towns failed by their lower case names: a
+            LookupError if they have no coat of arms, a ConnectionRefusedError
+            if a source could not be contacted.
+        """
+        errors: Dict[str, Exception] = {}
+        wanted = {}
+        for town_name in town_names:
+            name = town_name.lower()
+            if name in self.__heraldry_store or name in wanted:
+                continue
+            failure = None if self.__failure_cache is None else self.__failure_cache.lookup('heraldry', name)
+            if name in self.__missing:
+                errors[name] = self.__missing[name]
+            elif failure is not None:
+                errors[name] = LookupError(f'No heraldry image found for {name} recently: {failure[0]}')
+            else:
+                wanted[name] = town_name
+
+        for source in self.sources:
+            town_batch_names = list(wanted.values())
+            for start in range(0, len(town_batch_names), source.batch_size):
+                batch = town_batch_names[start:start + source.batch_size]
+                try:
+                    urls = source.find_urls(batch)
+                except (ConnectionRefusedError, requests.RequestException) as e:
+                    # The next source may still find them, otherwise they are retried later.
+                    errors.update({town_name.lower(): self.__connection_error(e) for town_name in batch})
+                    continue
+                for name, heraldry_url in urls.items():
+                    if name not in wanted:
+                        continue
+                    try:
+                        heraldry = self.download(heraldry_url, self.__heraldry_store.normalization.width)
+                    except LookupError as e:
+                        errors[name] = e
+                        continue
+                    except (ConnectionRefusedError, requests.RequestException) as e:
+                        errors[name] = self.__connection_error(e)
+                        continue
+                    self.__heraldry_store.ingest(name, heraldry)
+                    errors.pop(name, None)
+                    del wanted[name]
+
+        for name in wanted:
+            if name not in errors:
+                errors[name] = self.__missing[name] = LookupError(f'Unable to find a heraldry image for {name}.')
+                if self.__failure_cache is not None:
+                    self.__failure_cache.record('heraldry', name, str(errors[name]))
+
+        return errors
+
+
+    def download(self, heraldry_url: str, width: int) -> Image.Image:
+        """Downloads a thumbnail of the heraldry image at the width. The original
+        image is only downloaded if there is no thumbnail, e.g. because the
+        original is narrower.
+
+        Args:
+        -----
+            heraldry_url (str): The URL of the image.
+            width (int): The wanted width in px.
+
+        Raises:
+        -------
+            ConnectionRefusedError: The image cannot be downloaded.
+            LookupError: The image is larger than allowed.
+
+        Returns:
+        --------
+            Image.Image: The decoded heraldry image.
+        """
+        thumbnail_url = self.thumbnail_url(heraldry_url, width)
+        try:
+            img_data = self.__download(thumbnail_url)
+        except ConnectionRefusedError:
+            if thumbnail_url == heraldry_url:
+                raise
+            img_data = self.__download(heraldry_url)
+
+        heraldry = Image.open(img_data)
+        if heraldry.width > width:
+            # Lets JPEGs be decoded at a fraction of their size, the other formats ignore it.
+            heraldry.draft(heraldry.mode, (width, round(heraldry.height * width / heraldry.width)))
+        heraldry.load()
+
+        return heraldry
+
+
+    def __download(self, url: str) -> io.BytesIO:
+        """Downloads a file in chunks up to the allowed size.
+
+        Args:
+        -----
+            url (str): The URL of the file.
+
+        Raises:
+        -------
+            ConnectionRefusedError: The file cannot be downloaded.
+            LookupError: The file is larger than allowed.
+
+        Returns:
+        --------
+            io.BytesIO: The content of the file.
+        """
+        headers = {'User-Agent': HeraldrySource.user_agent}
+        with requests.get(url, headers = headers, stream = True, timeout = 30) as reply:
+            if reply.status_code != 200:
+                raise ConnectionRefusedError(f'Status code {reply.status_code}: cannot contact {url}.')
+
+            content = io.BytesIO()
+            for chunk in reply.iter_content(chunk_size = 2 ** 16):
+                content.write(chunk)
+                if content.tell() > self.__max_download_bytes:
+                    raise LookupError(f'The heraldry image {url} is larger than {self.__max_download_bytes} bytes.')
+
+        content.seek(0)
+        return content
+
+
+    @staticmethod
+    def __connection_error(error: Exception) -> ConnectionRefusedError:
+        """Network errors of the requests library as raised by the rest of the program."""
+        if isinstance(error, ConnectionRefusedError):
+            return error
+        connection_error = ConnectionRefusedError(str(error))
+        connection_error.__cause__ = error
+        return connection_error
+
+
+    @classmethod
+    def thumbnail_url(cls, image_url: str, width: int) -> str:
+        """Turns the URL of a Wikimedia image into the URL of its thumbnail at
+        the width. SVGs are rendered as PNG. Other URLs are returned unchanged.
+
+        Args:
+        -----
+            image_url (str): The URL of the image or of any of its thumbnails.
+            width (int): The width of the thumbnail in px.
+
+        Returns:
+        --------
+            str: The URL of the thumbnail.
+        """
+        if cls.__file_path_pattern.match(image_url) is not None:
+            return f'{image_url}?width={width}'
+
+        thumb_match = cls.__thumb_pattern.match(image_url)
+        if thumb_match is not None:
+            base_url, image_path, thumb_name = thumb_match.groups()
+            return f'{base_url}thumb/{image_path}/{width}px-{thumb_name}'
+
+        original_match = cls.__original_pattern.match(image_url)
+        if original_match is not None:
+            base_url, image_path, file_name = original_match.groups()
+            png_suffix = '.png' if file_name.lower().endswith('.svg') else ''
+            return f'{base_url}thumb/{image_path}/{width}px-{file_name}{png_suffix}'
+
+        return image_url
@@ -0,0 +1,35 @@
+# Python libraries
+from abc import ABC, abstractmethod
+# Typing
+from typing import Dict, List
+
+class HeraldrySource(ABC):
+    """Abstract base class for sources of coats of arms. The `find_urls(self,
+    town_names: List[str]) -> Dict[str, str]` method needs to be implemented.
+    It is called with at most `batch_size` towns at once."""
+
+    batch_size = 1
+    user_agent = 'pin-maps (https://github.com/Dominik-Hillmann/pin-maps)'
+
+    @abstractmethod
+    def find_urls(self, town_names: List[str]) -> Dict[str, str]:
+        """Finds the images of the coats of arms of towns.
+
+        Args:
+        -----
+            town_names (List[str]): The names of the towns.
+
+        Raises:
+        -------
+            ConnectionRefusedError: The source cannot be contacted.
+
+        Returns:
+        --------
+            Dict[str, str]: The URLs of the images by the lower case names of the
+            towns. Towns without coat of arms are missing.
+        """
+        pass
+
+
+    def __repr__(self):
+        return f'HeraldrySource ({type(self).__name__})'
@@ -0,0 +1,61 @@
+# Python libraries
+import json
+import requests
+# Internal modules
+from heraldry_sources.HeraldrySource import HeraldrySource
+# Typing
+from typing import Dict, List
+
+class WikidataSource(HeraldrySource):
+    """Finds the coats of arms of many towns with one structured query: the
+    towns are looked up by their label and the image of their coat of arms is
+    the property P94. Replaces fetching and parsing several pages per town.
+
+    Args:
+    -----
+        endpoint (str, optional): The SPARQL endpoint. Defaults to 'https://query.wikidata.org/sparql'.
+        language (str, optional): The language of the town names. Defaults to 'de'.
+        country (str, optional): The item of the country the towns lie in. Defaults to 'Q183' (Germany).
+        batch_size (int, optional): The number of towns per query. Defaults to 50.
+    """
+
+    __query = '''
+        SELECT ?name ?coat WHERE {{
+            VALUES ?name {{ {names} }}
+            ?town rdfs:label ?name ;
+                wdt:P17 wd:{country} ;
+                wdt:P94 ?coat .
+        }}
+    '''
+
+    def __init__(
+        self,
+        endpoint: str = 'https://query.wikidata.org/sparql',
+        language: str = 'de',
+        country: str = 'Q183',
+        batch_size: int = 50
+    ):
+        self.endpoint = endpoint
+        self.language = language
+        self.country = country
+        self.batch_size = batch_size
+
+
+    # Override from HeraldrySource
+    def find_urls(self, town_names: List[str]) -> Dict[str, str]:
+        names = ' '.join(f'{json.dumps(town_name, ensure_ascii = False)}@{self.language}' for town_name in town_names)
+        reply = requests.post(
+            self.endpoint,
+            data = {'query': self.__query.format(names = names, country = self.country), 'format': 'json'},
+            headers = {'Accept': 'application/sparql-results+json', 'User-Agent': self.user_agent},
+            timeout = 60
+        )
+        if reply.status_code != 200:
+            raise ConnectionRefusedError(f'Status code {reply.status_code}: cannot contact {self.endpoint}.')
+
+        urls = {}
+        for binding in reply.json()['results']['bindings']:
+            # Towns of the same name yield several coats, the first one is taken.
+            urls.setdefault(binding['name']['value'].lower(), binding['coat']['value'])
+
+        return urls
@@ -0,0 +1,141 @@
+# Python libraries
+import requests
+from time import sleep
+# External modules
+from bs4 import BeautifulSoup
+# Internal modules
+from heraldry_sources.HeraldrySource import HeraldrySource
+# Typing
+from typing import Dict, List, Union
+
+class WikipediaSource(HeraldrySource):
+    """Finds the coats of arms on the pages of the German Wikipedia: the first
+    image whose name or description contains "Wappen" on the page of the town,
+    on its search results or on the first city page among them.
+
+    Args:
+    -----
+        delay (float, optional): Seconds to wait after each town. Defaults to 0.
+    """
+
+    __wiki_base_url = 'https://de.wikipedia.org/wiki/'
+    __seach_url = 'https://de.wikipedia.org/w/index.php?search={}'
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+
+
+    # Override from HeraldrySource
+    def find_urls(self, town_names: List[str]) -> Dict[str, str]:
+        urls = {}
+        for town_name in town_names:
+            heraldry_url = self.__find_url(town_name.lower())
+            if heraldry_url is not None:
+                urls[town_name.lower()] = heraldry_url
+            sleep(self.delay)
+
+        return urls
+
+
+    def __find_url(self, location_name: str) -> Union[str, None]:
+        """Retrieves the link of the location's heraldry from the Wikipedia.
+
+        Args:
+        -----
+            location_name (str): The location's name.
+
+        Raises:
+        -------
+            ConnectionRefusedError: Wikipedia cannot be contacted due to network errors.
+
+        Returns:
+        --------
+            Union[str, None]: The link of the heraldry image, if one was found.
+        """
+        wiki_url = self.__wiki_base_url + location_name.replace(' ', '_')
+        reply = self.__get(wiki_url)
+        if reply.status_code not in [200, 404]:
+            raise ConnectionRefusedError(f'Status code {reply.status_code}: cannot contact {wiki_url}.') # 404 accepted because of wrong spelling possibilty.
+
+        heraldry_url = self.__search_heraldry_link(reply.content, location_name.replace(' ', '_'))
+        if heraldry_url is not None:
+            return self.__absolute(heraldry_url)
+
+        search_url = self.__seach_url.format(location_name.replace(' ', '+'))
+        search_reply = self.__get(search_url)
+        if search_reply.status_code != 200:
+            raise ConnectionRefusedError(f'Status code {search_reply.status_code}: cannot contact {search_url}.')
+
+        heraldry_url = self.__search_heraldry_link(search_reply.content, location_name)
+        if heraldry_url is not None:
+            return self.__absolute(heraldry_url)
+
+        city_url = self.__search_city_link(search_reply.content)
+        if city_url is None:
+            return None
+        attempt_2_reply = self.__get(city_url)
+        if attempt_2_reply.status_code != 200:
+            raise ConnectionRefusedError(f'Status code {attempt_2_reply.status_code}: cannot contact {city_url} at attempt two.')
+
+        heraldry_url = self.__search_heraldry_link(attempt_2_reply.content, location_name)
+        return None if heraldry_url is None else self.__absolute(heraldry_url)
+
+
+    def __get(self, url: str) -> requests.Response:
+        return requests.get(url, headers = {'User-Agent': self.user_agent}, timeout = 30)
+
+
+    @staticmethod
+    def __absolute(url: str) -> str:
+        return 'https:' + url if url.startswith('//') else url
+
+
+    @staticmethod
+    def __search_heraldry_link(html: str, location_name: str) -> Union[str, None]:
+        """Searches for a link of the image of heraldry.
+
+        Args:
+        -----
+            html (str): The HTML markup which you want to search through.
+            location_name (str): The name of the location for which you search heraldry.
+
+        Returns:
+        --------
+            (Union[str, None]): The link.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+
+        heraldry_url = None
+        imgs = soup.find_all('img')
+        for img in imgs:
+            heraldry_in_alt = 'wappen' in img['alt'].lower()
+            heraldry_in_src = 'wappen' in img['src'].lower()
+            # name_in_alt = location_name.lower() in img['alt'].lower()
+            # name_in_src = location_name.lower() in img['src'].lower()
+            if (heraldry_in_alt or heraldry_in_src):# and (name_in_alt or name_in_src):
+                heraldry_url = img['src']
+                break
+
+        return heraldry_url
+
+
+    @staticmethod
+    def __search_city_link(html: str) -> Union[str, None]:
+        """Looks for a link to a Wikipeddia page of a city.
+
+        Args:
+        -----
+            html (str): The HTML markup to be searched.
+
+        Returns:
+        --------
+            (Union[str, None]): The link, if the HTML contains one, else None.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        lis = soup.find_all('li')
+        for li in lis:
+            text = li.get_text().lower()
+            if 'stadt ' in text or 'metropole ' in text or 'ort' in text:
+                return 'https://de.wikipedia.org' + li.a['href']
+
+        return None
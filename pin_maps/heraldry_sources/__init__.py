@@ -0,0 +1 @@
+"""Sources which find the images of the coats of arms of towns."""
\ No newline at end of file
@@ -1,5 +1,7 @@
 # Python libraries
 from abc import ABC, abstractmethod
+# Internal modules
+from caching.AssetManager import AssetManager
 # External modules
 from PIL import Image
 from PIL import ImageFont
@@ -32,16 +34,19 @@ class ImageTransform(ABC):
         """
         goal_height = segment_height - eta
         text = self.town_name + self._cellar_char
-        
-        font_size = 500
-        current_font = ImageFont.truetype(self._font_path, font_size)
-        _, current_height = current_font.getsize(text)
-        while current_height >= goal_height:
-            font_size -= 1
-            current_font = ImageFont.truetype(self._font_path, font_size)
-            _, current_height = current_font.getsize(text)
-
-        return current_font
+        assets = AssetManager.shared()
+
+        # Binary search for the largest size up to 500 at which the text is lower than the goal.
+        smallest_size, largest_size = 1, 500
+        while smallest_size < largest_size:
+            font_size = (smallest_size + largest_size + 1) // 2
+            _, current_height = assets.font(self._font_path, font_size).getsize(text)
+            if current_height >= goal_height:
+                largest_size = font_size - 1
+            else:
+                smallest_size = font_size
+
+        return assets.font(self._font_path, smallest_size)
     
 
     @staticmethod
@@ -0,0 +1,35 @@
+# Internal modules
+from heraldry_transforms.ImageTransform import ImageTransform
+from heraldry_transforms.BackgroundDeletion import BackgroundDeletion
+from heraldry_transforms.Cutout import Cutout
+# External modules
+from PIL import Image
+
+class Normalization(ImageTransform):
+    """Brings a new coat of arms into the canonical form in which it is stored:
+    the background is deleted, the empty space at the edges is cut off and
+    coats wider than `width` are scaled down with a Lanczos filter. Every later
+    transform then works on a small RGBA image.
+
+    Args:
+    -----
+        width (int, optional): The canonical width of the coats in px. It is the
+        width of the pins on a poster rendered at four times the resolution. Defaults to 440.
+    """
+
+    def __init__(self, width: int = 440):
+        super().__init__()
+        self.width = width
+        self.__background_deletion = BackgroundDeletion()
+        self.__cutout = Cutout()
+
+
+    # Override from ImageTransform
+    def transform(self, heraldry: Image.Image) -> Image.Image:
+        heraldry = self.__cutout(self.__background_deletion(heraldry))
+        if heraldry.width <= self.width:
+            return heraldry
+
+        height = max(1, round(heraldry.height * self.width / heraldry.width))
+        # Reduces large renders by whole factors first, the Lanczos filter only does the rest.
+        return heraldry.resize((self.width, height), Image.LANCZOS, reducing_gap = 3.0)
@@ -2,6 +2,7 @@
 import os
 import random
 # Internal modules
+from caching.AssetManager import AssetManager
 from heraldry_transforms.ImageTransform import ImageTransform
 # External modules
 from PIL import Image, ImageFont, ImageDraw
@@ -14,26 +15,13 @@ class Ribbon(ImageTransform):
     Args:
     -----
         town_name (str): The name written on the ribbon.
-        font_path (str): The path to the truetype font. Defaults to standard_font_path.
+        font_path (str): The path to the truetype font. Defaults to the configured ribbon font.
         gap (int): Gap between heraldry and ribbon in pixels. Defaults to 7.
         ribbon_height (int): Height of the ribbon in pixels. Defaults to 100.
     """
-    __standard_font_path = os.path.join('data', 'fonts', 'fraktur-modern.ttf')
-    __ribbon_path = os.path.join('data', 'img', 'ribbons')
-
-    __segment_left = Image.open(os.path.join(__ribbon_path, 'left-segment.png'))
-    __segment_right = Image.open(os.path.join(__ribbon_path, 'right-segment.png'))
     # (ribbon ending, adjustment along x dimension, adjustment along y dimension)
-    __left_end_choices = [
-        (Image.open(os.path.join(__ribbon_path, 'left-end-1.png')), 45, 31),
-        (Image.open(os.path.join(__ribbon_path, 'left-end-2.png')), 65, 46),
-        (Image.open(os.path.join(__ribbon_path, 'left-end-3.png')), 67, 67)
-    ] 
-    __right_end_choices = [
-        (Image.open(os.path.join(__ribbon_path, 'right-end-1.png')), -22, 33),
-        (Image.open(os.path.join(__ribbon_path, 'right-end-2.png')), -30, 43),
-        (Image.open(os.path.join(__ribbon_path, 'right-end-3.png')), -40, 70)
-    ]
+    __left_end_choices = [('left-end-1.png', 45, 31), ('left-end-2.png', 65, 46), ('left-end-3.png', 67, 67)]
+    __right_end_choices = [('right-end-1.png', -22, 33), ('right-end-2.png', -30, 43), ('right-end-3.png', -40, 70)]
     __max_offset = max([abs(choice[2]) for choice in __left_end_choices]) + max([abs(choice[2]) for choice in __right_end_choices])
     __max_left_adjust_y = max([choice[2] for choice in __left_end_choices])
     
@@ -57,16 +45,24 @@ class Ribbon(ImageTransform):
         self.__ribbon_height = ribbon_height
 
         if ribbon_choice is not None:
-            self.__left_end, self.__left_adjust_x, self.__left_adjust_y = self.__left_end_choices[ribbon_choice - 1]
-            self.__right_end, self.__right_adjust_x, self.__right_adjust_y = self.__right_end_choices[ribbon_choice - 1]
+            left_end_name, self.__left_adjust_x, self.__left_adjust_y = self.__left_end_choices[ribbon_choice - 1]
+            right_end_name, self.__right_adjust_x, self.__right_adjust_y = self.__right_end_choices[ribbon_choice - 1]
         else:
-            self.__left_end, self.__left_adjust_x, self.__left_adjust_y = random.choice(self.__left_end_choices)
-            self.__right_end, self.__right_adjust_x, self.__right_adjust_y = random.choice(self.__right_end_choices)
+            left_end_name, self.__left_adjust_x, self.__left_adjust_y = random.choice(self.__left_end_choices)
+            right_end_name, self.__right_adjust_x, self.__right_adjust_y = random.choice(self.__right_end_choices)
+
+        # The ribbon images are decoded once and shared by all ribbons.
+        assets = AssetManager.shared()
+        ribbon_path = assets.resolve('assets', 'ribbons')
+        self.__segment_left = assets.image(os.path.join(ribbon_path, 'left-segment.png'))
+        self.__segment_right = assets.image(os.path.join(ribbon_path, 'right-segment.png'))
+        self.__left_end = assets.image(os.path.join(ribbon_path, left_end_name))
+        self.__right_end = assets.image(os.path.join(ribbon_path, right_end_name))
 
         if font_path is not None:
             self._font_path = font_path
         else:
-            self._font_path = self.__standard_font_path
+            self._font_path = assets.resolve('assets', 'ribbon-font')
         
     
     def __attach_ribbon_ends(self, ribbon: Image.Image) -> Image.Image:
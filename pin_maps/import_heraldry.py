@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""Imports a directory of `<name>-pin.png` coats of arms into the heraldry store
+or normalizes the coats stored by older versions (`--migrate`)."""
+
+# Internal modules
+from caching.HeraldryStore import HeraldryStore
+# Python libraries
+import argparse
+import os
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'directory',
+        nargs = '?',
+        default = os.path.join('data', 'img', 'pin-cache'),
+        help = 'The directory of the coats of arms. Defaults to the former pin cache.'
+    )
+    parser.add_argument(
+        '--database',
+        type = str,
+        default = os.path.join('data', 'heraldry.sqlite'),
+        help = 'The path of the heraldry store.'
+    )
+    parser.add_argument(
+        '--migrate',
+        action = 'store_true',
+        help = 'Normalizes the stored coats instead of importing a directory.'
+    )
+    args = parser.parse_args()
+
+    store = HeraldryStore(args.database, import_dir = None)
+    if args.migrate:
+        print(f'Normalized {store.migrate()} of {len(store)} coats of arms.')
+    else:
+        imported = store.import_dir(args.directory)
+        print(f'Imported {imported} coats of arms, the store holds {len(store)}.')
+
+
+if __name__ == '__main__':
+    main()
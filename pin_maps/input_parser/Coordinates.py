@@ -1,9 +1,12 @@
 # Python libraries
 import requests
+import io
 import os
 import json
 import csv
 from time import sleep
+# Internal modules
+from caching.NegativeCache import NegativeCache
 # Typing 
 from typing import Tuple, Union
 
@@ -11,6 +14,8 @@ class Coordinates:
     """Contains and resolves locations to coordinates.
     Args:
         location (Union[str, Tuple[float, float]]): The location's name or the tuple of coordinates.
+        failure_cache (Union[None, NegativeCache], optional): Remembers locations which
+        Nominatim cannot find. Defaults to None, i.e. they are looked up every time.
 
     Raises:
         NameError: The location cannot be resolved to coordinates.
@@ -19,12 +24,13 @@ class Coordinates:
     __base_query = 'https://nominatim.openstreetmap.org/search.php?q={}&format=json'
     __cache_path = os.path.join('data', 'coords-cache.csv')
 
-    def __init__(self, location: str):
+    def __init__(self, location: str, failure_cache: Union[None, NegativeCache] = None):
         self.name = location
+        self.__failure_cache = failure_cache
         try:
             self.__latitude, self.__longitude = self.__resolve(location)
         except (ConnectionRefusedError, ValueError) as e:
-            raise NameError(f'Location {location} could not be resolved.')
+            raise NameError(f'Location {location} could not be resolved.') from e
             
 
     
@@ -48,6 +54,12 @@ class Coordinates:
         if coords is not None:
             return coords
 
+        # Skip locations which could not be found recently.
+        if self.__failure_cache is not None:
+            failure = self.__failure_cache.lookup('coordinates', query)
+            if failure is not None:
+                raise ValueError(f'No coordinates found for "{query}" recently: {failure[0]}')
+
         # Otherwise, resolve via the internet.
         url = self.__base_query.format(query.lower())
         reply = requests.get(url)
@@ -57,6 +69,8 @@ class Coordinates:
         try:
             result = json.loads(reply.content)[0]
         except IndexError:
+            if self.__failure_cache is not None:
+                self.__failure_cache.record('coordinates', query, 'Nominatim found no location.')
             raise ValueError(f'No coordinates found for "{query}".')
 
         lat = float(result['lat'])
@@ -85,9 +99,16 @@ class Coordinates:
             coords (Tuple[float, float]): The coordinates of the location.
         """
 
-        with open(self.__cache_path, 'a+', encoding = 'utf-8', newline = '') as cache_file:
-            cache = csv.writer(cache_file, delimiter = ',', quoting = csv.QUOTE_MINIMAL)
-            cache.writerow([location_name, str(coords[0]), str(coords[1])])
+        row = io.StringIO()
+        csv.writer(row, delimiter = ',', quoting = csv.QUOTE_MINIMAL).writerow(
+            [location_name, str(coords[0]), str(coords[1])]
+        )
+        # One write in append mode, such that rows of concurrent workers do not interleave.
+        cache_fd = os.open(self.__cache_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(cache_fd, row.getvalue().encode('utf-8'))
+        finally:
+            os.close(cache_fd)
 
 
     def __search_cache(self, location: str) -> Union[Tuple[float, float], None]:
@@ -104,11 +125,13 @@ class Coordinates:
             location = location.lower()
             cache = csv.reader(cache_file, delimiter = ',')
             for line in cache:
-                name = line[0]
-                lat = float(line[1])
-                lon = float(line[2])
-                if name == location:
-                    return lat, lon
+                # Skips a row which another worker is still appending.
+                if len(line) != 3 or line[0] != location:
+                    continue
+                try:
+                    return float(line[1]), float(line[2])
+                except ValueError:
+                    continue
             
         return None
 
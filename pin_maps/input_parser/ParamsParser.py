@@ -4,6 +4,9 @@ import json
 import os
 from copy import deepcopy
 # Internal modules
+from caching.AssetManager import AssetManager
+from caching.NegativeCache import NegativeCache
+from complete_image_transforms.Superscale import Superscale
 from input_parser.Coordinates import Coordinates
 # External modules
 from PIL import ImageFont
@@ -12,13 +15,22 @@ from typing import Union, List, Tuple
 
 
 class ParamsParser:
-    """Class that makes it easy to retrieve parsed parameters."""
+    """Class that makes it easy to retrieve parsed parameters.
+
+    Args:
+        args (Union[None, List[str]], optional): The parameters, e.g. of a queued
+        job. Defaults to None, the command line.
+    """
 
     __standard_head_font = os.path.join('data', 'fonts', 'grandhotel.ttf')
     __standard_main_font = os.path.join('data', 'fonts', 'josefin-sans-regular.ttf')
     __standard_marker_name = 'heraldry'
+    # Parameters which do not change the poster itself.
+    __non_poster_args = ['towns', 'memory_budget', 'output', 'nocache', 'retry_failed', 'derivative']
+    output_formats = ['png', 'webp', 'jpeg', 'tiff', 'pdf', 'svg']
+    vector_formats = ['pdf', 'svg']
 
-    def __init__(self):
+    def __init__(self, args: Union[None, List[str]] = None):
         # Load configuration file.
         with open('config.json', 'r') as config_file:
             self.__config = json.load(config_file)
@@ -86,8 +98,68 @@ class ParamsParser:
             action = 'store_true',
             help = "Set, if you want to upscale the image by the factor 4."
         )
+        parser.add_argument(
+            '--superscale-budget',
+            type = float,
+            help = 'Seconds the upscaling may take. Implies --superscale. The best model ' +
+            'expected to finish in time on this host is chosen, interpolation if none is fast enough.'
+        )
+        parser.add_argument(
+            '--native-composition',
+            action = 'store_true',
+            help = 'With superscaling, only the map is upscaled; text, frame and logo are ' +
+            'drawn at the upscaled resolution right away.'
+        )
+        parser.add_argument(
+            '--memory-budget',
+            type = float,
+            help = 'Memory budget in megabytes. If the projected peak memory of the poster ' +
+            'exceeds it, strategies with a lower footprint are used.'
+        )
+        parser.add_argument(
+            '--preview',
+            action = 'store_true',
+            help = 'Renders a fast low-resolution preview with the same layout and without superscaling.'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            type = str,
+            help = 'The path of the poster. Defaults to a new file per run in the output directory.'
+        )
+        parser.add_argument(
+            '--format',
+            type = str,
+            choices = self.output_formats,
+            default = 'png',
+            help = 'The file format of the poster. Lossless WebP and JPEG (e.g. for proofs) ' +
+            'are available besides PNG and tiled TIFF. PDF and SVG keep text and frame as vector graphics.'
+        )
+        parser.add_argument(
+            '--quality',
+            type = int,
+            help = 'Compression level of PNG and TIFF (0-9), effort of WebP (0-100) ' +
+            'or quality of JPEG (1-100), ignored by PDF and SVG. Defaults to the default of the format.'
+        )
 
-        self.__parsed_args = vars(parser.parse_args())
+        parser.add_argument(
+            '--nocache',
+            action = 'store_true',
+            help = 'Renders every stage anew instead of reusing the results of earlier runs.'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action = 'store_true',
+            help = 'Looks up towns again which recently had no coordinates or coat of arms.'
+        )
+        parser.add_argument(
+            '--derivative',
+            type = str,
+            action = 'append',
+            help = 'A smaller copy of the poster written next to it, as WIDTH:FORMAT[:QUALITY], ' +
+            'e.g. 1200:jpeg:85. Can be given several times.'
+        )
+
+        self.__parsed_args = vars(parser.parse_args(args))
         print(self.__parsed_args)
 
         # COUNTRY POSSIBILITY COUNTRY
@@ -113,6 +185,13 @@ class ParamsParser:
         if (marker not in possib_markers) and (marker is not None):
             raise ValueError(f'Marker {marker} not available; available are: {", ".join(possib_markers)}.')
         
+        # DERIVATIVES
+        self.derivatives = []
+        for derivative in self.__parsed_args['derivative'] or []:
+            self.derivatives.append(self.__parse_derivative(derivative))
+        if self.derivatives and self.vector_output_wanted:
+            raise ValueError('Derivatives are made of raster posters, not of PDF or SVG.')
+
         # PARSING ALL POSITIONS
         name_pins = self.__parsed_args['towns']
         if name_pins is not None:
@@ -120,10 +199,14 @@ class ParamsParser:
             name_pins = [town.replace(sep, '').lstrip().strip() for town in name_pins.split(sep)]
         else:
             name_pins = []
+        if self.__parsed_args['retry_failed']:
+            self.failure_cache = NegativeCache(ttl_seconds = 0)
+        else:
+            self.failure_cache = NegativeCache(ttl_seconds = self.__config['general']['failure-cache-hours'] * 3600)
         self.locations = []
         for location in name_pins:
             try:
-                self.locations.append(Coordinates(location))
+                self.locations.append(Coordinates(location, self.failure_cache))
             except NameError as e:
                 print(str(e))    
                 continue
@@ -136,12 +219,35 @@ class ParamsParser:
         self.border_wanted = not self.__parsed_args['noborder']
 
 
+    def __parse_derivative(self, derivative: str) -> Tuple[int, str, Union[int, None]]:
+        """Parses the target of a derivative.
+
+        Args:
+            derivative (str): The target as WIDTH:FORMAT[:QUALITY].
+
+        Raises:
+            ValueError: If the target is malformed or the format is not a raster format.
+
+        Returns:
+            Tuple[int, str, Union[int, None]]: Width in px, format and quality, if given.
+        """
+        parts = derivative.split(':')
+        raster_formats = [
+            output_format for output_format in self.output_formats if output_format not in self.vector_formats
+        ]
+        if len(parts) not in [2, 3] or not all(part.isdigit() for part in parts[::2]) or int(parts[0]) < 1:
+            raise ValueError(f'Derivative "{derivative}" is not of the form WIDTH:FORMAT[:QUALITY].')
+        if parts[1] not in raster_formats:
+            raise ValueError(f'Derivative format "{parts[1]}" not available; available are: {", ".join(raster_formats)}.')
+
+        return int(parts[0]), parts[1], int(parts[2]) if len(parts) == 3 else None
+
+
     @property
     def marker_symbol(self):
         available_markers = self.__config['markers']
         try:
-            marker_name = available_markers[self.__parsed_args['marker']]
-            return os.path.join('data', 'img', marker_name)
+            return AssetManager.shared().resolve('markers', self.__parsed_args['marker'])
         except KeyError:
             return available_markers[self.__standard_marker_name]
 
@@ -159,8 +265,7 @@ class ParamsParser:
     @property
     def head_font_path(self) -> str:
         try:
-            font_name = self.__config['fonts'][self.__parsed_args['fonts'][0]]
-            return os.path.join('data', 'fonts', font_name)
+            return AssetManager.shared().resolve('fonts', self.__parsed_args['fonts'][0])
         except TypeError:
             return self.__standard_head_font
 
@@ -168,8 +273,7 @@ class ParamsParser:
     @property
     def main_font_path(self) -> str:
         try:
-            font_name = self.__config['fonts'][self.__parsed_args['fonts'][1]]
-            return os.path.join('data', 'fonts', font_name)
+            return AssetManager.shared().resolve('fonts', self.__parsed_args['fonts'][1])
         except TypeError:
             return self.__standard_main_font
 
@@ -183,6 +287,17 @@ class ParamsParser:
         return country_data
 
 
+    @property
+    def wallpaper(self) -> dict:
+        """The wallpaper of the country, currently the first one configured.
+
+        Returns:
+            dict: File name, extent and whether the wallpaper is shaped by the outline of the country.
+        """
+        wallpapers = self.__config['countries'][self.__parsed_args['country']]['wallpapers']
+        return next(iter(wallpapers.values()))
+
+
     @property
     def logo_wanted(self) -> bool:
         return not self.__parsed_args['nologo']
@@ -190,24 +305,154 @@ class ParamsParser:
 
     @property
     def superscale_wanted(self) -> bool:
-        return self.__parsed_args['superscale']
+        superscale = self.__parsed_args['superscale'] or self.superscale_budget is not None
+        return superscale and not self.preview_wanted
+
+
+    @property
+    def superscale_factor(self) -> int:
+        """The factor of the superscaling, 1 if it is not wanted.
+
+        Returns:
+            int: The factor.
+        """
+        return Superscale.scale_factor if self.superscale_wanted else 1
+
+
+    @property
+    def superscale_budget(self) -> Union[float, None]:
+        """The seconds the upscaling may take.
+
+        Returns:
+            Union[float, None]: The budget or None, if the default model is used regardless of time.
+        """
+        return self.__parsed_args['superscale_budget']
+
+
+    @property
+    def native_composition_wanted(self) -> bool:
+        # Vector posters are drawn at their final size, only the map can be upscaled.
+        native_composition = self.__parsed_args['native_composition'] or self.vector_output_wanted
+        return native_composition and self.superscale_wanted
+
+
+    @property
+    def preview_wanted(self) -> bool:
+        return self.__parsed_args['preview']
+
+
+    @property
+    def render_scale(self) -> float:
+        """The factor by which all sizes in pixels are scaled, below 1 for previews.
+
+        Returns:
+            float: The factor.
+        """
+        return self.__config['general']['preview-scale'] if self.preview_wanted else 1.0
+
+
+    @property
+    def composition_scale(self) -> float:
+        """The factor by which the sizes of text, frame and logo are scaled. It
+        includes the superscaling if they are drawn at the upscaled resolution.
+
+        Returns:
+            float: The factor.
+        """
+        return self.render_scale * (self.superscale_factor if self.native_composition_wanted else 1)
+
+
+    @property
+    def cache_wanted(self) -> bool:
+        return not self.__parsed_args['nocache']
+
+
+    @property
+    def memory_budget(self) -> Union[float, None]:
+        """The memory budget in megabytes.
+
+        Returns:
+            Union[float, None]: The budget or None, if there is no budget.
+        """
+        return self.__parsed_args['memory_budget']
+
+
+    @property
+    def poster_spec(self) -> dict:
+        """Everything given on the command line that the poster depends on,
+        in a JSON serializable form. The towns are replaced by the resolved
+        locations.
+
+        Returns:
+            dict: The specification of the poster.
+        """
+        spec = {name: value for name, value in self.__parsed_args.items() if name not in self.__non_poster_args}
+        spec['locations'] = [(location.name, location.coords) for location in self.locations]
+
+        return spec
+
+
+    @property
+    def output_path(self) -> Union[str, None]:
+        """The path of the poster given on the command line.
+
+        Returns:
+            Union[str, None]: The path or None, if none was given.
+        """
+        return self.__parsed_args['output']
+
+
+    @property
+    def output_format(self) -> str:
+        """The file format of the poster, one of `output_formats`.
+
+        Returns:
+            str: The format.
+        """
+        return self.__parsed_args['format']
+
+
+    @property
+    def vector_output_wanted(self) -> bool:
+        return self.output_format in self.vector_formats
+
+
+    @property
+    def output_quality(self) -> Union[int, None]:
+        """The compression level, effort or quality of the output format.
+
+        Returns:
+            Union[int, None]: The value or None for the default of the format.
+        """
+        return self.__parsed_args['quality']
 
 
     @property
     def added_frame_px(self) -> int:
-        return self.__config['general']['added-frame-px']
+        return round(self.__config['general']['added-frame-px'] * self.composition_scale)
 
 
     @property
     def height_text_space(self) -> int:
-        return self.__config['general']['height-text-space']
+        return round(self.__config['general']['height-text-space'] * self.composition_scale)
 
     
     @property
     def undertitle_line_spacing(self) -> int:
-        return self.__config['general']['undertitle-line-spacing']
+        return round(self.__config['general']['undertitle-line-spacing'] * self.composition_scale)
 
     
+    @property
+    def map_width(self) -> int:
+        """The width of the map at full resolution. The map applies the render
+        scale itself (see `Map`).
+
+        Returns:
+            int: The width in px.
+        """
+        return self.__config['general']['map-width']
+
+
     @property
     def logo_height(self) -> int:
         """The height of the logo at the lower image end.
@@ -215,4 +460,4 @@ class ParamsParser:
         Returns:
             int: The height.
         """
-        return self.__config['general']['logo-height']
+        return round(self.__config['general']['logo-height'] * self.composition_scale)
@@ -0,0 +1,120 @@
+# Python libraries
+from concurrent.futures import Future, ThreadPoolExecutor
+# Internal modules
+from output_writers.BandWriter import BandWriter
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Any, Callable, Iterable, List, Tuple
+
+class BackgroundEncoder:
+    """Encodes posters in background threads, e.g. a poster and its smaller
+    copies at the same time. An encoder kept alive across posters lets the
+    next job start while the previous poster is still being compressed (see
+    `start_poster` and the workers of the render queue).
+
+    Args:
+    -----
+        max_jobs (int, optional): Number of posters encoded at the same time. Defaults to 1.
+    """
+
+    def __init__(self, max_jobs: int = 1):
+        self.__executor = ThreadPoolExecutor(max_workers = max_jobs)
+        # Waits for the files of a poster and finishes it, see `after`.
+        self.__finisher = ThreadPoolExecutor(max_workers = 1)
+        self.__futures: List[Tuple[str, Future]] = []
+
+
+    def submit(self, writer: PosterWriter, img: Image.Image, path: str) -> Future:
+        """Encodes the complete poster in the background.
+
+        Args:
+        -----
+            writer (PosterWriter): The codec.
+            img (Image.Image): The poster. It must not be changed afterwards.
+            path (str): The path of the written file.
+
+        Returns:
+        --------
+            Future: Finishes when the file is written.
+        """
+        future = self.__executor.submit(writer.write, img, path)
+        self.__futures.append((path, future))
+        return future
+
+
+    def submit_bands(
+        self,
+        band_writer: BandWriter,
+        bands: Iterable[Image.Image],
+        size: Tuple[int, int],
+        path: str
+    ) -> Future:
+        """Encodes the poster from row bands in the background.
+
+        Args:
+        -----
+            band_writer (BandWriter): The codec.
+            bands (Iterable[Image.Image]): The bands from top to bottom.
+            size (Tuple[int, int]): Width and height of the complete poster.
+            path (str): The path of the written file.
+
+        Returns:
+        --------
+            Future: Finishes when the file is written.
+        """
+        future = self.__executor.submit(band_writer.write, bands, size, path)
+        self.__futures.append((path, future))
+        return future
+
+
+    def after(self, paths: List[str], finish: Callable[[], Any]) -> Future:
+        """Calls `finish` in the background once the posters are written, e.g.
+        to cache them. Their errors are raised by the returned future only,
+        not by `wait`.
+
+        Args:
+        -----
+            paths (List[str]): The paths of submitted posters.
+            finish (Callable[[], Any]): Called if all of them were written.
+
+        Returns:
+        --------
+            Future: Finishes with the result of `finish`.
+        """
+        futures = [future for path, future in self.__futures if path in paths]
+        self.__futures = [(path, future) for path, future in self.__futures if path not in paths]
+
+        def wait_and_finish() -> Any:
+            for future in futures:
+                future.result()
+            return finish()
+
+        return self.__finisher.submit(wait_and_finish)
+
+
+    def wait(self) -> List[str]:
+        """Waits until all submitted posters are written.
+
+        Raises:
+        -------
+            Exception: The first error raised while encoding.
+
+        Returns:
+        --------
+            List[str]: The paths of the written posters.
+        """
+        futures, self.__futures = self.__futures, []
+        for _, future in futures:
+            future.result()
+
+        return [path for path, _ in futures]
+
+
+    def shutdown(self) -> None:
+        """Waits for all posters and stops the background threads."""
+        self.wait()
+        self.__executor.shutdown()
+        # The errors of finished posters are raised by the futures of `after`.
+        self.__finisher.shutdown()
@@ -0,0 +1,135 @@
+# Python libraries
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+# External modules
+from PIL import Image
+# Typing
+from typing import BinaryIO, Iterable, Tuple
+
+class BandWriter(ABC):
+    """Abstract base class for writers which encode an image from row bands
+    without ever holding the complete image. The methods `_begin`,
+    `_write_band` and `_finish` need to be implemented.
+
+    The bands are produced in a background thread while the bands produced
+    before are compressed, so that production (e.g. upscaling) and compression
+    overlap. At most `queue_size` bands wait for compression at any time.
+
+    Args:
+    -----
+        queue_size (int, optional): Number of bands buffered between producer
+        and encoder. Defaults to 2.
+    """
+
+    available_modes = {'RGB': 3, 'RGBA': 4}
+
+    def __init__(self, queue_size: int = 2):
+        super().__init__()
+        self.queue_size = queue_size
+        self.size = None
+        self.mode = None
+
+
+    def write(self, bands: Iterable[Image.Image], size: Tuple[int, int], path: str, mode: str = 'RGB') -> None:
+        """Encodes the bands into the file at `path`. The file only appears
+        once it was written completely.
+
+        Args:
+        -----
+            bands (Iterable[Image.Image]): The bands from top to bottom. All
+            need to have the full width of the image.
+            size (Tuple[int, int]): Width and height of the complete image.
+            path (str): The path of the written file.
+            mode (str, optional): The mode of the image. Defaults to 'RGB'.
+
+        Raises:
+        -------
+            ValueError: The mode is not supported or the bands do not match `size`.
+        """
+        if mode not in self.available_modes:
+            raise ValueError(f'Mode {mode} unavailable. Available: {", ".join(self.available_modes)}.')
+        self.size = size
+        self.mode = mode
+
+        band_queue = queue.Queue(maxsize = self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target = self.__produce, args = (bands, band_queue, stop), daemon = True)
+        producer.start()
+
+        partial_path = path + '.part'
+        try:
+            with open(partial_path, 'wb') as out_file:
+                self._begin(out_file)
+                written_rows = 0
+                while True:
+                    band = band_queue.get()
+                    if band is None:
+                        break
+                    if isinstance(band, BaseException):
+                        raise band
+                    if band.width != size[0]:
+                        raise ValueError(f'Band width {band.width} does not match image width {size[0]}.')
+
+                    self._write_band(out_file, band.convert(mode))
+                    written_rows += band.height
+
+                if written_rows != size[1]:
+                    raise ValueError(f'Bands contain {written_rows} rows, image height is {size[1]}.')
+                self._finish(out_file)
+
+            os.replace(partial_path, path)
+        finally:
+            # Unblock the producer, if encoding stopped early.
+            stop.set()
+            while producer.is_alive():
+                try:
+                    band_queue.get(timeout = 0.1)
+                except queue.Empty:
+                    pass
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+
+    @staticmethod
+    def __produce(bands: Iterable[Image.Image], band_queue: queue.Queue, stop: threading.Event) -> None:
+        """Produces the bands and hands them to the encoder. Ends with None or
+        the exception raised while producing.
+
+        Args:
+        -----
+            bands (Iterable[Image.Image]): The bands.
+            band_queue (queue.Queue): The queue read by the encoder.
+            stop (threading.Event): Set by the encoder, if it stopped early.
+        """
+        try:
+            for band in bands:
+                if stop.is_set():
+                    return
+                band_queue.put(band)
+            band_queue.put(None)
+        except BaseException as e:
+            band_queue.put(e)
+
+
+    @abstractmethod
+    def _begin(self, out_file: BinaryIO) -> None:
+        """Writes everything in front of the image data."""
+        pass
+
+
+    @abstractmethod
+    def _write_band(self, out_file: BinaryIO, band: Image.Image) -> None:
+        """Encodes and writes the next band."""
+        pass
+
+
+    @abstractmethod
+    def _finish(self, out_file: BinaryIO) -> None:
+        """Writes everything after the image data."""
+        pass
+
+
+    def __repr__(self):
+        return f'BandWriter ({type(self).__name__})'
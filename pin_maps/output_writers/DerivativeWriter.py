@@ -0,0 +1,70 @@
+# Python libraries
+import os
+# Internal modules
+from output_writers.BackgroundEncoder import BackgroundEncoder
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Iterator, List, Tuple
+
+class DerivativeWriter:
+    """Writes smaller copies of a poster, e.g. for a web shop and as a
+    thumbnail, from the poster in memory instead of rendering it again.
+
+    The copies are made from the widest to the narrowest, each from the one
+    before: halved with a box filter as long as that one is at least twice as
+    wide, then resized once with Lanczos. Every copy is encoded in the
+    background as soon as it exists.
+
+    Args:
+    -----
+        targets (List[Tuple[int, PosterWriter]]): Width in px and writer of every copy.
+    """
+
+    def __init__(self, targets: List[Tuple[int, PosterWriter]]):
+        self.targets = sorted(targets, key = lambda target: target[0], reverse = True)
+
+
+    def downscale(self, img: Image.Image) -> Iterator[Tuple[Image.Image, PosterWriter]]:
+        """Makes the copies.
+
+        Args:
+        -----
+            img (Image.Image): The poster.
+
+        Yields:
+        -------
+            Tuple[Image.Image, PosterWriter]: Every copy with its writer, from the widest to the narrowest.
+        """
+        source = img
+        for width, writer in self.targets:
+            while source.width >= 2 * width:
+                source = source.reduce(2)
+            size = (width, max(round(img.height * width / img.width), 1))
+            # A copy, since the poster itself may still be encoded.
+            source = source.resize(size, Image.LANCZOS) if source.size != size else source.copy()
+            yield source, writer
+
+
+    def submit(self, encoder: BackgroundEncoder, img: Image.Image, path: str) -> List[str]:
+        """Makes the copies and encodes them in the background.
+
+        Args:
+        -----
+            encoder (BackgroundEncoder): The encoder of the poster.
+            img (Image.Image): The poster.
+            path (str): The path of the poster; the copies are written next to it.
+
+        Returns:
+        --------
+            List[str]: The paths of the copies, `<poster>-<width>.<extension>`.
+        """
+        root, _ = os.path.splitext(path)
+        paths = []
+        for derivative, writer in self.downscale(img):
+            derivative_path = f'{root}-{derivative.width}.{writer.extension}'
+            encoder.submit(writer, derivative, derivative_path)
+            paths.append(derivative_path)
+
+        return paths
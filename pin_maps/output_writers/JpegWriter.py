@@ -0,0 +1,25 @@
+# Internal modules
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+
+class JpegWriter(PosterWriter):
+    """Writes high quality JPEGs without chroma subsampling, e.g. for proofs.
+
+    Args:
+    -----
+        quality (int, optional): The JPEG quality from 1 to 100. Defaults to 95.
+    """
+
+    extension = 'jpg'
+
+    def __init__(self, quality: int = 95):
+        super().__init__()
+        if not 1 <= quality <= 100:
+            raise ValueError(f'JPEG quality {quality} is not between 1 and 100.')
+        self.quality = quality
+
+
+    # Override from PosterWriter
+    def encode(self, img: Image.Image, path: str) -> None:
+        img.convert('RGB').save(path, 'JPEG', quality = self.quality, subsampling = 0)
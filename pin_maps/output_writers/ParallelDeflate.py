@@ -0,0 +1,136 @@
+# Python libraries
+import os
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+# Typing
+from typing import Deque, Union
+
+class ParallelDeflate:
+    """Creates a zlib stream by deflating chunks of the data on several threads,
+    similar to pigz. Each chunk is primed with the last 32 KiB of the chunk
+    before it and ends on a byte boundary (sync flush), so the compressed
+    chunks can simply be concatenated. zlib releases the GIL while compressing.
+
+    Without a number of threads, all compressors of the process share one pool
+    with a thread per CPU, so posters encoded at the same time, e.g. a poster
+    and its derivatives, do not start a pool each.
+
+    Args:
+    -----
+        compress_level (int, optional): The zlib compression level. Defaults to 6.
+        threads (Union[None, int], optional): Number of threads of an own pool. Defaults to None, the shared pool.
+        chunk_size (int, optional): Bytes per independently compressed chunk. Defaults to 1 MiB.
+    """
+
+    __window_size = 2 ** 15
+    __zlib_header = b'\x78\x9c'
+    __shared_executor: Union[None, ThreadPoolExecutor] = None
+    __shared_pid: Union[None, int] = None
+    __shared_lock = threading.Lock()
+
+    def __init__(self, compress_level: int = 6, threads: Union[None, int] = None, chunk_size: int = 2 ** 20):
+        self.compress_level = compress_level
+        self.threads = (os.cpu_count() or 1) if threads is None else threads
+        self.chunk_size = chunk_size
+        self.__own_executor = threads is not None
+        self.__executor = ThreadPoolExecutor(max_workers = self.threads) if threads is not None else self.__shared()
+        self.__pending: Deque[Future] = deque()
+        self.__dictionary = b''
+        self.__checksum = zlib.adler32(b'')
+        self.__header_written = False
+
+
+    def compress(self, data: bytes) -> bytes:
+        """Hands data to the compressor.
+
+        Args:
+        -----
+            data (bytes): The next part of the uncompressed stream.
+
+        Returns:
+        --------
+            bytes: The compressed output that is already finished, in order.
+        """
+        for chunk_start in range(0, len(data), self.chunk_size):
+            chunk = data[chunk_start:chunk_start + self.chunk_size]
+            self.__pending.append(self.__executor.submit(
+                self.__deflate_chunk, chunk, self.__dictionary, self.compress_level
+            ))
+            self.__checksum = zlib.adler32(chunk, self.__checksum)
+            self.__dictionary = (self.__dictionary + chunk)[-self.__window_size:]
+
+        # Limit the number of chunks waiting in memory.
+        output = [self.__take_header()]
+        while self.__pending and (self.__pending[0].done() or len(self.__pending) > 2 * self.threads):
+            output.append(self.__pending.popleft().result())
+
+        return b''.join(output)
+
+
+    def flush(self) -> bytes:
+        """Finishes the stream. The compressor cannot be used afterwards.
+
+        Returns:
+        --------
+            bytes: The remaining compressed output including the end of the stream.
+        """
+        output = [self.__take_header()]
+        while self.__pending:
+            output.append(self.__pending.popleft().result())
+        if self.__own_executor:
+            self.__executor.shutdown()
+
+        # An empty final block and the checksum of the uncompressed data end the stream.
+        final_block = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15).flush(zlib.Z_FINISH)
+        output.append(final_block)
+        output.append(self.__checksum.to_bytes(4, 'big'))
+
+        return b''.join(output)
+
+
+    @classmethod
+    def __shared(cls) -> ThreadPoolExecutor:
+        """The pool shared by the compressors of the process, started at first use."""
+        with cls.__shared_lock:
+            # A forked worker must not use the pool of its parent, whose threads were not forked.
+            if cls.__shared_executor is None or cls.__shared_pid != os.getpid():
+                cls.__shared_executor = ThreadPoolExecutor(max_workers = os.cpu_count() or 1)
+                cls.__shared_pid = os.getpid()
+            return cls.__shared_executor
+
+
+    def __take_header(self) -> bytes:
+        """Returns the zlib header the first time it is called.
+
+        Returns:
+        --------
+            bytes: The header or nothing.
+        """
+        if self.__header_written:
+            return b''
+        self.__header_written = True
+        return self.__zlib_header
+
+
+    @staticmethod
+    def __deflate_chunk(chunk: bytes, dictionary: bytes, compress_level: int) -> bytes:
+        """Deflates a chunk into raw deflate blocks ending on a byte boundary.
+
+        Args:
+        -----
+            chunk (bytes): The uncompressed chunk.
+            dictionary (bytes): The data in front of the chunk.
+            compress_level (int): The zlib compression level.
+
+        Returns:
+        --------
+            bytes: The compressed chunk.
+        """
+        if dictionary:
+            compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15, zdict = dictionary)
+        else:
+            compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+
+        return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
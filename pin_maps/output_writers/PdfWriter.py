@@ -0,0 +1,19 @@
+# Internal modules
+from draw.VectorPoster import VectorPoster
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Union
+
+class PdfWriter(PosterWriter):
+    """Writes PDFs with the text as vector graphics in embedded TrueType fonts
+    and the map and coats of arms at their own resolution (see `VectorPoster`).
+    A raster poster is embedded as one image."""
+
+    extension = 'pdf'
+
+    # Override from PosterWriter
+    def encode(self, img: Union[Image.Image, VectorPoster], path: str) -> None:
+        poster = img if isinstance(img, VectorPoster) else VectorPoster.from_image(img)
+        poster.save(path, 'pdf')
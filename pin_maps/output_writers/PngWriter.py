@@ -0,0 +1,37 @@
+# Internal modules
+from output_writers.PosterWriter import PosterWriter
+from output_writers.StreamingPngWriter import StreamingPngWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Union
+
+class PngWriter(PosterWriter):
+    """Writes PNGs which are deflated on several threads.
+
+    Args:
+    -----
+        compress_level (int, optional): The zlib compression level from 0 to 9. Defaults to 6.
+        threads (Union[None, int], optional): Number of compression threads. 
+        Defaults to the pool shared by all writers, a thread per CPU.
+    """
+
+    extension = 'png'
+
+    def __init__(self, compress_level: int = 6, threads: Union[None, int] = None):
+        super().__init__()
+        if not 0 <= compress_level <= 9:
+            raise ValueError(f'PNG compression level {compress_level} is not between 0 and 9.')
+        self.compress_level = compress_level
+        self.threads = threads
+
+
+    # Override from PosterWriter
+    def band_writer(self) -> StreamingPngWriter:
+        return StreamingPngWriter(self.compress_level, self.threads)
+
+
+    # Override from PosterWriter
+    def encode(self, img: Image.Image, path: str) -> None:
+        mode = 'RGBA' if 'A' in img.getbands() else 'RGB'
+        self.band_writer().write(self._bands(img), img.size, path, mode)
@@ -0,0 +1,79 @@
+# Python libraries
+import os
+from abc import ABC, abstractmethod
+# Internal modules
+from output_writers.BandWriter import BandWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Iterator, Union
+
+class PosterWriter(ABC):
+    """Abstract base class for the codecs of the finished poster. The
+    `encode(self, img: Image.Image, path: str) -> None` method needs to be 
+    implemented. Codecs that can encode row bands also override `band_writer`.
+    """
+
+    extension = None
+
+    def __init__(self):
+        super().__init__()
+
+
+    @abstractmethod
+    def encode(self, img: Image.Image, path: str) -> None:
+        """Encodes the image into the file at `path`."""
+        pass
+
+
+    def band_writer(self) -> Union[BandWriter, None]:
+        """The writer which encodes the poster from row bands.
+
+        Returns:
+        --------
+            Union[BandWriter, None]: The writer or None, if the codec needs the complete image.
+        """
+        return None
+
+
+    def write(self, img: Image.Image, path: str) -> None:
+        """Encodes the image such that the file only appears once it is complete.
+
+        Args:
+        -----
+            img (Image.Image): The poster.
+            path (str): The path of the written file.
+        """
+        partial_path = path + '.part'
+        try:
+            self.encode(img, partial_path)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+
+    @staticmethod
+    def _bands(img: Image.Image, band_height: int = 256) -> Iterator[Image.Image]:
+        """Splits the image into row bands, so that band writers never have 
+        to copy the complete image at once.
+
+        Args:
+        -----
+            img (Image.Image): The image.
+            band_height (int, optional): Rows per band. Defaults to 256.
+
+        Yields:
+        -------
+            Image.Image: The bands from top to bottom.
+        """
+        for band_start in range(0, img.height, band_height):
+            yield img.crop((0, band_start, img.width, min(band_start + band_height, img.height)))
+
+
+    def __call__(self, img: Image.Image, path: str) -> None:
+        self.write(img, path)
+
+
+    def __repr__(self):
+        return f'PosterWriter ({type(self).__name__})'
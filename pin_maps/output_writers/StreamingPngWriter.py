@@ -0,0 +1,120 @@
+# Python libraries
+import struct
+import zlib
+# Internal modules
+from output_writers.BandWriter import BandWriter
+from output_writers.ParallelDeflate import ParallelDeflate
+# External modules
+import numpy as np
+from PIL import Image
+# Typing
+from typing import BinaryIO, Union
+
+class StreamingPngWriter(BandWriter):
+    """Writes a PNG band by band. Every row is filtered with the PNG "Up"
+    filter against the row above, which continues across band borders, and
+    deflated into one zlib stream split into IDAT chunks. The deflating is 
+    spread over several threads (see `ParallelDeflate`).
+
+    Args:
+    -----
+        compress_level (int, optional): The zlib compression level. Defaults to 6.
+        threads (Union[None, int], optional): Number of compression threads. 
+        Defaults to the pool shared by all writers, a thread per CPU.
+        queue_size (int, optional): Number of bands buffered between producer
+        and encoder. Defaults to 2.
+    """
+
+    __signature = b'\x89PNG\r\n\x1a\n'
+    __color_types = {'RGB': 2, 'RGBA': 6}
+    __up_filter = 2
+
+    def __init__(self, compress_level: int = 6, threads: Union[None, int] = None, queue_size: int = 2):
+        super().__init__(queue_size)
+        self.compress_level = compress_level
+        self.threads = threads
+        self.__compressor = None
+        self.__last_row = None
+
+
+    @staticmethod
+    def write_chunk(out_file: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+        """Writes a PNG chunk including length and checksum.
+
+        Args:
+        -----
+            out_file (BinaryIO): The file written to.
+            chunk_type (bytes): The four letter type of the chunk, e.g. b'IDAT'.
+            data (bytes): The content of the chunk.
+        """
+        out_file.write(struct.pack('>I', len(data)))
+        out_file.write(chunk_type)
+        out_file.write(data)
+        out_file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+    @classmethod
+    def header(cls, width: int, height: int, mode: str) -> bytes:
+        """Creates the signature and the IHDR chunk.
+
+        Args:
+        -----
+            width (int): Width of the image.
+            height (int): Height of the image.
+            mode (str): 'RGB' or 'RGBA'.
+
+        Returns:
+        --------
+            bytes: Signature and IHDR chunk.
+        """
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, cls.__color_types[mode], 0, 0, 0)
+        chunk = struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr
+        return cls.__signature + chunk + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+
+
+    @classmethod
+    def filter_rows(cls, rows: np.ndarray, row_above: np.ndarray) -> bytes:
+        """Applies the "Up" filter to the rows and prepends the filter type to
+        each of them.
+
+        Args:
+        -----
+            rows (np.ndarray): Rows of shape (height, width * channels), uint8.
+            row_above (np.ndarray): The row above the first row (zeros for the
+            first row of the image).
+
+        Returns:
+        --------
+            bytes: The filtered scanlines.
+        """
+        previous_rows = np.concatenate([row_above[np.newaxis], rows[:-1]])
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype = np.uint8)
+        filtered[:, 0] = cls.__up_filter
+        np.subtract(rows, previous_rows, out = filtered[:, 1:])
+
+        return filtered.tobytes()
+
+
+    # Override from BandWriter
+    def _begin(self, out_file: BinaryIO) -> None:
+        width, height = self.size
+        out_file.write(self.header(width, height, self.mode))
+        self.__compressor = ParallelDeflate(self.compress_level, self.threads)
+        self.__last_row = np.zeros(width * self.available_modes[self.mode], dtype = np.uint8)
+
+
+    # Override from BandWriter
+    def _write_band(self, out_file: BinaryIO, band: Image.Image) -> None:
+        rows = np.asarray(band).reshape(band.height, -1)
+        compressed = self.__compressor.compress(self.filter_rows(rows, self.__last_row))
+        self.__last_row = rows[-1].copy()
+        if compressed:
+            self.write_chunk(out_file, b'IDAT', compressed)
+
+
+    # Override from BandWriter
+    def _finish(self, out_file: BinaryIO) -> None:
+        self.write_chunk(out_file, b'IDAT', self.__compressor.flush())
+        self.write_chunk(out_file, b'IEND', b'')
+        self.__compressor = None
+        self.__last_row = None
@@ -0,0 +1,148 @@
+# Python libraries
+import struct
+import zlib
+# Internal modules
+from output_writers.BandWriter import BandWriter
+# External modules
+import numpy as np
+from PIL import Image
+# Typing
+from typing import BinaryIO, List, Tuple
+
+class StreamingTiffWriter(BandWriter):
+    """Writes a tiled, deflate compressed TIFF band by band. Incoming rows are
+    collected until a complete row of tiles is available, which is then
+    compressed and written. The directory with the tile offsets follows the
+    image data at the end of the file.
+
+    Args:
+    -----
+        tile_size (int, optional): Width and height of the tiles, a multiple of 16. Defaults to 256.
+        compress_level (int, optional): The zlib compression level. Defaults to 6.
+        queue_size (int, optional): Number of bands buffered between producer
+        and encoder. Defaults to 2.
+    """
+
+    # TIFF field types
+    __short = 3
+    __long = 4
+    # Compression "Adobe Deflate", predictor "horizontal differencing"
+    __deflate = 8
+    __horizontal_predictor = 2
+
+    def __init__(self, tile_size: int = 256, compress_level: int = 6, queue_size: int = 2):
+        super().__init__(queue_size)
+        if tile_size % 16 != 0:
+            raise ValueError(f'Tile size {tile_size} is not a multiple of 16.')
+        self.tile_size = tile_size
+        self.compress_level = compress_level
+        self.__pending_rows = None
+        self.__tile_offsets = []
+        self.__tile_byte_counts = []
+
+
+    # Override from BandWriter
+    def _begin(self, out_file: BinaryIO) -> None:
+        # Byte order, magic number and the offset of the directory which is patched in the end.
+        out_file.write(b'II' + struct.pack('<HI', 42, 0))
+        channels = self.available_modes[self.mode]
+        self.__pending_rows = np.empty((0, self.size[0], channels), dtype = np.uint8)
+        self.__tile_offsets = []
+        self.__tile_byte_counts = []
+
+
+    # Override from BandWriter
+    def _write_band(self, out_file: BinaryIO, band: Image.Image) -> None:
+        self.__pending_rows = np.concatenate([self.__pending_rows, np.asarray(band)])
+        while self.__pending_rows.shape[0] >= self.tile_size:
+            self.__write_tile_row(out_file, self.__pending_rows[:self.tile_size])
+            self.__pending_rows = self.__pending_rows[self.tile_size:]
+
+
+    # Override from BandWriter
+    def _finish(self, out_file: BinaryIO) -> None:
+        if self.__pending_rows.shape[0] > 0:
+            self.__write_tile_row(out_file, self.__pending_rows)
+        self.__pending_rows = None
+
+        # The directory has to start at a word boundary.
+        if out_file.tell() % 2 == 1:
+            out_file.write(b'\x00')
+        directory_offset = out_file.tell()
+        out_file.write(self.__directory(directory_offset))
+        out_file.seek(4)
+        out_file.write(struct.pack('<I', directory_offset))
+
+
+    def __write_tile_row(self, out_file: BinaryIO, rows: np.ndarray) -> None:
+        """Splits the rows into tiles, pads them to the full tile size as
+        required by TIFF and writes them compressed.
+
+        Args:
+        -----
+            out_file (BinaryIO): The file written to.
+            rows (np.ndarray): Up to `tile_size` rows of the image.
+        """
+        height, width, channels = rows.shape
+        for tile_start in range(0, width, self.tile_size):
+            tile = np.zeros((self.tile_size, self.tile_size, channels), dtype = np.uint8)
+            tile_content = rows[:, tile_start:tile_start + self.tile_size]
+            tile[:height, :tile_content.shape[1]] = tile_content
+            # Horizontal differencing per channel.
+            tile[:, 1:] = np.diff(tile, axis = 1)
+
+            compressed = zlib.compress(tile.tobytes(), self.compress_level)
+            self.__tile_offsets.append(out_file.tell())
+            self.__tile_byte_counts.append(len(compressed))
+            out_file.write(compressed)
+
+
+    def __directory(self, offset: int) -> bytes:
+        """Creates the image file directory including the values which do not
+        fit into its entries.
+
+        Args:
+        -----
+            offset (int): The position of the directory in the file.
+
+        Returns:
+        --------
+            bytes: The directory followed by the values.
+        """
+        width, height = self.size
+        channels = self.available_modes[self.mode]
+        entries: List[Tuple[int, int, List[int]]] = [
+            (256, self.__long, [width]),
+            (257, self.__long, [height]),
+            (258, self.__short, [8] * channels),
+            (259, self.__short, [self.__deflate]),
+            (262, self.__short, [2]), # RGB
+            (277, self.__short, [channels]),
+            (284, self.__short, [1]), # Channels interleaved
+            (317, self.__short, [self.__horizontal_predictor]),
+            (322, self.__long, [self.tile_size]),
+            (323, self.__long, [self.tile_size]),
+            (324, self.__long, self.__tile_offsets),
+            (325, self.__long, self.__tile_byte_counts)
+        ]
+        if channels == 4:
+            entries.append((338, self.__short, [2])) # Unassociated alpha
+        entries.sort()
+
+        directory_size = 2 + 12 * len(entries) + 4
+        values_offset = offset + directory_size
+        directory = struct.pack('<H', len(entries))
+        values = b''
+        for tag, field_type, field_values in entries:
+            value_format = '<' + ('H' if field_type == self.__short else 'I') * len(field_values)
+            packed = struct.pack(value_format, *field_values)
+            if len(packed) <= 4:
+                directory += struct.pack('<HHI', tag, field_type, len(field_values)) + packed.ljust(4, b'\x00')
+            else:
+                directory += struct.pack('<HHII', tag, field_type, len(field_values), values_offset + len(values))
+                values += packed
+                if len(values) % 2 == 1:
+                    values += b'\x00'
+        directory += struct.pack('<I', 0) # No further directories
+
+        return directory + values
@@ -0,0 +1,19 @@
+# Internal modules
+from draw.VectorPoster import VectorPoster
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+# Typing
+from typing import Union
+
+class SvgWriter(PosterWriter):
+    """Writes SVGs with the text as vector paths and the map and coats of arms
+    embedded at their own resolution (see `VectorPoster`). A raster poster is
+    embedded as one image."""
+
+    extension = 'svg'
+
+    # Override from PosterWriter
+    def encode(self, img: Union[Image.Image, VectorPoster], path: str) -> None:
+        poster = img if isinstance(img, VectorPoster) else VectorPoster.from_image(img)
+        poster.save(path, 'svg')
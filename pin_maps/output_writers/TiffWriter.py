@@ -0,0 +1,32 @@
+# Internal modules
+from output_writers.PosterWriter import PosterWriter
+from output_writers.StreamingTiffWriter import StreamingTiffWriter
+# External modules
+from PIL import Image
+
+class TiffWriter(PosterWriter):
+    """Writes tiled, deflate compressed TIFFs.
+
+    Args:
+    -----
+        compress_level (int, optional): The zlib compression level from 0 to 9. Defaults to 6.
+    """
+
+    extension = 'tif'
+
+    def __init__(self, compress_level: int = 6):
+        super().__init__()
+        if not 0 <= compress_level <= 9:
+            raise ValueError(f'TIFF compression level {compress_level} is not between 0 and 9.')
+        self.compress_level = compress_level
+
+
+    # Override from PosterWriter
+    def band_writer(self) -> StreamingTiffWriter:
+        return StreamingTiffWriter(compress_level = self.compress_level)
+
+
+    # Override from PosterWriter
+    def encode(self, img: Image.Image, path: str) -> None:
+        mode = 'RGBA' if 'A' in img.getbands() else 'RGB'
+        self.band_writer().write(self._bands(img), img.size, path, mode)
@@ -0,0 +1,25 @@
+# Internal modules
+from output_writers.PosterWriter import PosterWriter
+# External modules
+from PIL import Image
+
+class WebpWriter(PosterWriter):
+    """Writes lossless WebPs.
+
+    Args:
+    -----
+        effort (int, optional): Compression effort from 0 (fast) to 100 (small). Defaults to 80.
+    """
+
+    extension = 'webp'
+
+    def __init__(self, effort: int = 80):
+        super().__init__()
+        if not 0 <= effort <= 100:
+            raise ValueError(f'WebP effort {effort} is not between 0 and 100.')
+        self.effort = effort
+
+
+    # Override from PosterWriter
+    def encode(self, img: Image.Image, path: str) -> None:
+        img.save(path, 'WEBP', lossless = True, quality = self.effort, method = 4)
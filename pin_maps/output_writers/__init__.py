@@ -0,0 +1 @@
+"""Contains the writers which encode the finished poster into files."""
\ No newline at end of file
@@ -15,107 +15,703 @@ from complete_image_transforms.Frame import Frame
 from complete_image_transforms.Logo import Logo
 from draw.Map import Map
 from draw.Pin import Pin
+from draw.VectorPoster import VectorPoster
+from output_writers.BackgroundEncoder import BackgroundEncoder
+from output_writers.DerivativeWriter import DerivativeWriter
+from output_writers.JpegWriter import JpegWriter
+from output_writers.PdfWriter import PdfWriter
+from output_writers.PngWriter import PngWriter
+from output_writers.PosterWriter import PosterWriter
+from output_writers.SvgWriter import SvgWriter
+from output_writers.TiffWriter import TiffWriter
+from output_writers.WebpWriter import WebpWriter
+from caching.AssetManager import AssetManager
+from caching.HeraldryStore import HeraldryStore
+from heraldry_sources.HeraldryFetcher import HeraldryFetcher
+from caching.PosterCache import PosterCache
+from caching.StageCache import StageCache
+from pipeline.MemoryBudget import MemoryBudget
+from pipeline.MemoryTracker import MemoryTracker
+from pipeline.PosterLayout import PosterLayout
+from pipeline.StageGraph import StageGraph
+from pipeline.SuperscaleBenchmark import SuperscaleBenchmark
 # Python libraries
 import os
+import zlib
 from copy import deepcopy
+from functools import partial
 from time import time
 import logging
 import random
+from concurrent.futures import Future
 from datetime import datetime
 # External modules
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageFont
 # Typing
-from typing import List, Tuple, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 # Settings
 random.seed(69)
 
 
 def main() -> None:
-    params = ParamsParser()
+    render_poster(ParamsParser())
+
+
+def render_poster(params: ParamsParser) -> str:
+    """Renders and writes one poster.
+
+    Args:
+        params (ParamsParser): The parameters of the poster.
+
+    Returns:
+        str: The path of the poster.
+    """
+    output_path, written = start_poster(params)
+    written.result()
+
+    return output_path
+
+
+def start_poster(params: ParamsParser, encoder: Union[None, BackgroundEncoder] = None) -> Tuple[str, Future]:
+    """Renders one poster and writes it. With an encoder of the caller, the
+    poster is encoded in the background, so the caller may start the next
+    poster meanwhile; otherwise it is written when the function returns.
+
+    Args:
+        params (ParamsParser): The parameters of the poster.
+        encoder (Union[None, BackgroundEncoder], optional): An encoder kept
+        alive across posters. Defaults to None, i.e. one for this poster.
+
+    Returns:
+        Tuple[str, Future]: The path of the poster and a future which finishes
+        once the poster and its derivatives are written and cached.
+    """
     create_output_dir()
+    memory_tracker = MemoryTracker()
+    # Every size in pixels is multiplied by it, such that a preview has the same layout.
+    scale = params.render_scale
+    poster_writer = get_poster_writer(params)
+    band_writer = poster_writer.band_writer()
+    derivative_writer = DerivativeWriter([
+        (width, create_poster_writer(output_format, quality)) for width, output_format, quality in params.derivatives
+    ])
+    output_path = get_output_path(params, poster_writer)
+    code_version = StageCache.source_fingerprint(os.path.dirname(os.path.abspath(__file__)))
+
+    germany = Map(
+        params.country['shapefile'], params.wallpaper['filename'], params.country['shape-extent'],
+        params.wallpaper['extent'], params.country['aspect-ratio'], params.map_width,
+        scale = scale, shaped = params.wallpaper['shaped']
+    )
+    native_composition = params.native_composition_wanted
+    # With native composition, text, frame and logo are drawn around the upscaled map.
+    map_factor = params.superscale_factor if native_composition else 1
+    layout = PosterLayout(
+        (germany.size[0] * map_factor, germany.size[1] * map_factor), params.height_text_space, params.added_frame_px
+    )
+    # The model may depend on the host, so it is chosen before looking for the poster.
+    superscale_model = None
+    if params.superscale_wanted:
+        superscale_model = get_superscale_model(params, germany.size if native_composition else layout.size)
+
+    # --- Repeated orders -----------------------------------------------------
+    heraldry_fetcher = HeraldryFetcher(failure_cache = params.failure_cache)
+    if params.marker_symbol == 'heraldry':
+        # Fetches all missing coats at once, so the key holds the coats the poster is made of.
+        heraldry_fetcher.fetch([location.name for location in params.locations])
+    poster_cache = PosterCache(refresh = not params.cache_wanted)
+    poster_key = get_poster_key(params, code_version, superscale_model)
+    if poster_cache.load(poster_key, output_path):
+        print(f'Poster taken from the poster cache and written to {output_path}.')
+        derivative_paths = []
+
+        def finish_cached() -> None:
+            if derivative_paths:
+                print(f'Derivatives written to {", ".join(derivative_paths)}.')
+
+        own_encoder = encoder is None
+        if own_encoder:
+            encoder = BackgroundEncoder(max_jobs = max(len(derivative_writer.targets), 1))
+        if derivative_writer.targets:
+            with Image.open(output_path) as img:
+                # Loaded, since the file is closed before the copies are encoded.
+                img.load()
+                derivative_paths = derivative_writer.submit(encoder, img, output_path)
+
+        return output_path, finish_poster(encoder, own_encoder, derivative_paths, finish_cached)
+
+    memory_budget = MemoryBudget(
+        params.memory_budget,
+        germany.size,
+        params.height_text_space,
+        params.added_frame_px,
+        params.superscale_factor,
+        os.path.join('data', 'img', params.wallpaper['filename']),
+        streamed_encoding = band_writer is not None and not native_composition,
+        native_composition = native_composition
+    )
+    print(memory_budget.report())
+
+    stage_cache = StageCache(version = code_version, refresh = not params.cache_wanted)
+
+    # --- Pins, map, text and edits of the complete image ---------------------
+    stage_graph = get_stage_graph(
+        params, germany, layout, memory_budget, stage_cache, heraldry_fetcher, superscale_model
+    )
+    stage_results = stage_graph.run(memory_tracker)
+    _, img, _ = stage_results['complete']
+    # A poster missing pins is written, but not served to later orders.
+    complete = len(stage_results['pins']) == len(params.locations)
+    print(stage_graph.report())
+
+    # Workers render many posters in one process.
+    germany.close()
+
+    # --- Upscaling and encoding ----------------------------------------------
+    own_encoder = encoder is None
+    if own_encoder:
+        # The poster and all derivatives are encoded at the same time.
+        encoder = BackgroundEncoder(max_jobs = 1 + len(derivative_writer.targets))
+    superscale_poster = params.superscale_wanted and not native_composition
+    with memory_tracker.stage('encoding'):
+        if superscale_poster and band_writer is not None:
+            # The upscaled poster never exists as a whole: bands are upscaled
+            # while the previous ones are compressed.
+            superscale = Superscale(model_name = superscale_model)
+            scaled_size = (img.width * superscale.scale_factor, img.height * superscale.scale_factor)
+            bands = superscale.superscale_bands(img, memory_budget.band_height)
+            encoder.submit_bands(band_writer, bands, scaled_size, output_path)
+        else:
+            if superscale_poster:
+                tiled = 'tiled-superscale' in memory_budget.strategies
+                img = Superscale(
+                    model_name = superscale_model, band_height = memory_budget.band_height if tiled else None
+                )(img)
+            encoder.submit(poster_writer, img, output_path)
+        # While streamed, the upscaled poster is not in memory; the poster before is.
+        derivative_paths = derivative_writer.submit(encoder, img, output_path)
+        if own_encoder:
+            encoder.wait()
+
+    def finish() -> None:
+        # Only reached if the poster was written completely.
+        if complete:
+            poster_cache.store(poster_key, output_path)
+        print(memory_tracker.report())
+        print(AssetManager.shared().report())
+        if derivative_paths:
+            print(f'Derivatives written to {", ".join(derivative_paths)}.')
+        print(f'Poster written to {output_path}.')
+
+    return output_path, finish_poster(encoder, own_encoder, [output_path] + derivative_paths, finish)
+
+
+def finish_poster(encoder: BackgroundEncoder, own_encoder: bool, paths: List[str], finish: Callable[[], None]) -> Future:
+    """Finishes a poster once its files are written.
 
-    # --- Map creation and pin setting ----------------------------------------
-    img_transforms = [BackgroundDeletion(), Cutout(), Scale(110), AddShadow()]
-    # TODO Cropping und Koordination des Kartenausschnitts in die config.json
-    germany = Map('de-neg.shp', 'old-topo.png', [5.32, 15.55, 47.2, 56.2])
-    
+    Args:
+        encoder (BackgroundEncoder): The encoder of the files.
+        own_encoder (bool): Whether the encoder belongs to this poster; it is
+        shut down and the poster is finished before returning.
+        paths (List[str]): The paths of the files.
+        finish (Callable[[], None]): Caches the poster and prints the reports.
+
+    Returns:
+        Future: Finishes once `finish` was called.
+    """
+    finished = encoder.after(paths, finish)
+    if own_encoder:
+        encoder.shutdown()
+        finished.result()
+
+    return finished
+
+
+# --- Functions running the stages of the poster ------------------------------
+def get_poster_key(params: ParamsParser, code_version: str, superscale_model: Union[None, str] = None) -> str:
+    """Identifies the finished poster by its parameters and the versions of the
+    code and of every asset it is made of. The coats of arms have to be fetched
+    before, otherwise the key holds coats which are still missing.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        code_version (str): The fingerprint of the sources.
+        superscale_model (Union[None, str], optional): The model of the
+        superscaling, which a time budget chooses per host. Defaults to None.
+
+    Returns:
+        str: The key of the poster, see `PosterCache`.
+    """
+    assets = AssetManager.shared()
+    ribbon_path = assets.resolve('assets', 'ribbons')
+    asset_paths = [
+        'config.json',
+        os.path.join('data', 'img', params.wallpaper['filename']),
+        os.path.join('data', 'shapefiles', params.country['shapefile']),
+        params.head_font_path,
+        params.main_font_path,
+        assets.resolve('assets', 'logo'),
+        assets.resolve('assets', 'ribbon-font')
+    ] + [os.path.join(ribbon_path, file_name) for file_name in sorted(os.listdir(ribbon_path))]
+    if params.marker_symbol != 'heraldry':
+        asset_paths.append(params.marker_symbol)
+    coat_fingerprints = [HeraldryStore.shared().fingerprint(location.name) for location in params.locations]
+
+    return PosterCache.key([
+        code_version, params.poster_spec, [StageCache.file_fingerprint(path) for path in asset_paths],
+        coat_fingerprints, superscale_model
+    ])
+
+
+def create_pins(
+    params: ParamsParser,
+    stage_cache: StageCache,
+    heraldry_fetcher: HeraldryFetcher
+) -> List[Tuple[str, Image.Image, Tuple[float, float]]]:
+    """Creates the images of the pins or loads them from the stage cache.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        stage_cache (StageCache): The cache of the stage results.
+        heraldry_fetcher (HeraldryFetcher): Fetches the coats of arms, which
+        are fetched all at once before (see `render_poster`).
+
+    Returns:
+        List[Tuple[str, Image.Image, Tuple[float, float]]]: Key, image and
+        position of every pin that could be created.
+    """
+    scale = params.render_scale
+    img_transforms = [BackgroundDeletion(), Cutout(), Scale(scaled(110, scale)), AddShadow()]
+
+    pins = []
     for location in params.locations:
-        logging.info('Creating pin: ' + location.name)
-        specific_transforms = img_transforms + [Ribbon(location.name)] if params.ribbons else img_transforms
-        try:
-            pin = Pin(location, params.marker_symbol, specific_transforms)
-        except (ConnectionRefusedError, LookupError) as e:
-            logging.warn(f'Had to skip pin at position {str(location)} due to {str(e)}.')
-            continue
+        if params.marker_symbol == 'heraldry':
+            symbol_fingerprint = HeraldryStore.shared().fingerprint(location.name)
+        else:
+            symbol_fingerprint = StageCache.file_fingerprint(params.marker_symbol)
+        pin_key = stage_cache.key('pin', [
+            location.name, params.marker_symbol, symbol_fingerprint, params.ribbons, scale
+        ])
+
+        cached = stage_cache.load(pin_key)
+        if cached is not None:
+            pin_img, _ = cached
+        else:
+            logging.info('Creating pin: ' + location.name)
+            # The ribbon ends depend on the town only, so a cached pin looks like a new one.
+            ribbon_choice = zlib.crc32(location.name.lower().encode('utf-8')) % 3 + 1
+            ribbon = Ribbon(
+                location.name, gap = scaled(-15, scale), ribbon_height = scaled(100, scale), ribbon_choice = ribbon_choice
+            )
+            specific_transforms = img_transforms + [ribbon] if params.ribbons else img_transforms
+            try:
+                pin = Pin(location, params.marker_symbol, specific_transforms, heraldry_fetcher = heraldry_fetcher)
+            except (ConnectionRefusedError, LookupError) as e:
+                logging.warn(f'Had to skip pin at position {str(location)} due to {str(e)}.')
+                continue
+
+            pin_img = pin.img.convert('RGBA')
+            stage_cache.store(pin_key, pin_img)
+
+        pins.append((pin_key, pin_img, location.coords))
+
+    return pins
+
+
+def get_stage_graph(
+    params: ParamsParser,
+    germany: Map,
+    layout: PosterLayout,
+    memory_budget: MemoryBudget,
+    stage_cache: StageCache,
+    heraldry_fetcher: HeraldryFetcher,
+    superscale_model: Union[None, str] = None
+) -> StageGraph:
+    """Creates the graph of the stages of the poster. The images of map,
+    heading, body and complete image are built one after another, every one
+    of them is cached with the key of its predecessor (see `run_cached_stage`).
+    Meanwhile the pins are created and fonts, coats of arms and the edits of
+    the complete image are prepared. The map is rendered in the calling thread
+    since matplotlib is not thread-safe.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        germany (Map): The map.
+        layout (PosterLayout): The geometry of the poster.
+        memory_budget (MemoryBudget): The memory budget.
+        stage_cache (StageCache): The cache of the stage results.
+        heraldry_fetcher (HeraldryFetcher): Fetches the coats of arms of the pins.
+        superscale_model (Union[None, str], optional): The model of the superscaling. Defaults to None.
+
+    Returns:
+        StageGraph: The stages. The result of the stage "complete" is the
+        key, the image and the data of the complete image.
+    """
+    scale = params.render_scale
+    composition_scale = params.composition_scale
+    background_path = os.path.join('data', 'img', germany.background_name)
+    shapefile_path = os.path.join('data', 'shapefiles', germany.shapefile_name)
+    town_names = [location.name.lower() for location in params.locations]
+    complete_img_transforms = get_complete_img_transforms(params)
+    release_intermediates = 'release-intermediates' in memory_budget.strategies
+    map_superscale = None
+    if params.native_composition_wanted:
+        tiled = 'tiled-superscale' in memory_budget.strategies
+        map_superscale = Superscale(
+            model_name = superscale_model, band_height = memory_budget.band_height if tiled else None
+        )
+
+    def run_map_stage(
+        map_raster: Tuple[str, Image.Image, Dict[str, Any]],
+        pins: List[Tuple[str, Image.Image, Tuple[float, float]]]
+    ) -> Tuple[str, Image.Image, Dict[str, Any]]:
+        inputs = [
+            [(pin_key, position) for pin_key, _, position in pins], layout.size, layout.map_box,
+            None if map_superscale is None else map_superscale.model_name
+        ]
+        run = partial(render_map, germany, pins, layout, map_superscale)
+        return run_cached_stage(stage_cache, 'map', inputs, run, map_raster)
+
+    def run_body_stage(
+        heading: Tuple[str, Image.Image, Dict[str, Any]],
+        preparation: Tuple[ImageFont.FreeTypeFont, Dict[str, Image.Image]]
+    ) -> Tuple[str, Image.Image, Dict[str, Any]]:
+        coat_fingerprints = [HeraldryStore.shared().fingerprint(town_name) for town_name in town_names]
+        inputs = [
+            params.body, params.main_font_path, params.undertitle_line_spacing, params.text_coats,
+            town_names, coat_fingerprints, composition_scale
+        ]
+        return run_cached_stage(stage_cache, 'body', inputs, partial(render_body, params, layout), heading, *preparation)
+
+    # Releasing intermediates keeps one stage in memory at a time.
+    stage_graph = StageGraph(max_workers = 1 if release_intermediates else 4)
+    stage_graph.add('pins', partial(create_pins, params, stage_cache, heraldry_fetcher))
+    stage_graph.add('map-raster', partial(run_cached_stage, stage_cache, 'map-raster', [
+        StageCache.file_fingerprint(shapefile_path) if germany.shaped else None,
+        StageCache.file_fingerprint(background_path), germany.extent,
+        germany.aspect_ratio, scale, germany.size, Map.dpi, germany.background_extent
+    ], partial(render_map_raster, germany, release_intermediates)), main_thread = True)
+    stage_graph.add('heading-font', partial(get_heading_font, params, layout))
+    stage_graph.add('body-preparation', partial(prepare_body, params), ['pins'])
+    stage_graph.add('complete-preparation', partial(prepare_complete_img_transforms, complete_img_transforms))
+    stage_graph.add('map', run_map_stage, ['map-raster', 'pins'])
+    if params.vector_output_wanted:
+        # The vector elements are cheap to record, only the map is cached.
+        stage_graph.add('complete', partial(render_vector_poster, params, layout), [
+            'map', 'heading-font', 'body-preparation', 'complete-preparation'
+        ])
+        return stage_graph
+
+    stage_graph.add('heading', partial(run_cached_stage, stage_cache, 'heading', [
+        params.heading, params.head_font_path, params.height_text_space, params.added_frame_px, composition_scale
+    ], partial(render_heading, params, layout)), ['map', 'heading-font'])
+    stage_graph.add('body', run_body_stage, ['heading', 'body-preparation'])
+    stage_graph.add('complete', partial(run_cached_stage, stage_cache, 'complete', [
+        (type(transform).__name__, vars(transform)) for transform in complete_img_transforms
+    ], apply_complete_img_transforms), ['body', 'complete-preparation'])
+
+    return stage_graph
+
+
+def run_cached_stage(
+    stage_cache: StageCache,
+    stage_name: str,
+    inputs: Any,
+    run: Callable[..., Tuple[Image.Image, Dict[str, Any]]],
+    previous: Union[None, Tuple[str, Image.Image, Dict[str, Any]]] = None,
+    *prepared: Any
+) -> Tuple[str, Image.Image, Dict[str, Any]]:
+    """Runs a stage continuing the image of the previous stage or loads its
+    result from the stage cache. The key of the stage includes the key of the
+    previous stage, so a stage is reused only if everything before it is equal.
+
+    Args:
+        stage_cache (StageCache): The cache of the stage results.
+        stage_name (str): The name of the stage.
+        inputs (Any): The JSON serializable inputs of the stage.
+        run (Callable[..., Tuple[Image.Image, Dict[str, Any]]]): Receives the
+        prepared values, the image and the data of the previous stage.
+        previous (Union[None, Tuple[str, Image.Image, Dict[str, Any]]], optional):
+        Key, image and data of the previous stage. Defaults to None, the first stage.
+        *prepared (Any): Values prepared by other stages, e.g. fonts.
+
+    Returns:
+        Tuple[str, Image.Image, Dict[str, Any]]: Key, image and data of the stage.
+    """
+    previous_key, img, data = (None, None, {}) if previous is None else previous
+    key = stage_cache.key(stage_name, [previous_key, inputs])
+
+    cached = stage_cache.load(key)
+    if cached is not None:
+        print(f'Reusing stage "{stage_name}" from the stage cache.')
+        img, data = cached
+    else:
+        img, data = run(*prepared, img, data)
+        stage_cache.store(key, img, data)
+
+    return key, img, data
+
+
+def prepare_body(
+    params: ParamsParser,
+    pins: List[Tuple[str, Image.Image, Tuple[float, float]]]
+) -> Tuple[ImageFont.FreeTypeFont, Dict[str, Image.Image]]:
+    """Loads the font of the main text and the coats of arms written into it.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        pins (List[Tuple[str, Image.Image, Tuple[float, float]]]): The pins; the
+        coats of arms are fetched while creating them.
+
+    Returns:
+        Tuple[ImageFont.FreeTypeFont, Dict[str, Image.Image]]: The font and the
+        stored coats of arms by the lower case names of the towns.
+    """
+    main_text_font = AssetManager.shared().font(params.main_font_path, scaled(70, params.composition_scale))
+    coats = {}
+    if params.text_coats:
+        heraldry_store = HeraldryStore.shared()
+        for location in params.locations:
+            town_name = location.name.lower()
+            if town_name in heraldry_store:
+                coats[town_name] = heraldry_store.get(town_name)
+
+    return main_text_font, coats
+
+
+def prepare_complete_img_transforms(transforms: List[CompleteImageTransform]) -> List[CompleteImageTransform]:
+    """Loads what the transformations of the complete image need, see `CompleteImageTransform.prepare`.
+
+    Args:
+        transforms (List[CompleteImageTransform]): The transformations, see `get_complete_img_transforms`.
+
+    Returns:
+        List[CompleteImageTransform]: The prepared transformations.
+    """
+    for transform in transforms:
+        transform.prepare()
+
+    return transforms
+
+
+def render_map_raster(
+    germany: Map,
+    release_intermediates: bool,
+    img: None,
+    data: Dict[str, Any]
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Renders the map without pins.
+
+    Args:
+        germany (Map): The map.
+        release_intermediates (bool): Whether the figure is freed right away.
+        img (None): There is no previous stage.
+        data (Dict[str, Any]): There is no previous stage.
+
+    Returns:
+        Tuple[Image.Image, Dict[str, Any]]: The rendering, the box and the extent of the axes.
+    """
+    base, axes_box, axes_extent = germany.render_base()
+    if release_intermediates:
+        germany.close()
+
+    return base, {'axes_box': axes_box, 'axes_extent': axes_extent}
+
 
-        germany.add_pin(pin)
+def render_map(
+    germany: Map,
+    pins: List[Tuple[str, Image.Image, Tuple[float, float]]],
+    layout: PosterLayout,
+    superscale: Union[None, Superscale],
+    img: Image.Image,
+    data: Dict[str, Any]
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Draws the pins onto the map without pins, allocates the poster and
+    places the map into it.
+
+    Args:
+        germany (Map): The map.
+        pins (List[Tuple[str, Image.Image, Tuple[float, float]]]): The pins, see `create_pins`.
+        layout (PosterLayout): The geometry of the poster.
+        superscale (Union[None, Superscale]): Upscales the map with pins before it is
+        placed, if the rest of the poster is drawn at the upscaled resolution.
+        img (Image.Image): The map without pins.
+        data (Dict[str, Any]): Box and extent of the axes.
+
+    Returns:
+        Tuple[Image.Image, Dict[str, Any]]: The poster with the map.
+    """
+    for _, pin_img, position in pins:
+        germany.add_pin_img(pin_img, position)
+    img = germany.composite_pins(img, data['axes_box'], data['axes_extent'])
+    if superscale is not None:
+        img = superscale(img)
+
+    poster = layout.canvas(img.mode)
+    poster.paste(img, layout.map_box[:2])
+
+    return poster, data
+
+
+def get_heading_font(params: ParamsParser, layout: PosterLayout) -> ImageFont.FreeTypeFont:
+    """Fits the font of the heading into the width of the content.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        layout (PosterLayout): The geometry of the poster.
+
+    Returns:
+        ImageFont.FreeTypeFont: The font, at most 500 pt at the scale of the composition.
+    """
+    content_left, _, content_right, _ = layout.content_box
+    return get_sized_font(
+        params.head_font_path, params.heading, content_right - content_left, scaled(500, params.composition_scale)
+    )
+
+
+def render_heading(
+    params: ParamsParser,
+    layout: PosterLayout,
+    font_heading: ImageFont.FreeTypeFont,
+    img: Image.Image,
+    data: Dict[str, Any]
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Writes the heading into the text space below the map.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        layout (PosterLayout): The geometry of the poster.
+        font_heading (ImageFont.FreeTypeFont): The font fitting the heading into the width, see `get_heading_font`.
+        img (Image.Image): The poster with the map.
+        data (Dict[str, Any]): Data of the previous stage.
 
-    raw_img_name = f'raw-{round(time())}.png'
-    germany.save(raw_img_name)
+    Returns:
+        Tuple[Image.Image, Dict[str, Any]]: The image and the lowest y position of the heading.
+    """
+    content_left, content_top, _, _ = layout.content_box
+    height_map = layout.map_box[3] - layout.map_box[1]
 
-    # --- Map cropping --------------------------------------------------------
-    # TODO Cropping und Koordination des Kartenausschnitts in die config.json
-    cropping = (300, 650, 1760, 2525) # (left, top, right, bottom)
-    img = Image.open(os.path.join('output', raw_img_name))    
-    img = crop_map(img, cropping)
+    end_y_heading = write_header(
+        img, params.heading, font_heading, height_map, params.added_frame_px, scaled(-150, params.composition_scale),
+        offset = (content_left, content_top)
+    )
 
-    # --- Embedding into larger image and setting of heading ------------------
-    _, height_map = img.size
-    img = add_text_space(img, params.height_text_space)
+    return img, dict(data, end_y_heading = end_y_heading)
 
-    font_heading = get_sized_font(params.head_font_path, params.heading, img.width)
-    end_y_heading = write_header(img, params.heading, font_heading, height_map, params.added_frame_px)
 
-    # --- Embeds main text ----------------------------------------------------
-    font_height_heading = font_heading.getsize(params.heading)[1]
+def render_body(
+    params: ParamsParser,
+    layout: PosterLayout,
+    main_text_font: ImageFont.FreeTypeFont,
+    coats: Dict[str, Image.Image],
+    img: Image.Image,
+    data: Dict[str, Any]
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Writes the main text below the heading.
 
-    main_text_font = ImageFont.truetype(params.main_font_path, 70)
+    Args:
+        params (ParamsParser): The command line parameters.
+        layout (PosterLayout): The geometry of the poster.
+        main_text_font (ImageFont.FreeTypeFont): The font of the main text.
+        coats (Dict[str, Image.Image]): The coats of arms by the lower case names of the towns.
+        img (Image.Image): The image with heading.
+        data (Dict[str, Any]): Data including the lowest y position of the heading.
+
+    Returns:
+        Tuple[Image.Image, Dict[str, Any]]: The image with main text.
+    """
+    scale = params.composition_scale
     # start_y_undertitles = calc_start_y_undertitles(img, params.body, main_text_font, end_y_heading, params.undertitle_line_spacing, params.text_coats)
     if params.text_coats:
         town_names = [location.name.lower() for location in params.locations]
-        write_main_text_with_heraldry(img, params.body, main_text_font, params.undertitle_line_spacing, town_names, end_y_heading)
+        write_main_text_with_heraldry(
+            img, params.body, main_text_font, params.undertitle_line_spacing, town_names, data['end_y_heading'],
+            coat_text_gap = scaled(15, scale), coats_width = scaled(150, scale), box = layout.content_box,
+            coats = coats
+        )
     else:
-        write_main_text(img, params.body, main_text_font, end_y_heading, params.undertitle_line_spacing)
+        write_main_text(
+            img, params.body, main_text_font, data['end_y_heading'], params.undertitle_line_spacing,
+            box = layout.content_box
+        )
 
-    # --- Edits of the complete image -----------------------------------------
-    complete_img_transforms = get_complete_img_transforms(params)
-    for transform in complete_img_transforms:
+    return img, data
+
+
+def apply_complete_img_transforms(
+    transforms: List[CompleteImageTransform],
+    img: Image.Image,
+    data: Dict[str, Any]
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Applies the transformations of the complete image.
+
+    Args:
+        transforms (List[CompleteImageTransform]): The transformations, see `get_complete_img_transforms`.
+        img (Image.Image): The image with text.
+        data (Dict[str, Any]): Data of the previous stage.
+
+    Returns:
+        Tuple[Image.Image, Dict[str, Any]]: The transformed image.
+    """
+    for transform in transforms:
         img = transform(img)
 
-    img.save(os.path.join(os.getcwd(), 'output', 'written.png'))
+    return img, data
 
 
-# --- Functions placing the raw map into the later total image ----------------
-def crop_map(img: Image.Image, cropping: Tuple[float, float, float, float]) -> Image.Image:
-    """Crops the raw map such that there is no white space around it.
+def get_superscale_model(params: ParamsParser, size: Tuple[int, int]) -> str:
+    """Chooses the model of the superscaling. Without a time budget, it is LAPSRN.
 
     Args:
-        img (Image.Image): The image to be cropped.
-        cropping (Tuple[float, float, float, float]): Croppings.
+        params (ParamsParser): The command line parameters.
+        size (Tuple[int, int]): The size of the poster before upscaling.
 
     Returns:
-        Image.Image: The cropped image.
+        str: The model, see `Superscale.available_models`.
     """
-    img = img.crop(cropping)    
-    return img
+    if params.superscale_budget is None:
+        return 'lapsrn'
+
+    benchmark = SuperscaleBenchmark()
+    model_name, estimate = benchmark.select(size, params.superscale_budget)
+    print(benchmark.report())
+    print(f'Superscaling with {model_name}, expected to take {estimate:.1f} s of {params.superscale_budget:.1f} s.')
+
+    return model_name
 
 
-def add_text_space(img: Image.Image, added_text_height: int) -> Image.Image:
-    """Adds a space where text can be placed under the raw map.
+def render_vector_poster(
+    params: ParamsParser,
+    layout: PosterLayout,
+    map_stage: Tuple[str, Image.Image, Dict[str, Any]],
+    font_heading: ImageFont.FreeTypeFont,
+    body_preparation: Tuple[ImageFont.FreeTypeFont, Dict[str, Image.Image]],
+    transforms: List[CompleteImageTransform]
+) -> Tuple[None, VectorPoster, Dict[str, Any]]:
+    """Composes the poster for vector output: the map is embedded as an image,
+    heading, body text, frame and logo are drawn by the functions of the raster
+    poster into a `VectorPoster`.
 
     Args:
-        img (Image.Image): The image where the space will be added.
-        added_text_height (int): The height of the space in pixels.
+        params (ParamsParser): The command line parameters.
+        layout (PosterLayout): The geometry of the poster.
+        map_stage (Tuple[str, Image.Image, Dict[str, Any]]): Key, image and data of the poster with the map.
+        font_heading (ImageFont.FreeTypeFont): The font of the heading, see `get_sized_font`.
+        body_preparation (Tuple[ImageFont.FreeTypeFont, Dict[str, Image.Image]]): See `prepare_body`.
+        transforms (List[CompleteImageTransform]): The transformations, see `get_complete_img_transforms`.
 
     Returns:
-        Image.Image: The image with text space added.
+        Tuple[None, VectorPoster, Dict[str, Any]]: No key, since it is not cached, the poster and its data.
     """
-    width_cropped, height_cropped = img.size
-    dims_with_text = (width_cropped, height_cropped + added_text_height)
-    img_text = Image.new(img.mode, dims_with_text, color = (255, ) * 3)
-    img_text.paste(img, (0, 0))
+    _, map_img, data = map_stage
+    poster = VectorPoster(layout.size)
+    poster.paste(map_img.crop(layout.map_box), layout.map_box[:2])
+
+    poster, data = render_heading(params, layout, font_heading, poster, data)
+    poster, data = render_body(params, layout, *body_preparation, poster, data)
+    poster, data = apply_complete_img_transforms(transforms, poster, data)
 
-    return img_text
+    return None, poster, data
 
 
 # --- Functions for writing the heading ---------------------------------------
@@ -125,7 +721,8 @@ def write_header(
     font: ImageFont.ImageFont,
     height_map_part: int, 
     frame_width: int,
-    adjustment: int = -150
+    adjustment: int = -150,
+    offset: Tuple[int, int] = (0, 0)
 ) -> int:
     """Inserts the header into the image.
 
@@ -136,13 +733,14 @@ def write_header(
         height_map_part (int): The height of the raw map.
         frame_width (int): The width of the frame.
         adjustment (int, optional): Adjustment to the height. Defaults to -150.
+        offset (Tuple[int, int], optional): The position of map and text in the image. Defaults to (0, 0).
 
     Returns:
-        int: The lowest y position to which the heading reaches.
+        int: The lowest y position to which the heading reaches, relative to the offset.
     """
-    draw = ImageDraw.Draw(img)
+    draw = VectorPoster.drawing(img)
     start_y_heading = height_map_part + frame_width + adjustment 
-    draw.text((0, start_y_heading), text, 'black', font)
+    draw.text((offset[0], offset[1] + start_y_heading), text, 'black', font)
 
     _, heading_height = font.getsize(text)
     end_y_heading = start_y_heading + heading_height
@@ -220,7 +818,7 @@ def pattern_2nd_text(text: str, img_width: int, font: ImageFont, line_dist: int
 
 def pattern_2nd_text_with_coats(
     text: str,
-    img: Image.Image,
+    width: int,
     font: ImageFont.ImageFont,
     line_spacing: int,
     town_names: List[str],
@@ -230,7 +828,7 @@ def pattern_2nd_text_with_coats(
 
     Args:
         text (str): The text to be inserted as undertitles.
-        img (Image.Image): The image into which undertitles will be inserted.
+        width (int): The width available for the undertitles.
         font (ImageFont.ImageFont): The font of the undertitles.
         line_spacing (int): The spacing between lines in pixels.
         town_names (List[str]): The list of the names of the towns for which 
@@ -242,7 +840,7 @@ def pattern_2nd_text_with_coats(
         List[Tuple[bool, List[str]]]: The pattern.
     """
     pattern = []
-    for start_x, line in pattern_2nd_text(text, img.width - coats_width, font, line_spacing):
+    for start_x, line in pattern_2nd_text(text, width - coats_width, font, line_spacing):
         words = line.split(' ')
         line_pattern = [(False, [])]
 
@@ -264,35 +862,40 @@ def pattern_2nd_text_with_coats(
 
 
 def calc_start_y_undertitles(
-    img: Image.Image, 
+    size: Tuple[int, int],
     undertitles_text: str, 
     undertitles_font: ImageFont.ImageFont,
     end_y_heading: int,
     line_spacing: int,
-    town_names: Union[None, List[str]]
+    town_names: Union[None, List[str]],
+    coats_width: int = 150,
+    coats: Union[None, Dict[str, Image.Image]] = None
 ) -> int:
     """Calculates where to put the undertitles.
 
     Args:
-        img (Image.Image): The image into which the undertitles will be put.
+        size (Tuple[int, int]): The size of the area into which the undertitles will be put.
         undertitles_text (str): The undertitle as string.
         undertitles_font (ImageFont.ImageFont): The font of the undertitles.
         end_y_heading (int): The lowest y position of the heading.
         line_spacing (int): The spacing between the lines of the undertitles.
         town_names (Union[None, List[str]]): The names of possible towns.
+        coats_width (int, optional): The width reserved for coats of arms. Defaults to 150.
+        coats (Union[None, Dict[str, Image.Image]], optional): Coats of arms already
+        loaded, see `compile_to_line`. Defaults to None.
 
     Returns:
         int: The y position at which the undertitles to start.
     """
-    img_width, img_height = img.size
+    img_width, img_height = size
     empty_height = img_height - end_y_heading
 
     coats_wanted = town_names is not None
     if coats_wanted:
-        pattern = pattern_2nd_text_with_coats(undertitles_text, img, undertitles_font, line_spacing, town_names)
-        lines = [compile_to_line(line) for _, line, _ in pattern]
+        pattern = pattern_2nd_text_with_coats(undertitles_text, img_width, undertitles_font, line_spacing, town_names, coats_width)
+        lines = [compile_to_line(line, coats) for _, line, _ in pattern]
     else:
-        pattern = pattern_2nd_text(undertitles_text, img.width, undertitles_font, line_dist = line_spacing)    
+        pattern = pattern_2nd_text(undertitles_text, img_width, undertitles_font, line_dist = line_spacing)    
         lines = [line for _, line in pattern]
 
     num_lines = len(lines)
@@ -306,11 +909,17 @@ def calc_start_y_undertitles(
     return round(diff / 2)
 
 
-def compile_to_line(line_pattern: List[Tuple[bool, List[str]]]) -> List[Union[Image.Image, str]]:
+def compile_to_line(
+    line_pattern: List[Tuple[bool, List[str]]],
+    coats: Union[None, Dict[str, Image.Image]] = None
+) -> List[Union[Image.Image, str]]:
     """Will convert the pattern into actual lines.
 
     Args:
         line_pattern (List[Tuple[bool, List[str]]]): The pattern to be compiled.
+        coats (Union[None, Dict[str, Image.Image]], optional): Coats of arms already
+        loaded by the lower case names of the towns. The others are taken from
+        the cache. Defaults to None.
 
     Returns:
         List[Union[Image.Image, str]]: The lines as list of images and strings.
@@ -318,7 +927,12 @@ def compile_to_line(line_pattern: List[Tuple[bool, List[str]]]) -> List[Union[Im
     written_line = []
     for coat_wanted, words in line_pattern:
         if coat_wanted:
-            written_line.append(get_coat_from_cache(town_formatting(words[0])))
+            town_name = town_formatting(words[0])
+            if coats is not None and town_name in coats:
+                # A copy, since the coat is resized in place while writing.
+                written_line.append(coats[town_name].copy())
+            else:
+                written_line.append(get_coat_from_cache(town_name))
         written_line.append(' '.join(words))
 
     return written_line
@@ -329,7 +943,8 @@ def write_main_text(
     text: str,
     font: ImageFont.ImageFont,
     end_y_heading: int,
-    line_spacing: int
+    line_spacing: int,
+    box: Union[None, Tuple[int, int, int, int]] = None
 ) -> None:
     """Inserts the undertitles into the image.
 
@@ -339,21 +954,24 @@ def write_main_text(
         font (ImageFont.ImageFont): The font used for the inserted text.
         end_y_heading (int): The lowest y of the heading.
         line_spacing (int, optional): Spacing between lines. Defaults to 30.
+        box (Union[None, Tuple[int, int, int, int]], optional): The box of map and
+        text in the image. Defaults to None, the whole image.
 
     Returns:
         Image.Image: The image into which undertitles are inserted.
     """
-    img_width, img_height = img.size
-    draw = ImageDraw.Draw(img)
+    box_left, box_top, box_right, box_bottom = (0, 0) + img.size if box is None else box
+    img_width, img_height = box_right - box_left, box_bottom - box_top
+    draw = VectorPoster.drawing(img)
 
     # start_y = end_y_heading + line_spacing
     # TODO hier start y einsetzen
-    start_y = calc_start_y_undertitles(img, text, font, end_y_heading, line_spacing, None) + end_y_heading
+    start_y = calc_start_y_undertitles((img_width, img_height), text, font, end_y_heading, line_spacing, None) + end_y_heading
     font_width, font_height = font.getsize(text)
     
     pattern = pattern_2nd_text(text, img_width, font)
     for vert_start, line in pattern:
-        draw_pos = (vert_start, start_y)
+        draw_pos = (box_left + vert_start, box_top + start_y)
         draw.text(draw_pos, line, (0, ) * 3, font)
         start_y += font_height + line_spacing
 
@@ -365,7 +983,10 @@ def write_main_text_with_heraldry(
     line_spacing: int,
     town_names: List[str],
     end_y_heading: int, # The y position at which the heading ends.
-    coat_text_gap: int = 15
+    coat_text_gap: int = 15,
+    coats_width: int = 150,
+    box: Union[None, Tuple[int, int, int, int]] = None,
+    coats: Union[None, Dict[str, Image.Image]] = None
 ) -> None:
     """Inserts the undertitles into the image uncluding heraldry.
 
@@ -376,16 +997,24 @@ def write_main_text_with_heraldry(
         line_spacing (int): Spacing between lines.
         town_names (List[str]): The town names for which coats are provided.
         end_y_heading (int): The lowest y position of the heading.
+        coat_text_gap (int, optional): Gap between coats and text. Defaults to 15.
+        coats_width (int, optional): The width reserved for coats of arms. Defaults to 150.
+        box (Union[None, Tuple[int, int, int, int]], optional): The box of map and
+        text in the image. Defaults to None, the whole image.
+        coats (Union[None, Dict[str, Image.Image]], optional): Coats of arms already
+        loaded, see `compile_to_line`. Defaults to None.
     """
+    box_left, box_top, box_right, box_bottom = (0, 0) + img.size if box is None else box
+    box_size = (box_right - box_left, box_bottom - box_top)
     _, font_height = font.getsize('Tg')
     
     # start_y = end_y_heading + line_spacing TODO hier start_y einsetzen
-    start_y = calc_start_y_undertitles(img, text, font, end_y_heading, line_spacing, town_names) + end_y_heading
-    complete_text_pattern = pattern_2nd_text_with_coats(text, img, font, line_spacing, town_names)
+    start_y = calc_start_y_undertitles(box_size, text, font, end_y_heading, line_spacing, town_names, coats_width, coats) + end_y_heading
+    complete_text_pattern = pattern_2nd_text_with_coats(text, box_size[0], font, line_spacing, town_names, coats_width)
     
     added_width_of_line_by_coat = []
     for _, line_pattern, _ in complete_text_pattern:
-        line = compile_to_line(line_pattern)
+        line = compile_to_line(line_pattern, coats)
         added_width_in_this_line = 0
         for line_element in line:
             if type(line_element) is not str:
@@ -398,20 +1027,24 @@ def write_main_text_with_heraldry(
         added_coat_width = added_width_of_line_by_coat[iter_num]
         print(max(added_width_of_line_by_coat) - added_coat_width)
         start_x += round((max(added_width_of_line_by_coat) - added_coat_width) / 2)
-        line = compile_to_line(line_pattern)
-        drawing = ImageDraw.Draw(img)
+        line = compile_to_line(line_pattern, coats)
+        drawing = VectorPoster.drawing(img)
             
         for i, line_element in enumerate(line):
             if type(line_element) is str:
-                drawing.text((start_x, start_y), line_element, font = font, fill = 'black')
+                drawing.text((box_left + start_x, box_top + start_y), line_element, font = font, fill = 'black')
                 element_width, _ = font.getsize(line_element)
                 start_x += element_width
             else:
                 start_x += coat_text_gap if not i == 0 else 0
 
                 element_width, element_height = proportional_size(font_height, line_element)
-                line_element.thumbnail((element_width, element_height))
-                img.paste(line_element, (start_x, start_y), line_element)
+                if element_height > line_element.height:
+                    # The stored coats are narrower than the lines of a native composition.
+                    line_element = line_element.resize((element_width, element_height), Image.LANCZOS)
+                else:
+                    line_element.thumbnail((element_width, element_height))
+                img.paste(line_element, (box_left + start_x, box_top + start_y), line_element)
                 
                 start_x += element_width + coat_text_gap
 
@@ -420,7 +1053,8 @@ def write_main_text_with_heraldry(
 
 # --- Functions for edits concerning the complete image -----------------------
 def get_complete_img_transforms(params: ParamsParser) -> List[CompleteImageTransform]:
-    """Creates the list of transformations applied to the complete image.
+    """Creates the list of transformations applied to the complete image. The
+    superscaling is not part of it since it is done while encoding.
 
     Args:
         params (ParamsParser): The command line parameters.
@@ -430,20 +1064,77 @@ def get_complete_img_transforms(params: ParamsParser) -> List[CompleteImageTrans
     """
     transforms = []
 
-    frame_transform = Frame(params.added_frame_px, params.border_wanted)
+    frame_transform = Frame(params.added_frame_px, params.border_wanted, scaled(3, params.composition_scale))
     transforms.append(frame_transform)
 
     if params.logo_wanted:
         logo_transform = Logo(params.logo_height, params.added_frame_px)
         transforms.append(logo_transform)
-
-    if params.superscale_wanted:
-        superscale_transform = Superscale()
-        transforms.append(superscale_transform)
     
     return transforms
 
 
+# --- Functions for writing the poster ----------------------------------------
+def get_poster_writer(params: ParamsParser) -> PosterWriter:
+    """Creates the writer of the chosen output format.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+
+    Returns:
+        PosterWriter: The writer.
+    """
+    return create_poster_writer(params.output_format, params.output_quality, params.preview_wanted)
+
+
+def create_poster_writer(output_format: str, quality: Union[None, int], preview: bool = False) -> PosterWriter:
+    """Creates the writer of a file format.
+
+    Args:
+        output_format (str): The format, see `ParamsParser.output_formats`.
+        quality (Union[None, int]): The compression level, effort or quality.
+        None is the default of the format.
+        preview (bool, optional): Whether the poster is a preview, which is
+        compressed faster by default. Defaults to False.
+
+    Returns:
+        PosterWriter: The writer.
+    """
+    writer_types = {
+        'png': PngWriter,
+        'webp': WebpWriter,
+        'jpeg': JpegWriter,
+        'tiff': TiffWriter,
+        'pdf': PdfWriter,
+        'svg': SvgWriter
+    }
+    writer_type = writer_types[output_format]
+    if quality is None and preview and writer_type is PngWriter:
+        return PngWriter(compress_level = 1)
+    elif quality is None or output_format in ParamsParser.vector_formats:
+        return writer_type()
+    else:
+        return writer_type(quality)
+
+
+def get_output_path(params: ParamsParser, writer: PosterWriter) -> str:
+    """Returns the path of the poster. Unless a path is given, every run gets
+    its own file in the output directory.
+
+    Args:
+        params (ParamsParser): The command line parameters.
+        writer (PosterWriter): The writer of the poster.
+
+    Returns:
+        str: The path.
+    """
+    if params.output_path is not None:
+        return params.output_path
+
+    file_name = f'poster-{datetime.now().strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.{writer.extension}'
+    return os.path.join(os.getcwd(), 'output', file_name)
+
+
 # --- Utility functions -------------------------------------------------------
 def create_output_dir() -> None:
     """Creates a new output directory, if there is none."""
@@ -465,27 +1156,46 @@ def town_formatting(town_name: str) -> str:
     return town_name.lower().strip('.?,!:;-%()"\'$€/')
 
 
-def get_sized_font(font_path: str, text: str, img_width: int) -> ImageFont.ImageFont:
+def get_sized_font(font_path: str, text: str, img_width: int, max_size: int = 500) -> ImageFont.ImageFont:
     """Creates a fitting font.
 
     Args:
         font_path (str): The path to the font file (*.ttf).
         text (str): The text for which font should be found.
         img_width (int): The width of the image where text will be inserted.
+        max_size (int, optional): The largest size of the font. Defaults to 500.
 
     Returns:
         ImageFont.ImageFont: The fitting font.
     """
-    font_size = 500 # Arbitrary but high start value
-    font = ImageFont.truetype(font_path, font_size)
-    font_width, _ = font.getsize(text) 
-
-    while font_width > img_width:
-        font_size -= 1
-        font = ImageFont.truetype(font_path, font_size)
-        font_width, _ = font.getsize(text)
+    assets = AssetManager.shared()
+    # Binary search for the largest size up to the maximum at which the text fits.
+    smallest_size, largest_size = 1, max_size
+    while smallest_size < largest_size:
+        font_size = (smallest_size + largest_size + 1) // 2
+        font_width, _ = assets.font(font_path, font_size).getsize(text)
+        if font_width > img_width:
+            largest_size = font_size - 1
+        else:
+            smallest_size = font_size
     
-    return font
+    return assets.font(font_path, smallest_size)
+
+
+def scaled(px: int, scale: float) -> int:
+    """Scales a size in pixels, e.g. for the preview.
+
+    Args:
+        px (int): The size at full resolution.
+        scale (float): The scale of the rendering.
+
+    Returns:
+        int: The scaled size, at least one pixel in the direction of `px`.
+    """
+    if px == 0:
+        return 0
+    scaled_px = round(px * scale)
+    return scaled_px if scaled_px != 0 else (1 if px > 0 else -1)
 
 
 def get_coat_from_cache(town_name: str) -> Image.Image:
@@ -497,7 +1207,7 @@ def get_coat_from_cache(town_name: str) -> Image.Image:
     Returns:
         Image.Image: The coat of arms.
     """
-    return Image.open(os.path.join('data', 'img', 'pin-cache', f'{town_name}-pin.png'))
+    return HeraldryStore.shared().get(town_name)
 
 
 def proportional_size(set_height: int, img: Image.Image) -> Tuple[int, int]:
@@ -508,11 +1218,10 @@ def proportional_size(set_height: int, img: Image.Image) -> Tuple[int, int]:
         img (Image.Image): The images with original dimensions.
 
     Returns:
-        Tuple[int, int]: The proportional new size.
+        Tuple[int, int]: The proportional new size, larger than the image if it is lower.
     """
     current_w, current_h = img.size
-    max_w, max_h = current_w, set_height,
-    resize_ratio = min(max_w / current_w, max_h / current_h)
+    resize_ratio = set_height / current_h
     return (round(resize_ratio * current_w), round(resize_ratio * current_h))
 
 
@@ -0,0 +1,223 @@
+# Python libraries
+import json
+import os
+import time
+import uuid
+# Typing
+from typing import Any, Dict, List, Union
+
+class JobQueue:
+    """A queue of poster jobs in a directory, which may lie on a file system
+    shared by several machines. Every job is a JSON file which moves between
+    the subdirectories `pending`, `leased`, `done` and `failed`.
+
+    Workers claim a job by renaming it from `pending` to `leased`, which only
+    one of them can do. The modification time of the leased file is the lease:
+    workers renew it while they render. Jobs whose lease expired, e.g. because
+    their worker crashed, are put back into `pending`. After `max_attempts`
+    expired or failed attempts a job is moved to `failed`.
+
+    The clocks of all machines are assumed to be roughly synchronized.
+
+    Args:
+    -----
+        directory (str, optional): The directory of the queue. Defaults to 'data/job-queue'.
+        lease_seconds (float, optional): Time after which an unrenewed lease expires. Defaults to 300.
+        max_attempts (int, optional): Number of attempts per job. Defaults to 3.
+    """
+
+    states = ['pending', 'leased', 'done', 'failed']
+
+    def __init__(
+        self,
+        directory: str = os.path.join('data', 'job-queue'),
+        lease_seconds: float = 300,
+        max_attempts: int = 3
+    ):
+        self.directory = directory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for state in self.states:
+            os.makedirs(os.path.join(directory, state), exist_ok = True)
+
+
+    def enqueue(self, args: List[str]) -> str:
+        """Adds a poster to the queue.
+
+        Args:
+        -----
+            args (List[str]): The command line parameters of the poster.
+
+        Returns:
+        --------
+            str: The name of the job.
+        """
+        # Sorting by name is sorting by the time of enqueueing.
+        name = f'{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.json'
+        self.__write('pending', {'name': name, 'args': args, 'attempts': 0, 'errors': []})
+
+        return name
+
+
+    def claim(self) -> Union[Dict[str, Any], None]:
+        """Leases the oldest pending job.
+
+        Returns:
+        --------
+            Union[Dict[str, Any], None]: The job or None, if no job is pending.
+        """
+        self.requeue_expired()
+        for name in sorted(os.listdir(os.path.join(self.directory, 'pending'))):
+            if not name.endswith('.json'):
+                continue
+            pending_path = self.__path('pending', name)
+            try:
+                # The lease starts before the job appears in `leased`.
+                os.utime(pending_path)
+                os.rename(pending_path, self.__path('leased', name))
+            except FileNotFoundError:
+                continue # Claimed by another worker.
+
+            return self.__read(self.__path('leased', name))
+
+        return None
+
+
+    def renew(self, job: Dict[str, Any]) -> bool:
+        """Extends the lease of a job.
+
+        Args:
+        -----
+            job (Dict[str, Any]): The leased job.
+
+        Returns:
+        --------
+            bool: False, if the lease was lost, since it had expired.
+        """
+        try:
+            os.utime(self.__path('leased', job['name']))
+        except FileNotFoundError:
+            return False
+
+        return True
+
+
+    def complete(self, job: Dict[str, Any], output_path: str) -> None:
+        """Publishes the result of a job and ends its lease.
+
+        Args:
+        -----
+            job (Dict[str, Any]): The leased job.
+            output_path (str): The path of the poster.
+        """
+        self.__write('done', dict(job, output = output_path))
+        try:
+            os.remove(self.__path('leased', job['name']))
+        except FileNotFoundError:
+            pass # The lease expired meanwhile, the job may be rendered twice.
+
+
+    def fail(self, job: Dict[str, Any], error: str) -> None:
+        """Ends the lease of a job which could not be rendered and puts it back
+        into the queue, unless it has no attempts left.
+
+        Args:
+        -----
+            job (Dict[str, Any]): The leased job.
+            error (str): Description of the error.
+        """
+        self.__release(job['name'], error)
+
+
+    def requeue_expired(self) -> int:
+        """Puts jobs whose lease expired back into the queue.
+
+        Returns:
+        --------
+            int: The number of requeued jobs.
+        """
+        requeued = 0
+        expiry = time.time() - self.lease_seconds
+        for name in os.listdir(os.path.join(self.directory, 'leased')):
+            if not name.endswith('.json'):
+                continue
+            try:
+                expired = os.path.getmtime(self.__path('leased', name)) < expiry
+            except FileNotFoundError:
+                continue
+            if expired and self.__release(name, 'The lease expired.'):
+                requeued += 1
+
+        return requeued
+
+
+    def counts(self) -> Dict[str, int]:
+        """Counts the jobs in every state.
+
+        Returns:
+        --------
+            Dict[str, int]: The number of jobs per state.
+        """
+        return {
+            state: len([name for name in os.listdir(os.path.join(self.directory, state)) if name.endswith('.json')])
+            for state in self.states
+        }
+
+
+    def __release(self, name: str, error: str) -> bool:
+        """Ends a lease and moves the job to `pending` or `failed`.
+
+        Args:
+        -----
+            name (str): The name of the job.
+            error (str): Why the lease ended.
+
+        Returns:
+        --------
+            bool: False, if another process released the job first.
+        """
+        # Only one process can take the leased file away.
+        taken_path = f'{self.__path("leased", name)}.{self.__unique_suffix()}.part'
+        try:
+            os.rename(self.__path('leased', name), taken_path)
+        except FileNotFoundError:
+            return False
+
+        job = self.__read(taken_path)
+        job['attempts'] += 1
+        job['errors'].append(error)
+        self.__write('pending' if job['attempts'] < self.max_attempts else 'failed', job)
+        os.remove(taken_path)
+
+        return True
+
+
+    @staticmethod
+    def __unique_suffix() -> str:
+        """Process IDs are not unique across machines, so temporary files get random suffixes."""
+        return uuid.uuid4().hex[:12]
+
+
+    def __path(self, state: str, name: str) -> str:
+        return os.path.join(self.directory, state, name)
+
+
+    @staticmethod
+    def __read(path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding = 'utf-8') as job_file:
+            return json.load(job_file)
+
+
+    def __write(self, state: str, job: Dict[str, Any]) -> None:
+        """Writes a job atomically, so it is never read partially.
+
+        Args:
+        -----
+            state (str): The state of the job.
+            job (Dict[str, Any]): The job.
+        """
+        path = self.__path(state, job['name'])
+        partial_path = f'{path}.{self.__unique_suffix()}.part'
+        with open(partial_path, 'w', encoding = 'utf-8') as job_file:
+            json.dump(job, job_file)
+        os.replace(partial_path, path)
@@ -0,0 +1,177 @@
+# Internal modules
+from pipeline.PosterLayout import PosterLayout
+# External modules
+from PIL import Image
+# Typing
+from typing import List, Tuple, Union
+
+class MemoryBudget:
+    """Projects the peak memory of a poster and chooses lower-footprint
+    strategies if the projected peak exceeds the budget.
+
+    The strategies are tried in the order of `available_strategies` until the
+    projection fits into the budget:
+        * `release-intermediates`: The map figure and the decoded wallpaper are
+        freed as soon as the raw map is rendered instead of living until the end.
+        * `tiled-superscale`: The superresolution network upscales the poster in
+        row bands which are pasted into the output instead of holding several
+        full-size copies of the upscaled poster at once. Not needed, if the
+        upscaled poster is streamed into the output file anyway.
+
+    Args:
+    -----
+        budget_mb (Union[None, float]): The budget in megabytes. None means no budget.
+        map_size (Tuple[int, int]): Width and height of the map in px, which is also the size of its figure.
+        height_text_space (int): Height of the text space below the map in px.
+        added_frame_px (int): Pixels added as frame around map and text.
+        superscale_factor (int): Factor of the superscaling, 1 if it is not wanted.
+        wallpaper_path (str): Path to the wallpaper which is decoded for the map.
+        streamed_encoding (bool, optional): Whether the upscaled poster is
+        encoded band by band and never exists as a whole. Defaults to False.
+        native_composition (bool, optional): Whether only the map is upscaled and
+        the poster is allocated at the upscaled size. Then the text space and
+        the frame are given at the upscaled size too. Defaults to False.
+    """
+
+    available_strategies = ['release-intermediates', 'tiled-superscale']
+    band_height = 128 # Rows of the unscaled poster per band in tiled mode.
+    __wallpaper_px_bytes = 4 # The wallpaper pyramid provides uint8 RGBA at most.
+
+    def __init__(
+        self,
+        budget_mb: Union[None, float],
+        map_size: Tuple[int, int],
+        height_text_space: int,
+        added_frame_px: int,
+        superscale_factor: int,
+        wallpaper_path: str,
+        streamed_encoding: bool = False,
+        native_composition: bool = False
+    ):
+        self.budget = None if budget_mb is None else round(budget_mb * 2 ** 20)
+        self.map_size = map_size
+        self.height_text_space = height_text_space
+        self.added_frame_px = added_frame_px
+        self.superscale_factor = superscale_factor
+        self.wallpaper_size = self.__read_img_size(wallpaper_path)
+        self.streamed_encoding = streamed_encoding
+        self.native_composition = native_composition
+        self.strategies = self.__choose_strategies()
+
+
+    @property
+    def framed_size(self) -> Tuple[int, int]:
+        """The size of the poster including the frame (see `PosterLayout`).
+
+        Returns:
+        --------
+            Tuple[int, int]: Width and height in px.
+        """
+        map_size = self.map_size
+        if self.native_composition:
+            map_size = (map_size[0] * self.superscale_factor, map_size[1] * self.superscale_factor)
+        return PosterLayout(map_size, self.height_text_space, self.added_frame_px).size
+
+
+    def project(self, strategies: List[str]) -> int:
+        """Projects the peak memory of one poster using the given strategies.
+
+        Args:
+        -----
+            strategies (List[str]): The strategies which are applied.
+
+        Returns:
+        --------
+            int: The projected peak in bytes.
+        """
+        map_px = self.map_size[0] * self.map_size[1]
+        wallpaper_px = self.wallpaper_size[0] * self.wallpaper_size[1]
+        framed_px = self.framed_size[0] * self.framed_size[1]
+        scaled_px = framed_px * self.superscale_factor ** 2
+
+        # Wallpaper tiles, the figure's RGBA canvas and its resampled background.
+        map_stage = wallpaper_px * self.__wallpaper_px_bytes + 2 * map_px * 4
+        carried = 0 if 'release-intermediates' in strategies else map_stage
+        # Raw map, the map with pins and the poster, which is allocated once.
+        layout_stage = carried + 2 * map_px * 4 + framed_px * 4
+
+        if self.superscale_factor == 1:
+            return max(map_stage, layout_stage)
+
+        if self.native_composition:
+            scaled_map_px = map_px * self.superscale_factor ** 2
+            map_band_px = self.map_size[0] * self.band_height * self.superscale_factor ** 2
+            if 'tiled-superscale' in strategies:
+                map_superscale = map_px * 3 + scaled_map_px * 3 + 2 * map_band_px * 3
+            else:
+                map_superscale = map_px * 3 + 2 * scaled_map_px * 3
+            # Only the map is upscaled, the poster is allocated at the upscaled size.
+            return max(map_stage, carried + 2 * map_px * 4 + map_superscale + framed_px * 3)
+
+        band_px = self.framed_size[0] * self.band_height * self.superscale_factor ** 2
+        if self.streamed_encoding:
+            # Input array plus the bands being upscaled, queued and compressed.
+            superscale_stage = carried + framed_px * 4 + framed_px * 3 + 4 * band_px * 3
+        elif 'tiled-superscale' in strategies:
+            superscale_stage = carried + framed_px * 4 + scaled_px * 3 + 2 * band_px * 3
+        else:
+            # Input array, network output and the PIL copy of the output.
+            superscale_stage = carried + framed_px * 4 + framed_px * 3 + 2 * scaled_px * 3
+
+        return max(map_stage, layout_stage, superscale_stage)
+
+
+    def report(self) -> str:
+        """Describes the projection and the chosen strategies.
+
+        Returns:
+        --------
+            str: The description.
+        """
+        budget = 'none' if self.budget is None else f'{self.budget / 2 ** 20:.0f} MB'
+        strategies = ', '.join(self.strategies) if self.strategies else 'none'
+        return (
+            f'Memory budget: {budget}, projected peak: {self.project([]) / 2 ** 20:.0f} MB, ' +
+            f'with strategies: {self.project(self.strategies) / 2 ** 20:.0f} MB ' +
+            f'(strategies: {strategies}).'
+        )
+
+
+    def __choose_strategies(self) -> List[str]:
+        """Adds strategies until the projected peak fits into the budget.
+
+        Returns:
+        --------
+            List[str]: The chosen strategies.
+        """
+        strategies = []
+        if self.budget is None:
+            return strategies
+
+        for strategy in self.available_strategies:
+            if self.project(strategies) <= self.budget:
+                break
+            if strategy == 'tiled-superscale' and self.streamed_encoding:
+                continue
+            strategies.append(strategy)
+
+        return strategies
+
+
+    @staticmethod
+    def __read_img_size(img_path: str) -> Tuple[int, int]:
+        """Reads the size of an image without decoding it.
+
+        Args:
+        -----
+            img_path (str): Path to the image.
+
+        Returns:
+        --------
+            Tuple[int, int]: Width and height or (0, 0), if the image does not exist.
+        """
+        try:
+            with Image.open(img_path) as img:
+                return img.size
+        except (FileNotFoundError, OSError):
+            return (0, 0)
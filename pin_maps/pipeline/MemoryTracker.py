@@ -0,0 +1,157 @@
+# Python libraries
+import resource
+import threading
+from contextlib import contextmanager
+# Typing
+from typing import Iterator, List, Tuple, Union
+
+class MemoryTracker:
+    """Records the peak resident memory (RSS) of every stage of the pipeline.
+
+    On Linux the kernel's peak RSS counter is reset at the start of each stage,
+    so every stage reports its own peak. Elsewhere only the peak of the whole
+    process so far is available; these values are marked as cumulative.
+
+    Stages running at the same time share the counter, so their RSS is sampled
+    instead (see `overlapping_stage`). Their peaks include the memory of the
+    stages running alongside and are marked as overlapping.
+    """
+
+    __clear_refs_path = '/proc/self/clear_refs'
+    __status_path = '/proc/self/status'
+    sample_seconds = 0.02
+
+    def __init__(self):
+        # (stage name, RSS at start in bytes, peak RSS in bytes, '', 'cumulative' or 'overlapping')
+        self.stages: List[Tuple[str, int, int, str]] = []
+        self.__lock = threading.Lock()
+
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measures the peak memory of the code executed in the `with` block.
+
+        Args:
+        -----
+            name (str): The name of the stage used in the report.
+        """
+        per_stage = self.__reset_peak()
+        start_rss = self.__read_status_kb('VmRSS')
+        try:
+            yield
+        finally:
+            peak_rss = self.__read_status_kb('VmHWM') if per_stage else None
+            if peak_rss is None:
+                per_stage = False
+                peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start_rss = 0 if start_rss is None else start_rss
+            self.__record(name, start_rss, peak_rss, '' if per_stage else 'cumulative')
+
+
+    @contextmanager
+    def overlapping_stage(self, name: str) -> Iterator[None]:
+        """Measures the peak memory of the code executed in the `with` block
+        while other stages may run in other threads. The RSS of the process is
+        sampled every `sample_seconds`, so short spikes may be missed.
+
+        Args:
+        -----
+            name (str): The name of the stage used in the report.
+        """
+        start_rss = self.__read_status_kb('VmRSS')
+        if start_rss is None:
+            # Without the status file there is only the peak of the process.
+            with self.stage(name):
+                yield
+            return
+
+        samples = [start_rss]
+        stop = threading.Event()
+
+        def sample() -> None:
+            while not stop.wait(self.sample_seconds):
+                rss = self.__read_status_kb('VmRSS')
+                if rss is not None:
+                    samples.append(rss)
+
+        sampler = threading.Thread(target = sample, daemon = True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            end_rss = self.__read_status_kb('VmRSS')
+            peak_rss = max(samples if end_rss is None else samples + [end_rss])
+            self.__record(name, start_rss, peak_rss, 'overlapping')
+
+
+    @property
+    def peak(self) -> int:
+        """The highest peak of all recorded stages.
+
+        Returns:
+        --------
+            int: The peak in bytes.
+        """
+        return max([peak for _, _, peak, _ in self.stages], default = 0)
+
+
+    def report(self) -> str:
+        """Formats the recorded stages as a table.
+
+        Returns:
+        --------
+            str: One line per stage with its start and peak memory in megabytes.
+        """
+        lines = ['Stage                      start MB    peak MB']
+        for name, start, peak, kind in self.stages:
+            marker = f' ({kind})' if kind else ''
+            lines.append(f'{name:<25}{start / 2 ** 20:>10.1f}{peak / 2 ** 20:>11.1f}{marker}')
+        if any(kind == 'overlapping' for _, _, _, kind in self.stages):
+            lines.append('Overlapping stages ran at the same time, their peaks include each other.')
+
+        return '\n'.join(lines)
+
+
+    def __record(self, name: str, start_kb: int, peak_kb: int, kind: str) -> None:
+        """Adds a measured stage, which may finish in any thread."""
+        with self.__lock:
+            self.stages.append((name, start_kb * 1024, peak_kb * 1024, kind))
+
+
+    def __reset_peak(self) -> bool:
+        """Resets the peak RSS counter of the kernel.
+
+        Returns:
+        --------
+            bool: Whether the counter could be reset.
+        """
+        try:
+            with open(self.__clear_refs_path, 'w') as clear_refs:
+                clear_refs.write('5')
+            return True
+        except OSError:
+            return False
+
+
+    def __read_status_kb(self, key: str) -> Union[int, None]:
+        """Reads a memory value from the status file of the process.
+
+        Args:
+        -----
+            key (str): The key in the status file, e.g. `VmHWM`.
+
+        Returns:
+        --------
+            Union[int, None]: The value in kilobytes or None, if not available.
+        """
+        try:
+            with open(self.__status_path, 'r') as status:
+                for line in status:
+                    if line.startswith(key + ':'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+
+        return None
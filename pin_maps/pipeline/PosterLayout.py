@@ -0,0 +1,61 @@
+# External modules
+from PIL import Image
+# Typing
+from typing import Tuple
+
+class PosterLayout:
+    """Plans the geometry of the poster before anything is rendered, such that
+    the poster is allocated once and every component is drawn straight into
+    its region.
+
+    The content, i.e. the map with the text space below it, is centered
+    horizontally in the poster. Above and below it are half of the frame each,
+    the width follows from the height and the poster's aspect ratio.
+
+    Args:
+    -----
+        map_size (Tuple[int, int]): Width and height of the map in px.
+        height_text_space (int): Height of the text space below the map in px.
+        added_frame_px (int): Pixels added as frame around map and text.
+        width_per_height (float, optional): The aspect ratio of the poster. Defaults to 12 / 18.
+
+    Raises:
+    -------
+        ValueError: If the content is wider than the poster.
+    """
+
+    def __init__(
+        self,
+        map_size: Tuple[int, int],
+        height_text_space: int,
+        added_frame_px: int,
+        width_per_height: float = 12 / 18
+    ):
+        map_width, map_height = map_size
+        content_height = map_height + height_text_space
+        height = content_height + added_frame_px
+        exact_width = width_per_height * height
+        if exact_width < map_width:
+            raise ValueError(f'Neue Breite ist kleiner als alte {exact_width} zu {map_width}.')
+
+        self.size = (round(exact_width), height)
+
+        left = round(round(exact_width - map_width) / 2)
+        top = round(added_frame_px / 2)
+        self.content_box = (left, top, left + map_width, top + content_height)
+        self.map_box = (left, top, left + map_width, top + map_height)
+
+
+    def canvas(self, mode: str = 'RGBA') -> Image.Image:
+        """Allocates the white poster.
+
+        Args:
+        -----
+            mode (str, optional): The mode of the poster. Defaults to 'RGBA'.
+
+        Returns:
+        --------
+            Image.Image: The poster.
+        """
+        return Image.new(mode, self.size, (255, ) * 3)
+
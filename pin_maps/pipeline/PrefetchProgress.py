@@ -0,0 +1,69 @@
+# Python libraries
+import json
+import os
+# Typing
+from typing import Dict, Union
+
+class PrefetchProgress:
+    """Checkpoints a prefetch run, such that an interrupted run resumes where it
+    stopped. Every finished town is appended to the file as one JSON line: either
+    its data was fetched or it failed permanently, e.g. since it has no coat of
+    arms. Towns which failed due to network errors are not recorded, so the
+    next run tries them again.
+
+    Args:
+    -----
+        path (str, optional): The path of the checkpoint. Defaults to 'data/prefetch-progress.jsonl'.
+    """
+
+    def __init__(self, path: str = os.path.join('data', 'prefetch-progress.jsonl')):
+        self.path = path
+        self.done = set()
+        self.failed: Dict[str, str] = {}
+        if not os.path.exists(path):
+            return
+
+        line = ''
+        with open(path, 'r', encoding = 'utf-8') as progress_file:
+            for line in progress_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # The last line of an interrupted run may be incomplete.
+                self.__remember(entry['town'], entry['error'])
+
+        if line and not line.endswith('\n'):
+            # Ends the incomplete line, such that the next one is not appended to it.
+            with open(path, 'a', encoding = 'utf-8') as progress_file:
+                progress_file.write('\n')
+
+
+    def __contains__(self, town_name: str) -> bool:
+        town_name = town_name.lower()
+        return town_name in self.done or town_name in self.failed
+
+
+    def record(self, town_name: str, error: Union[None, str] = None) -> None:
+        """Appends a finished town to the checkpoint.
+
+        Args:
+        -----
+            town_name (str): The name of the town.
+            error (Union[None, str], optional): Why the town failed permanently. Defaults to None, i.e. it is done.
+        """
+        line = json.dumps({'town': town_name.lower(), 'error': error}) + '\n'
+        # One write in append mode, such that a line is never split by an interruption in between.
+        progress_fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(progress_fd, line.encode('utf-8'))
+        finally:
+            os.close(progress_fd)
+        self.__remember(town_name.lower(), error)
+
+
+    def __remember(self, town_name: str, error: Union[None, str]) -> None:
+        if error is None:
+            self.done.add(town_name)
+            self.failed.pop(town_name, None)
+        else:
+            self.failed[town_name] = error
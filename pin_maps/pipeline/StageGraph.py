@@ -0,0 +1,196 @@
+# Python libraries
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from queue import Queue
+from time import perf_counter
+# Internal modules
+from pipeline.MemoryTracker import MemoryTracker
+# Typing
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+class StageGraph:
+    """Runs the stages of a poster as a graph of dependencies. A stage starts
+    as soon as the stages it depends on are finished, so independent branches,
+    e.g. the pins and the map, overlap and the poster takes about as long as
+    its longest branch instead of the sum of all stages.
+
+    Every stage receives the results of its dependencies in the order in which
+    they were given. Stages which must not leave the calling thread, e.g. since
+    they use matplotlib, are run there while the others run in a thread pool.
+
+    Args:
+    -----
+        max_workers (int, optional): The number of stages run at the same time. Defaults to 4.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        # Name of the stage: function, names of its dependencies and whether it runs in the calling thread.
+        self.__stages: Dict[str, Tuple[Callable[..., Any], List[str], bool]] = {}
+        # Name of the stage: start and end in seconds since the start of the graph.
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+
+    def add(
+        self,
+        name: str,
+        run: Callable[..., Any],
+        dependencies: Union[None, List[str]] = None,
+        main_thread: bool = False
+    ) -> None:
+        """Adds a stage after the stages it depends on, so the graph has no cycles.
+
+        Args:
+        -----
+            name (str): The name of the stage.
+            run (Callable[..., Any]): Receives the results of the dependencies and returns the result of the stage.
+            dependencies (Union[None, List[str]], optional): Names of the stages it depends on. Defaults to None.
+            main_thread (bool, optional): Whether it runs in the calling thread. Defaults to False.
+
+        Raises:
+        -------
+            ValueError: If the name is taken or a dependency was not added before.
+        """
+        dependencies = [] if dependencies is None else dependencies
+        if name in self.__stages:
+            raise ValueError(f'Stage "{name}" was already added.')
+        unknown = [dependency for dependency in dependencies if dependency not in self.__stages]
+        if unknown:
+            raise ValueError(f'Stage "{name}" depends on stages which were not added before: {", ".join(unknown)}.')
+
+        self.__stages[name] = (run, dependencies, main_thread)
+
+
+    def run(self, memory_tracker: Union[None, MemoryTracker] = None) -> Dict[str, Any]:
+        """Runs all stages. If they run one after another, the peak memory of
+        every stage is measured by itself. Otherwise the stages are sampled as
+        overlapping ones and the whole graph is measured, too.
+
+        Args:
+        -----
+            memory_tracker (Union[None, MemoryTracker], optional): Records the memory. Defaults to None.
+
+        Returns:
+        --------
+            Dict[str, Any]: The results of the stages by their names.
+        """
+        results: Dict[str, Any] = {}
+        pending = dict(self.__stages)
+        # Stages for the calling thread and errors of the pool, None once all stages are done.
+        inline: Queue = Queue()
+        lock = threading.RLock()
+        failed = False
+        start = perf_counter()
+        sequential = self.max_workers == 1
+        tracked = memory_tracker is not None
+
+        def run_stage(name: str) -> Any:
+            run, dependencies, _ = self.__stages[name]
+            stage_start = perf_counter() - start
+            if not tracked:
+                measured = nullcontext()
+            else:
+                measured = memory_tracker.stage(name) if sequential else memory_tracker.overlapping_stage(name)
+            with measured:
+                result = run(*[results[dependency] for dependency in dependencies])
+            self.timings[name] = (stage_start, perf_counter() - start)
+            return result
+
+        def finish(name: str, result: Any) -> None:
+            with lock:
+                results[name] = result
+                if len(results) == len(self.__stages):
+                    inline.put(None)
+                schedule()
+
+        def finish_in_pool(name: str, future: Future) -> None:
+            nonlocal failed
+            error = future.exception()
+            if error is not None:
+                with lock:
+                    failed = True
+                inline.put(error)
+            else:
+                finish(name, future.result())
+
+        def schedule() -> None:
+            # Starts the stages whose dependencies are done, right when the last one finishes.
+            with lock:
+                ready = [
+                    name for name, (_, dependencies, _) in pending.items()
+                    if not failed and all(dependency in results for dependency in dependencies)
+                ]
+                for name in ready:
+                    del pending[name]
+                # A stage finishing right away schedules its successors from within the loop.
+                for name in ready:
+                    if sequential or self.__stages[name][2]:
+                        inline.put(name)
+                    else:
+                        future = executor.submit(run_stage, name)
+                        future.add_done_callback(partial(finish_in_pool, name))
+
+        with memory_tracker.stage('stage-graph') if tracked and not sequential else nullcontext():
+            with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+                if not self.__stages:
+                    return results
+                schedule()
+                while True:
+                    item = inline.get()
+                    if item is None:
+                        break
+                    if isinstance(item, BaseException):
+                        # The pool finishes the running stages but starts no more.
+                        raise item
+                    try:
+                        result = run_stage(item)
+                    except BaseException:
+                        with lock:
+                            failed = True
+                        raise
+                    finish(item, result)
+
+        return results
+
+
+    def critical_path(self) -> List[str]:
+        """The chain of stages which determined the duration of the last run:
+        starting from the stage finishing last, always the dependency which
+        finished last.
+
+        Returns:
+        --------
+            List[str]: The names of the stages from the first to the last.
+        """
+        if not self.timings:
+            return []
+
+        path = [max(self.timings, key = lambda name: self.timings[name][1])]
+        while True:
+            dependencies = self.__stages[path[-1]][1]
+            if not dependencies:
+                return path[::-1]
+            path.append(max(dependencies, key = lambda name: self.timings[name][1]))
+
+
+    def report(self) -> str:
+        """Formats the timings of the last run as a table.
+
+        Returns:
+        --------
+            str: One line per stage with its start and duration, the stages of
+            the critical path are marked with an asterisk.
+        """
+        critical_path = self.critical_path()
+        lines = ['Stage                       start s    time s']
+        for name, (stage_start, stage_end) in sorted(self.timings.items(), key = lambda timing: timing[1][0]):
+            marker = ' *' if name in critical_path else ''
+            lines.append(f'{name:<25}{stage_start:>10.2f}{stage_end - stage_start:>10.2f}{marker}')
+
+        total = max([end for _, end in self.timings.values()], default = 0)
+        busy = sum([end - stage_start for stage_start, end in self.timings.values()])
+        lines.append(f'{total:.2f} s in total for {busy:.2f} s of stages, critical path: {" > ".join(critical_path)}')
+
+        return '\n'.join(lines)
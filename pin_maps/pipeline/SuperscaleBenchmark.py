@@ -0,0 +1,152 @@
+# Python libraries
+import json
+import os
+import platform
+import uuid
+from time import perf_counter
+# Internal modules
+from complete_image_transforms.Superscale import Superscale
+# External modules
+import numpy as np
+from PIL import Image
+# Typing
+from typing import Dict, Tuple
+
+class SuperscaleBenchmark:
+    """Chooses the superresolution model that upscales an image within a
+    time budget.
+
+    Every model upscales a sample image once per host. Its throughput in
+    megapixels of the unscaled image per second is kept in a JSON file by the
+    name of the host, so later runs only look it up. Delete the entry of a
+    host to measure it again, e.g. after changing its hardware.
+
+    Args:
+    -----
+        path (str, optional): Path to the measurements. Defaults to 'data/superscale-benchmark.json'.
+        sample_size (int, optional): Width and height of the sample image in px. Defaults to 192.
+        scale_factor (int, optional): The factor of the upscaling. Defaults to 4.
+    """
+
+    # From the best to the worst quality, interpolation is the fallback.
+    models_by_quality = ['lapsrn', 'fsrcnn', 'espcn', 'lanczos']
+
+    def __init__(
+        self,
+        path: str = os.path.join('data', 'superscale-benchmark.json'),
+        sample_size: int = 192,
+        scale_factor: int = Superscale.scale_factor
+    ):
+        self.path = path
+        self.sample_size = sample_size
+        self.scale_factor = scale_factor
+        self.host = platform.node()
+
+
+    def throughputs(self) -> Dict[str, float]:
+        """The throughput of every model on this host, measured if not done yet.
+
+        Returns:
+        --------
+            Dict[str, float]: Megapixels of the unscaled image per second by model.
+        """
+        measurements = self.__read()
+        host_key = f'{self.host}:x{self.scale_factor}'
+        host_throughputs = measurements.get(host_key, {})
+        missing = [model_name for model_name in self.models_by_quality if model_name not in host_throughputs]
+        if missing:
+            for model_name in missing:
+                host_throughputs[model_name] = self.__measure(model_name)
+            # Another process may have measured other hosts meanwhile.
+            measurements = self.__read()
+            measurements[host_key] = host_throughputs
+            self.__write(measurements)
+
+        return host_throughputs
+
+
+    def select(self, size: Tuple[int, int], budget_seconds: float) -> Tuple[str, float]:
+        """Chooses the best model which upscales an image of the size within
+        the budget. If none does, the fastest model is chosen.
+
+        Args:
+        -----
+            size (Tuple[int, int]): Width and height of the unscaled image in px.
+            budget_seconds (float): The time allowed for the upscaling.
+
+        Returns:
+        --------
+            Tuple[str, float]: The model and the seconds it is expected to take.
+        """
+        throughputs = self.throughputs()
+        megapixels = size[0] * size[1] / 1e6
+        estimates = {model_name: megapixels / throughputs[model_name] for model_name in self.models_by_quality}
+        for model_name in self.models_by_quality:
+            if estimates[model_name] <= budget_seconds:
+                return model_name, estimates[model_name]
+
+        fastest = min(estimates, key = estimates.get)
+        return fastest, estimates[fastest]
+
+
+    def report(self) -> str:
+        """Formats the throughputs of this host as a table.
+
+        Returns:
+        --------
+            str: One line per model.
+        """
+        lines = [f'Model        MP/s on {self.host}']
+        for model_name, throughput in self.throughputs().items():
+            lines.append(f'{model_name:<10}{throughput:>10.3f}')
+
+        return '\n'.join(lines)
+
+
+    def __measure(self, model_name: str) -> float:
+        """Upscales a sample image with a model.
+
+        Args:
+        -----
+            model_name (str): The model.
+
+        Returns:
+        --------
+            float: Megapixels of the unscaled image per second.
+        """
+        superscale = Superscale(self.scale_factor, model_name)
+        # Loading the model is not part of the throughput.
+        superscale.warm_up()
+        superscale(Image.new('RGB', (16, 16)))
+
+        # A gradient with noise, since a flat image may be faster to upscale than a map.
+        axis = np.linspace(0, 255, self.sample_size)
+        rng = np.random.default_rng(0)
+        sample_arr = np.stack([
+            np.add.outer(axis, axis) / 2, np.add.outer(axis, axis[::-1]) / 2,
+            rng.integers(0, 256, (self.sample_size, self.sample_size))
+        ], axis = 2).astype('uint8')
+        sample = Image.fromarray(sample_arr, 'RGB')
+
+        start = perf_counter()
+        superscale(sample)
+        seconds = perf_counter() - start
+
+        return self.sample_size ** 2 / 1e6 / seconds
+
+
+    def __read(self) -> Dict[str, Dict[str, float]]:
+        """Reads the measurements of all hosts, none if there is no file yet."""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding = 'utf-8') as measurements_file:
+            return json.load(measurements_file)
+
+
+    def __write(self, measurements: Dict[str, Dict[str, float]]) -> None:
+        """Writes the measurements atomically, so they are never read partially."""
+        # Process IDs are not unique across the machines sharing the file.
+        partial_path = f'{self.path}.{uuid.uuid4().hex[:12]}.part'
+        with open(partial_path, 'w', encoding = 'utf-8') as measurements_file:
+            json.dump(measurements, measurements_file, indent = 4)
+        os.replace(partial_path, self.path)
@@ -0,0 +1 @@
+"""Contains helpers that run, plan and monitor the stages of the poster pipeline."""
\ No newline at end of file
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""Fetches the coordinates and coats of arms of a list of towns in advance, such
+that rendering posters of these towns never has to wait for the network."""
+
+# Internal modules
+from caching.NegativeCache import NegativeCache
+from heraldry_sources.HeraldryFetcher import HeraldryFetcher
+from heraldry_sources.WikidataSource import WikidataSource
+from heraldry_sources.WikipediaSource import WikipediaSource
+from input_parser.Coordinates import Coordinates
+from pipeline.PrefetchProgress import PrefetchProgress
+# Python libraries
+import argparse
+import os
+import sys
+from time import sleep
+# External modules
+import requests
+# Typing
+from typing import Dict, List, TextIO
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'towns',
+        nargs = '?',
+        default = '-',
+        help = 'A file with one town per line. Defaults to the standard input.'
+    )
+    parser.add_argument(
+        '--progress',
+        type = str,
+        default = os.path.join('data', 'prefetch-progress.jsonl'),
+        help = 'The checkpoint, from which an interrupted run resumes.'
+    )
+    parser.add_argument('--restart', action = 'store_true', help = 'Starts anew instead of resuming.')
+    parser.add_argument('--delay', type = float, default = 1, help = 'Seconds between towns looked up on Wikipedia pages.')
+    parser.add_argument(
+        '--retries',
+        type = int,
+        default = 2,
+        help = 'Retries after network errors, each after twice the delay of the one before.'
+    )
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.progress):
+        os.remove(args.progress)
+    if args.towns == '-':
+        town_names = read_towns(sys.stdin)
+    else:
+        with open(args.towns, 'r', encoding = 'utf-8') as towns_file:
+            town_names = read_towns(towns_file)
+
+    prefetch(town_names, PrefetchProgress(args.progress), args.delay, args.retries)
+
+
+def read_towns(towns_file: TextIO) -> List[str]:
+    """Reads one town per line, skipping empty lines and comments.
+
+    Args:
+        towns_file (TextIO): The list of towns.
+
+    Returns:
+        List[str]: The names of the towns without duplicates.
+    """
+    town_names = []
+    for line in towns_file:
+        town_name = line.strip()
+        if town_name and not town_name.startswith('#') and town_name not in town_names:
+            town_names.append(town_name)
+
+    return town_names
+
+
+def prefetch(town_names: List[str], progress: PrefetchProgress, delay: float, retries: int) -> None:
+    """Fetches the towns which are not yet in the checkpoint and reports what failed.
+
+    Args:
+        town_names (List[str]): The names of the towns.
+        progress (PrefetchProgress): The checkpoint.
+        delay (float): Seconds between towns looked up on Wikipedia pages.
+        retries (int): Retries after network errors.
+    """
+    # Every town is looked up anew, but failures are remembered for the renders.
+    failure_cache = NegativeCache(ttl_seconds = 0)
+    heraldry_fetcher = HeraldryFetcher(
+        sources = [WikidataSource(), WikipediaSource(delay)], failure_cache = failure_cache
+    )
+    pending = [town_name for town_name in town_names if town_name not in progress]
+    skipped = len(town_names) - len(pending)
+    network_errors = {}
+    fetched = 0
+    # One batch of the structured source at a time, such that progress is checkpointed regularly.
+    batch_size = heraldry_fetcher.sources[0].batch_size
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        for attempt in range(retries + 1):
+            errors = fetch_towns(batch, heraldry_fetcher, failure_cache)
+            for town_name in batch:
+                error = errors.get(town_name.lower())
+                if error is None:
+                    progress.record(town_name)
+                    network_errors.pop(town_name, None)
+                    fetched += 1
+                elif not is_network_error(error):
+                    progress.record(town_name, str(error))
+                    network_errors.pop(town_name, None)
+                else:
+                    network_errors[town_name] = str(error)
+
+            batch = [town_name for town_name in batch if town_name in network_errors]
+            if not batch:
+                break
+            if attempt < retries:
+                sleep(delay * 2 ** (attempt + 1))
+
+    print(f'{fetched} towns fetched, {skipped} finished by earlier runs.')
+    for town_name, error in sorted(progress.failed.items()):
+        print(f'Failed: {town_name}: {error}')
+    for town_name, error in network_errors.items():
+        print(f'Network error, retried in the next run: {town_name}: {error}')
+
+
+def is_network_error(error: Exception) -> bool:
+    """Whether the error may go away when trying again later.
+
+    Args:
+        error (Exception): The error of fetching a town.
+
+    Returns:
+        bool: True for network errors, also if they caused the error.
+    """
+    network_errors = (ConnectionRefusedError, requests.RequestException)
+    return isinstance(error, network_errors) or isinstance(error.__cause__, network_errors)
+
+
+def fetch_towns(
+    town_names: List[str],
+    heraldry_fetcher: HeraldryFetcher,
+    failure_cache: NegativeCache
+) -> Dict[str, Exception]:
+    """Fills the coordinates cache and the heraldry store with towns. The
+    geocoder waits on its own after every request, as its terms demand.
+
+    Args:
+        town_names (List[str]): The names of the towns.
+        heraldry_fetcher (HeraldryFetcher): Fetches the coats of arms in batches.
+        failure_cache (NegativeCache): Remembers towns without coordinates or coat of arms.
+
+    Returns:
+        Dict[str, Exception]: Why towns failed by their lower case names.
+    """
+    errors = {}
+    located_names = []
+    for town_name in town_names:
+        try:
+            located_names.append(Coordinates(town_name, failure_cache).name)
+        except (NameError, requests.RequestException) as e:
+            errors[town_name.lower()] = e
+    errors.update(heraldry_fetcher.fetch(located_names))
+
+    return errors
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""Renders posters from a job queue, which may lie on a file system shared by several machines."""
+
+# Internal modules
+from caching.AssetManager import AssetManager
+from complete_image_transforms.Superscale import Superscale
+from input_parser.ParamsParser import ParamsParser
+from pipeline.JobQueue import JobQueue
+from output_writers.BackgroundEncoder import BackgroundEncoder
+from pin_maps import get_poster_writer, start_poster
+# Python libraries
+import argparse
+import gc
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import Future
+from time import sleep
+# Typing
+from typing import Any, Dict, Tuple, Union
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--queue',
+        type = str,
+        default = os.path.join('data', 'job-queue'),
+        help = 'The directory of the queue, e.g. on a shared file system.'
+    )
+    subparsers = parser.add_subparsers(dest = 'command', required = True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help = 'Adds a poster to the queue.')
+    enqueue_parser.add_argument(
+        'poster_args',
+        nargs = argparse.REMAINDER,
+        help = 'The parameters of the poster as for pin_maps.py, after "--".'
+    )
+
+    work_parser = subparsers.add_parser('work', help = 'Renders queued posters until stopped.')
+    work_parser.add_argument(
+        '--output-dir',
+        type = str,
+        default = None,
+        help = 'Directory of the posters of jobs without --output, e.g. on the shared file system.'
+    )
+    work_parser.add_argument('--lease', type = float, default = 300, help = 'Lease of a job in seconds.')
+    work_parser.add_argument('--poll', type = float, default = 5, help = 'Seconds between looks into an empty queue.')
+    work_parser.add_argument('--once', action = 'store_true', help = 'Stops as soon as the queue is empty.')
+    work_parser.add_argument(
+        '--processes',
+        type = int,
+        default = 1,
+        help = 'Number of worker processes forked from one parent, which shares the loaded assets with them.'
+    )
+
+    subparsers.add_parser('status', help = 'Counts the jobs in every state.')
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        poster_args = args.poster_args[1:] if args.poster_args[:1] == ['--'] else args.poster_args
+        print(f'Enqueued job {JobQueue(args.queue).enqueue(poster_args)}.')
+    elif args.command == 'work':
+        queue = JobQueue(args.queue, lease_seconds = args.lease)
+        if args.processes > 1:
+            work_in_processes(args.processes, queue, args.output_dir, args.poll, args.once)
+        else:
+            work(queue, args.output_dir, args.poll, args.once)
+    else:
+        for state, count in JobQueue(args.queue).counts().items():
+            print(f'{state:10}{count:6}')
+
+
+def work(queue: JobQueue, output_dir: Union[None, str], poll_seconds: float, once: bool) -> None:
+    """Claims and renders jobs. Crashed workers need no cleanup: their leases
+    expire and other workers take the jobs over.
+
+    A job is encoded in the background while the next one is rendered. It is
+    completed once its files are written, at the latest after the next job
+    was rendered, so at most one job is encoded while another is rendered.
+
+    Args:
+        queue (JobQueue): The queue.
+        output_dir (Union[None, str]): Directory of the posters of jobs without an output path.
+        poll_seconds (float): Seconds between looks into an empty queue.
+        once (bool): Whether to stop as soon as the queue is empty.
+    """
+    worker_name = f'{socket.gethostname()}:{os.getpid()}'
+    # Encodes a job and its derivatives while the next job is rendered.
+    encoder = BackgroundEncoder(max_jobs = 4)
+    encoding = None
+    try:
+        while True:
+            job = queue.claim()
+            if job is None:
+                settle_job(queue, encoding, worker_name)
+                encoding = None
+                if once:
+                    return
+                sleep(poll_seconds)
+                continue
+
+            print(f'Worker {worker_name} renders job {job["name"]}.')
+            stop_renewing = threading.Event()
+            renewer = threading.Thread(target = renew_lease, args = (queue, job, stop_renewing), daemon = True)
+            renewer.start()
+            try:
+                output_path, written = start_job(job, output_dir, encoder)
+            except (Exception, SystemExit):
+                # SystemExit is raised by invalid parameters.
+                queue.fail(job, f'{worker_name}: {traceback.format_exc()}')
+                stop_renewing.set()
+                renewer.join()
+                continue
+            settle_job(queue, encoding, worker_name)
+            encoding = (job, output_path, written, stop_renewing, renewer)
+    finally:
+        settle_job(queue, encoding, worker_name)
+        encoder.shutdown()
+
+
+def settle_job(
+    queue: JobQueue,
+    encoding: Union[None, Tuple[Dict[str, Any], str, Future, threading.Event, threading.Thread]],
+    worker_name: str
+) -> None:
+    """Waits until a job is written and completes it, or fails it.
+
+    Args:
+        queue (JobQueue): The queue.
+        encoding (Union[None, Tuple[Dict[str, Any], str, Future, threading.Event, threading.Thread]]):
+        The job, the path of its poster, the future of its files and the renewal of its lease. None if there is no job.
+        worker_name (str): The name of the worker.
+    """
+    if encoding is None:
+        return
+
+    job, output_path, written, stop_renewing, renewer = encoding
+    try:
+        written.result()
+    except Exception:
+        queue.fail(job, f'{worker_name}: {traceback.format_exc()}')
+    else:
+        queue.complete(job, output_path)
+    finally:
+        stop_renewing.set()
+        renewer.join()
+
+
+def work_in_processes(
+    processes: int,
+    queue: JobQueue,
+    output_dir: Union[None, str],
+    poll_seconds: float,
+    once: bool
+) -> None:
+    """Loads the read-only assets and forks the workers afterwards. The pages
+    of the assets are shared copy-on-write, so every worker only needs memory
+    for its own poster. Cached stages, geometry and wallpapers are memory-mapped
+    and hence shared through the page cache anyway.
+
+    Args:
+        processes (int): Number of worker processes.
+        queue (JobQueue): The queue.
+        output_dir (Union[None, str]): Directory of the posters of jobs without an output path.
+        poll_seconds (float): Seconds between looks into an empty queue.
+        once (bool): Whether to stop as soon as the queue is empty.
+
+    Raises:
+        ValueError: If the platform cannot fork processes.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        raise ValueError('Worker processes need a platform which can fork, start several workers instead.')
+
+    warm_up()
+    # Keeps the garbage collector from touching, and thereby copying, the shared objects.
+    gc.freeze()
+    context = multiprocessing.get_context('fork')
+    workers = [
+        context.Process(target = work, args = (queue, output_dir, poll_seconds, once))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def warm_up() -> None:
+    """Loads the assets every poster needs into the current process."""
+    AssetManager.shared().warm_up()
+    Superscale().warm_up()
+
+
+def start_job(
+    job: Dict[str, Any],
+    output_dir: Union[None, str],
+    encoder: Union[None, BackgroundEncoder] = None
+) -> Tuple[str, Future]:
+    """Renders the poster of a job.
+
+    Args:
+        job (Dict[str, Any]): The job.
+        output_dir (Union[None, str]): Directory of the poster, if the job has no output path.
+        encoder (Union[None, BackgroundEncoder], optional): Encodes the poster
+        in the background. Defaults to None, i.e. it is written on return.
+
+    Returns:
+        Tuple[str, Future]: The path of the poster and the future of its files, see `start_poster`.
+    """
+    params = ParamsParser(job['args'])
+    if params.output_path is None and output_dir is not None:
+        extension = get_poster_writer(params).extension
+        output_path = os.path.join(output_dir, f'{os.path.splitext(job["name"])[0]}.{extension}')
+        params = ParamsParser(job['args'] + ['--output', output_path])
+
+    return start_poster(params, encoder)
+
+
+def renew_lease(queue: JobQueue, job: Dict[str, Any], stop: threading.Event) -> None:
+    """Renews the lease of a job three times per lease until stopped.
+
+    Args:
+        queue (JobQueue): The queue.
+        job (Dict[str, Any]): The leased job.
+        stop (threading.Event): Set when the job is finished.
+    """
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.renew(job):
+            print(f'The lease of job {job["name"]} expired, it may be rendered twice.')
+            return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Python libraries
+import json
+# Internal modules
+from caching.AssetManager import AssetManager
+# External modules
+import numpy as np
+import pytest
+from PIL import Image
+
+
+def create_manager(tmp_path, max_variants: int = 256) -> AssetManager:
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'markers': {'white': 'white-shade.png'}, 'assets': {'logo': 'img/logo.png'}}))
+    return AssetManager(str(config_path), max_variants)
+
+
+def create_image(tmp_path) -> str:
+    pixels = np.random.default_rng(0).integers(0, 256, (40, 60, 3), dtype = np.uint8)
+    img_path = str(tmp_path / 'img.png')
+    Image.fromarray(pixels).save(img_path)
+    return img_path
+
+
+def test_assets_are_resolved_from_config(tmp_path):
+    manager = create_manager(tmp_path)
+    assert manager.resolve('markers', 'white').replace('\\', '/') == 'data/img/white-shade.png'
+    assert manager.resolve('assets', 'logo').replace('\\', '/') == 'data/img/logo.png'
+    with pytest.raises(KeyError):
+        manager.resolve('markers', 'missing')
+
+
+def test_images_are_decoded_once(tmp_path):
+    manager = create_manager(tmp_path)
+    img_path = create_image(tmp_path)
+    first = manager.image(img_path)
+    assert manager.image(img_path) is first
+    assert manager.size(img_path) == (60, 40)
+    assert (manager.hits, manager.misses) == (1, 1)
+
+
+def test_variants_are_evicted_least_recently_used(tmp_path):
+    manager = create_manager(tmp_path, max_variants = 2)
+    img_path = create_image(tmp_path)
+    small = manager.resized(img_path, (30, 20))
+    manager.resized(img_path, (15, 10))
+    assert manager.resized(img_path, (30, 20)) is small
+    manager.resized(img_path, (6, 4)) # Evicts the least recently used (15, 10).
+
+    assert manager.resized(img_path, (30, 20)) is small
+    assert manager.resized(img_path, (15, 10)).size == (15, 10)
+    assert (manager.hits, manager.misses) == (2, 4)
@@ -0,0 +1,49 @@
+# Python libraries
+from pathlib import Path
+# Internal modules
+from caching.GeometryCache import GeometryCache
+# External modules
+import numpy as np
+import shapefile
+
+
+def write_shapefile(directory: Path) -> None:
+    """Writes a square with a square hole and a small distant square."""
+    outer = [(0.0, 0.0), (0.0, 10.0), (5.0, 10.001), (10.0, 10.0), (10.0, 0.0), (0.0, 0.0)]
+    hole = [(2.0, 2.0), (8.0, 2.0), (8.0, 8.0), (2.0, 8.0), (2.0, 2.0)]
+    distant = [(50.0, 50.0), (50.0, 51.0), (51.0, 51.0), (51.0, 50.0), (50.0, 50.0)]
+    with shapefile.Writer(str(directory / 'square'), shapeType = shapefile.POLYGON) as writer:
+        writer.field('name', 'C')
+        writer.poly([outer, hole, distant])
+        writer.record('square')
+
+
+def signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * np.sum(x[:-1] * y[1:] - x[1:] * y[:-1])
+
+
+def test_rings_are_simplified_and_oriented(tmp_path):
+    write_shapefile(tmp_path)
+    cache = GeometryCache(str(tmp_path / 'cache'), str(tmp_path))
+    outer, hole, distant = cache.load('square.shp', 3)
+
+    assert len(outer) == 5 # The point 0.001 off the edge is simplified away.
+    assert signed_area(outer) > 0
+    assert signed_area(hole) < 0
+    assert isinstance(outer, np.memmap)
+
+
+def test_rings_outside_extent_are_skipped(tmp_path):
+    write_shapefile(tmp_path)
+    cache = GeometryCache(str(tmp_path / 'cache'), str(tmp_path))
+    rings = cache.load('square.shp', 3, [-1.0, 11.0, -1.0, 11.0])
+
+    assert len(rings) == 2
+    assert all(ring[:, 0].max() <= 10.0 for ring in rings)
+
+
+def test_detail_level_follows_resolution():
+    extent = [5.0, 15.0, 47.0, 55.0]
+    assert GeometryCache.detail_level(extent, 2000) == GeometryCache.detail_level(extent, 500) + 2
+    assert 2.0 ** -GeometryCache.detail_level(extent, 2000) <= 10 / 2000 / 2
@@ -0,0 +1,120 @@
+# Python libraries
+import io
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+# Internal modules
+from caching.HeraldryStore import HeraldryStore
+from heraldry_sources.HeraldryFetcher import HeraldryFetcher
+from heraldry_sources.HeraldrySource import HeraldrySource
+from heraldry_sources.WikidataSource import WikidataSource
+# External modules
+import pytest
+from PIL import Image
+# Typing
+from typing import Dict, List
+
+
+class StubWikidata(BaseHTTPRequestHandler):
+    """Answers SPARQL queries for the coats of Kiel and Dresden and serves their images."""
+
+    coats = {'Kiel': 'kiel.png', 'Dresden': 'dresden.png'}
+    queries: List[List[str]] = []
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        names = re.findall(r'"([^"]+)"@de', form['query'][0])
+        self.queries.append(names)
+        base_url = f'http://127.0.0.1:{self.server.server_port}/'
+        bindings = [
+            {'name': {'type': 'literal', 'value': name}, 'coat': {'type': 'uri', 'value': base_url + self.coats[name]}}
+            for name in names if name in self.coats
+        ]
+        self.__reply('application/sparql-results+json', json.dumps({'results': {'bindings': bindings}}).encode('utf-8'))
+
+
+    def do_GET(self):
+        coat = Image.new('RGB', (400, 480), (255, 255, 255))
+        coat.paste((200, 30, 30), (100, 120, 300, 360))
+        png = io.BytesIO()
+        coat.save(png, 'PNG')
+        self.__reply('image/png', png.getvalue())
+
+
+    def __reply(self, content_type: str, body: bytes):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, *args):
+        pass
+
+
+class ListSource(HeraldrySource):
+    def __init__(self, urls: Dict[str, str]):
+        self.urls = urls
+        self.asked: List[str] = []
+
+    def find_urls(self, town_names: List[str]) -> Dict[str, str]:
+        self.asked += town_names
+        return {name.lower(): self.urls[name] for name in town_names if name in self.urls}
+
+
+@pytest.fixture
+def stub_url():
+    StubWikidata.queries = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWikidata)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_towns_are_resolved_in_one_query(stub_url):
+    source = WikidataSource(endpoint = stub_url + 'sparql')
+    urls = source.find_urls(['Kiel', 'Dresden', 'Nirgendwo'])
+    assert urls == {'kiel': stub_url + 'kiel.png', 'dresden': stub_url + 'dresden.png'}
+    assert StubWikidata.queries == [['Kiel', 'Dresden', 'Nirgendwo']]
+
+
+def test_fetcher_falls_back_to_next_source(stub_url, tmp_path):
+    store = HeraldryStore(str(tmp_path / 'heraldry.sqlite'), import_dir = None, canonical_width = 50)
+    fallback = ListSource({'Emden': stub_url + 'emden.png'})
+    fetcher = HeraldryFetcher(store, [WikidataSource(endpoint = stub_url + 'sparql', batch_size = 2), fallback])
+
+    errors = fetcher.fetch(['Kiel', 'Dresden', 'Emden', 'Nirgendwo'])
+    assert list(errors) == ['nirgendwo']
+    assert isinstance(errors['nirgendwo'], LookupError)
+    assert StubWikidata.queries == [['Kiel', 'Dresden'], ['Emden', 'Nirgendwo']]
+    assert fallback.asked == ['Emden', 'Nirgendwo']
+    assert store.get('emden').size == (50, 60)
+
+    # Stored and missing towns are not asked for again.
+    assert list(fetcher.fetch(['Kiel', 'Nirgendwo'])) == ['nirgendwo']
+    assert len(StubWikidata.queries) == 2
+
+
+def test_thumbnail_width_is_replaced():
+    thumb_url = 'https://upload.wikimedia.org/wikipedia/commons/thumb/4/4f/DEU_Kiel_COA.svg/60px-DEU_Kiel_COA.svg.png'
+    assert HeraldryFetcher.thumbnail_url(thumb_url, 440) == (
+        'https://upload.wikimedia.org/wikipedia/commons/thumb/4/4f/DEU_Kiel_COA.svg/440px-DEU_Kiel_COA.svg.png'
+    )
+    file_url = 'http://commons.wikimedia.org/wiki/Special:FilePath/DEU%20Kiel%20COA.svg'
+    assert HeraldryFetcher.thumbnail_url(file_url, 440) == file_url + '?width=440'
+
+
+def test_originals_are_turned_into_thumbnails():
+    svg_url = 'https://upload.wikimedia.org/wikipedia/commons/4/4f/DEU_Kiel_COA.svg'
+    assert HeraldryFetcher.thumbnail_url(svg_url, 440) == (
+        'https://upload.wikimedia.org/wikipedia/commons/thumb/4/4f/DEU_Kiel_COA.svg/440px-DEU_Kiel_COA.svg.png'
+    )
+    jpeg_url = 'https://upload.wikimedia.org/wikipedia/de/a/b3/Wappen_Emden.jpg'
+    assert HeraldryFetcher.thumbnail_url(jpeg_url, 440) == (
+        'https://upload.wikimedia.org/wikipedia/de/thumb/a/b3/Wappen_Emden.jpg/440px-Wappen_Emden.jpg'
+    )
+    assert HeraldryFetcher.thumbnail_url('https://example.org/wappen.png', 440) == 'https://example.org/wappen.png'
@@ -0,0 +1,93 @@
+# Python libraries
+import sqlite3
+# Internal modules
+from caching.HeraldryStore import HeraldryStore
+# External modules
+import numpy as np
+import pytest
+from PIL import Image
+# Typing
+from typing import Tuple
+
+
+def create_coat(mode: str = 'RGBA') -> Image.Image:
+    pixels = np.random.default_rng(0).integers(0, 256, (30, 20, 4), dtype = np.uint8)
+    return Image.fromarray(pixels, 'RGBA').convert(mode)
+
+
+def test_coats_are_stored_losslessly(tmp_path):
+    store = HeraldryStore(str(tmp_path / 'heraldry.sqlite'), import_dir = None)
+    for mode in ['RGBA', 'RGB', 'LA']:
+        coat = create_coat(mode)
+        store.put(f'Kiel {mode}', coat)
+        loaded = store.get(f'kiel {mode.lower()}')
+        assert loaded.mode == mode
+        assert np.array_equal(np.asarray(loaded), np.asarray(coat))
+
+
+def test_missing_coat_raises_lookup_error(tmp_path):
+    store = HeraldryStore(str(tmp_path / 'heraldry.sqlite'), import_dir = None)
+    assert 'kiel' not in store
+    assert store.fingerprint('kiel') == 'kiel:missing'
+    with pytest.raises(LookupError):
+        store.get('kiel')
+
+
+def test_new_store_imports_directory(tmp_path):
+    pin_cache = tmp_path / 'pin-cache'
+    pin_cache.mkdir()
+    create_coat().save(pin_cache / 'kiel-pin.png')
+    create_coat('RGB').save(pin_cache / 'bad muskau-pin.png')
+
+    store = HeraldryStore(str(tmp_path / 'heraldry.sqlite'), import_dir = str(pin_cache))
+    assert len(store) == 2
+    assert 'Bad Muskau' in store
+    assert np.array_equal(np.asarray(store.get('kiel')), np.asarray(store.normalization(create_coat())))
+
+
+def test_inserts_of_other_stores_are_visible(tmp_path):
+    path = str(tmp_path / 'heraldry.sqlite')
+    first_store = HeraldryStore(path, import_dir = None)
+    second_store = HeraldryStore(path, import_dir = None)
+    second_store.put('kiel', create_coat())
+
+    fingerprint = second_store.fingerprint('kiel')
+    assert first_store.get('kiel').size == (20, 30)
+    assert first_store.fingerprint('kiel') == fingerprint
+
+
+def create_bordered_coat(size: Tuple[int, int]) -> Image.Image:
+    coat = Image.new('RGB', size, (255, 255, 255))
+    width, height = size
+    coat.paste((200, 30, 30), (width // 4, height // 4, width - width // 4, height - height // 4))
+    return coat
+
+
+def test_ingested_coats_are_normalized(tmp_path):
+    store = HeraldryStore(str(tmp_path / 'heraldry.sqlite'), import_dir = None, canonical_width = 50)
+    store.ingest('kiel', create_bordered_coat((400, 480)))
+    store.ingest('emden', create_bordered_coat((40, 48)))
+
+    large_coat = store.get('kiel')
+    assert large_coat.mode == 'RGBA'
+    assert large_coat.size == (50, 60)
+    assert large_coat.getpixel((25, 30)) == (200, 30, 30, 255)
+    assert store.get('emden').size == (20, 24)
+
+
+def test_stored_coats_are_migrated(tmp_path):
+    path = str(tmp_path / 'heraldry.sqlite')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE coats (name TEXT PRIMARY KEY, mode TEXT, width INTEGER, height INTEGER, digest TEXT, pixels BLOB)'
+    )
+    connection.commit()
+    connection.close()
+
+    store = HeraldryStore(path, import_dir = None, canonical_width = 50)
+    store.put('kiel', create_bordered_coat((400, 480)))
+    fingerprint = store.fingerprint('kiel')
+    assert store.migrate() == 1
+    assert store.migrate() == 0
+    assert store.get('kiel').size == (50, 60)
+    assert store.fingerprint('kiel') != fingerprint
@@ -0,0 +1,68 @@
+# Python libraries
+import os
+from time import sleep
+# Internal modules
+from pipeline.JobQueue import JobQueue
+import render_queue
+# External modules
+from PIL import Image
+
+
+def test_jobs_are_claimed_once_in_order(tmp_path):
+    queue = JobQueue(str(tmp_path))
+    first_name = queue.enqueue(['-c', 'de', '--heading', 'First'])
+    second_name = queue.enqueue(['-c', 'de', '--heading', 'Second'])
+
+    first_job, second_job = JobQueue(str(tmp_path)).claim(), queue.claim()
+    assert (first_job['name'], second_job['name']) == (first_name, second_name)
+    assert first_job['args'] == ['-c', 'de', '--heading', 'First']
+    assert queue.claim() is None
+
+    queue.complete(first_job, 'poster.png')
+    assert queue.counts() == {'pending': 0, 'leased': 1, 'done': 1, 'failed': 0}
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    queue = JobQueue(str(tmp_path), lease_seconds = 60)
+    name = queue.enqueue(['-c', 'de'])
+    job = queue.claim()
+    assert queue.renew(job)
+
+    # The worker crashed a while ago.
+    os.utime(tmp_path / 'leased' / name, (1, 1))
+    requeued_job = queue.claim()
+    assert requeued_job['name'] == name
+    assert requeued_job['attempts'] == 1
+
+
+def test_failing_job_ends_in_failed(tmp_path):
+    queue = JobQueue(str(tmp_path), max_attempts = 2)
+    queue.enqueue(['-c', 'xx'])
+    queue.fail(queue.claim(), 'Country xx does not exist.')
+    queue.fail(queue.claim(), 'Country xx does not exist.')
+
+    assert queue.claim() is None
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1}
+
+
+def test_next_job_starts_while_previous_is_encoded(tmp_path, monkeypatch):
+    events = []
+
+    class SlowWriter:
+        def write(self, img, path):
+            sleep(0.3)
+            events.append(('written', path))
+
+    def start_job(job, output_dir, encoder):
+        events.append(('started', job['args'][0]))
+        encoder.submit(SlowWriter(), Image.new('RGB', (1, 1)), job['args'][0])
+        return job['args'][0], encoder.after([job['args'][0]], lambda: None)
+
+    monkeypatch.setattr(render_queue, 'start_job', start_job)
+    queue = JobQueue(str(tmp_path))
+    queue.enqueue(['first.png'])
+    queue.enqueue(['second.png'])
+    render_queue.work(queue, None, 0, once = True)
+
+    assert events.index(('started', 'second.png')) < events.index(('written', 'first.png'))
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 2, 'failed': 0}
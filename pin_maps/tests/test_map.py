@@ -0,0 +1,12 @@
+# Internal modules
+from draw.Map import Map
+
+
+def test_size_follows_extent_and_aspect_ratio():
+    germany = Map('de-neg.shp', 'old-topo.png', [5.65, 15.29, 47.227, 55.535], [5.82, 15.12, 47.19, 55.31])
+    assert germany.size == (1460, 1875)
+
+
+def test_size_is_scaled():
+    germany = Map('de-neg.shp', 'old-topo.png', [0.0, 10.0, 0.0, 5.0], [0.0, 10.0, 0.0, 5.0], 2.0, 1000, scale = 0.25)
+    assert germany.size == (250, 250)
@@ -0,0 +1,35 @@
+# Internal modules
+from draw.MaskRasterizer import MaskRasterizer
+# External modules
+import numpy as np
+from PIL import Image
+
+
+def test_holes_stay_empty():
+    outer = np.array([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)])
+    hole = np.array([(2.0, 2.0), (2.0, 8.0), (8.0, 8.0), (8.0, 2.0), (2.0, 2.0)])
+    mask = MaskRasterizer.rasterize([outer, hole], [0.0, 10.0, 0.0, 10.0], (100, 100))
+
+    assert mask[5, 5] == 255 # Inside the outer ring
+    assert mask[50, 50] == 0 # Inside the hole
+    assert mask[50, 10] == 255
+    assert 0.6 < np.mean(mask == 255) < 0.7 # 100 - 36 of 100 square degrees
+
+
+def test_latitude_grows_upwards():
+    lower_half = np.array([(0.0, 0.0), (10.0, 0.0), (10.0, 5.0), (0.0, 5.0), (0.0, 0.0)])
+    mask = MaskRasterizer.rasterize([lower_half], [0.0, 10.0, 0.0, 10.0], (10, 10))
+
+    assert np.all(mask[:4] == 0)
+    assert np.all(mask[6:] == 255)
+
+
+def test_mask_covers_image_in_white():
+    img = Image.new('RGBA', (4, 3), (10, 20, 30, 255))
+    mask = np.array([[255, 0], [128, 0]], dtype = np.uint8)
+    MaskRasterizer.apply(img, mask, (1, 1, 3, 3))
+
+    assert img.getpixel((1, 1)) == (255, 255, 255, 255)
+    assert img.getpixel((2, 1)) == (10, 20, 30, 255)
+    assert 120 < img.getpixel((1, 2))[0] < 140
+    assert img.getpixel((0, 0)) == (10, 20, 30, 255)
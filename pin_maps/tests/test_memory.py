@@ -0,0 +1,69 @@
+# Python libraries
+import os
+from time import sleep
+# Internal modules
+from pipeline.MemoryBudget import MemoryBudget
+from pipeline.MemoryTracker import MemoryTracker
+from pipeline.StageGraph import StageGraph
+# External modules
+import pytest
+
+
+def create_budget(budget_mb: float, superscale_factor: int = 4) -> MemoryBudget:
+    return MemoryBudget(budget_mb, (1460, 1875), 930, 150, superscale_factor, 'not-existing.png')
+
+
+def test_no_budget_no_strategies():
+    budget = create_budget(None)
+    assert budget.strategies == []
+
+
+def test_strategies_reduce_projection():
+    budget = create_budget(1)
+    assert budget.strategies == MemoryBudget.available_strategies
+    assert budget.project(budget.strategies) < budget.project([])
+
+
+def test_generous_budget_no_strategies():
+    budget = create_budget(10 ** 6)
+    assert budget.strategies == []
+
+
+def test_native_composition_upscales_only_the_map():
+    whole = create_budget(None)
+    native = MemoryBudget(
+        None, (1460, 1875), 930 * 4, 150 * 4, 4, 'not-existing.png', native_composition = True
+    )
+    assert native.framed_size == (whole.framed_size[0] * 4, whole.framed_size[1] * 4)
+    assert native.project([]) < whole.project([])
+
+
+def test_tracker_records_stages():
+    # Raises the peak of the process before the stage, which the stage must not report.
+    spike = bytearray(b'\x01') * (50 * 2 ** 20)
+    del spike
+    tracker = MemoryTracker()
+    with tracker.stage('allocation'):
+        data = bytearray(b'\x01') * (10 * 2 ** 20)
+
+    name, start, peak, kind = tracker.stages[0]
+    assert name == 'allocation'
+    assert peak - start >= 0.9 * len(data)
+    if kind != 'cumulative':
+        assert peak - start < 2 * len(data)
+    assert 'allocation' in tracker.report()
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason = 'The RSS is sampled on Linux only.')
+def test_stage_graph_records_overlapping_stages():
+    tracker = MemoryTracker()
+    graph = StageGraph(max_workers = 2)
+    graph.add('allocation', lambda: len(bytearray(10 * 2 ** 20)))
+    graph.add('sleep', lambda: sleep(0.1))
+    graph.run(tracker)
+
+    stages = {name: (start, peak, kind) for name, start, peak, kind in tracker.stages}
+    assert set(stages) == {'allocation', 'sleep', 'stage-graph'}
+    assert stages['sleep'][2] == 'overlapping'
+    assert stages['allocation'][1] >= stages['allocation'][0]
+    assert 'their peaks include each other' in tracker.report()
@@ -0,0 +1,52 @@
+# Python libraries
+import time
+# Internal modules
+from caching.NegativeCache import NegativeCache
+from input_parser.Coordinates import Coordinates
+# External modules
+import pytest
+
+
+def test_failures_are_remembered_per_kind(tmp_path):
+    cache = NegativeCache(str(tmp_path / 'failures.csv'))
+    assert cache.lookup('heraldry', 'kiel') is None
+    cache.record('heraldry', 'Kiel', 'No image, "wappen" missing.')
+
+    reason, failed_at = cache.lookup('heraldry', 'KIEL')
+    assert reason == 'No image, "wappen" missing.'
+    assert failed_at <= time.time()
+    assert cache.lookup('coordinates', 'kiel') is None
+
+
+def test_failures_expire(tmp_path):
+    path = tmp_path / 'failures.csv'
+    path.write_text(f'heraldry,kiel,Old failure.,{time.time() - 7200}\nheraldry,emden,Recent failure.,{time.time()}\n')
+
+    cache = NegativeCache(str(path), ttl_seconds = 3600)
+    assert cache.lookup('heraldry', 'kiel') is None
+    assert cache.lookup('heraldry', 'emden')[0] == 'Recent failure.'
+    assert NegativeCache(str(path), ttl_seconds = 0).lookup('heraldry', 'emden') is None
+
+
+def test_file_is_read_once_and_compacted(tmp_path):
+    path = tmp_path / 'failures.csv'
+    old_rows = ''.join(f'heraldry,town {i},Old failure.,{time.time() - 7200}\n' for i in range(10))
+    path.write_text(old_rows + f'heraldry,emden,Recent failure.,{time.time()}\n')
+
+    cache = NegativeCache(str(path), ttl_seconds = 3600)
+    assert cache.lookup('heraldry', 'emden')[0] == 'Recent failure.'
+    assert path.read_text().splitlines()[0].startswith('heraldry,emden,Recent failure.,')
+    assert len(path.read_text().splitlines()) == 1
+
+    # Later lookups do not read the file again, but see own failures.
+    path.unlink()
+    cache.record('heraldry', 'Kiel', 'No image.')
+    assert cache.lookup('heraldry', 'emden')[0] == 'Recent failure.'
+    assert cache.lookup('heraldry', 'kiel')[0] == 'No image.'
+
+
+def test_known_unresolvable_location_fails_without_request(tmp_path):
+    cache = NegativeCache(str(tmp_path / 'failures.csv'))
+    cache.record('coordinates', 'Nirgendwo Xyzzy', 'Nominatim found no location.')
+    with pytest.raises(NameError):
+        Coordinates('Nirgendwo Xyzzy', cache)
@@ -0,0 +1,140 @@
+# Python libraries
+import os
+import threading
+import zlib
+# External modules
+from PIL import Image, ImageFont
+import numpy as np
+import pytest
+# Internal modules
+from draw.VectorPoster import VectorPoster
+from output_writers.BackgroundEncoder import BackgroundEncoder
+from output_writers.DerivativeWriter import DerivativeWriter
+from output_writers.JpegWriter import JpegWriter
+from output_writers.ParallelDeflate import ParallelDeflate
+from output_writers.PdfWriter import PdfWriter
+from output_writers.PngWriter import PngWriter
+from output_writers.StreamingPngWriter import StreamingPngWriter
+from output_writers.StreamingTiffWriter import StreamingTiffWriter
+from output_writers.SvgWriter import SvgWriter
+from output_writers.TiffWriter import TiffWriter
+from output_writers.WebpWriter import WebpWriter
+
+
+def create_bands(img: Image.Image, band_height: int):
+    for band_start in range(0, img.height, band_height):
+        yield img.crop((0, band_start, img.width, min(band_start + band_height, img.height)))
+
+
+@pytest.mark.parametrize('writer, file_name', [
+    (StreamingPngWriter(), 'streamed.png'),
+    (StreamingTiffWriter(tile_size = 64), 'streamed.tif')
+])
+@pytest.mark.parametrize('mode, channels', [('RGB', 3), ('RGBA', 4)])
+def test_streamed_roundtrip(tmp_path, writer, file_name, mode, channels):
+    img_arr = np.random.randint(0, 256, (150, 170, channels), dtype = np.uint8)
+    img = Image.fromarray(img_arr, mode)
+    path = os.path.join(tmp_path, file_name)
+    writer.write(create_bands(img, 40), img.size, path, mode)
+
+    written = Image.open(path)
+    assert written.mode == mode
+    assert (np.array(written) == img_arr).all()
+
+
+def test_no_file_on_wrong_band_size(tmp_path):
+    img = Image.new('RGB', (100, 100))
+    path = os.path.join(tmp_path, 'broken.png')
+    with pytest.raises(ValueError):
+        StreamingPngWriter().write(create_bands(img, 30), (100, 120), path)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_parallel_deflate_is_valid_zlib():
+    data = np.random.randint(0, 4, 3 * 2 ** 20, dtype = np.uint8).tobytes()
+    compressor = ParallelDeflate(threads = 4, chunk_size = 2 ** 18)
+    compressed = compressor.compress(data[:2 ** 20]) + compressor.compress(data[2 ** 20:]) + compressor.flush()
+    assert zlib.decompress(compressed) == data
+    assert len(compressed) < len(data)
+
+
+def test_compressors_share_one_pool():
+    data = os.urandom(2 ** 20)
+    threads_before = threading.active_count()
+    compressors = [ParallelDeflate(chunk_size = 2 ** 14) for _ in range(3)]
+    partial_outputs = [compressor.compress(data) for compressor in compressors]
+    # Separate pools would start a thread per CPU each.
+    assert threading.active_count() <= threads_before + (os.cpu_count() or 1)
+
+    for compressor, partial_output in zip(compressors, partial_outputs):
+        assert zlib.decompress(partial_output + compressor.flush()) == data
+    # Flushing leaves the shared pool to later compressors.
+    later = ParallelDeflate()
+    assert zlib.decompress(later.compress(data) + later.flush()) == data
+
+
+@pytest.mark.parametrize('writer, lossless', [
+    (PngWriter(compress_level = 1, threads = 2), True),
+    (TiffWriter(), True),
+    (WebpWriter(effort = 0), True),
+    (JpegWriter(quality = 95), False)
+])
+def test_poster_writers(tmp_path, writer, lossless):
+    img = Image.fromarray(np.random.randint(0, 256, (120, 90, 3), dtype = np.uint8))
+    path = os.path.join(tmp_path, f'poster.{writer.extension}')
+    writer(img, path)
+
+    assert os.listdir(tmp_path) == [f'poster.{writer.extension}']
+    written = Image.open(path)
+    assert written.size == img.size
+    if lossless:
+        assert (np.array(written.convert('RGB')) == np.array(img)).all()
+
+
+def create_vector_poster() -> VectorPoster:
+    poster = VectorPoster((400, 600))
+    poster.paste(Image.new('RGB', (300, 200), (0, 128, 255)), (50, 50))
+    font = ImageFont.truetype(os.path.join('data', 'fonts', 'lato-regular.ttf'), 40)
+    VectorPoster.drawing(poster).text((50, 300), 'Kiel', 'black', font)
+    VectorPoster.drawing(poster).line([(10, 10), (390, 10), (390, 590)], width = 3, fill = 'black')
+    return poster
+
+
+def test_pdf_embeds_font_and_image(tmp_path):
+    path = os.path.join(tmp_path, 'poster.pdf')
+    PdfWriter().write(create_vector_poster(), path)
+
+    with open(path, 'rb') as pdf_file:
+        content = pdf_file.read()
+    assert content.startswith(b'%PDF')
+    assert b'FontFile2' in content
+    assert b'/Width 300' in content
+
+
+def test_svg_keeps_text_as_paths(tmp_path):
+    path = os.path.join(tmp_path, 'poster.svg')
+    SvgWriter().write(create_vector_poster(), path)
+
+    with open(path, encoding = 'utf-8') as svg_file:
+        content = svg_file.read()
+    assert content.count('<image') == 1
+    assert '<path' in content
+    assert '<text' not in content
+
+
+def test_vector_poster_needs_truetype_font():
+    with pytest.raises(ValueError):
+        VectorPoster((10, 10)).text((0, 0), 'Kiel', 'black', ImageFont.load_default())
+
+
+def test_derivatives_are_written_next_to_poster(tmp_path):
+    img = Image.fromarray(np.random.randint(0, 256, (600, 400, 3), dtype = np.uint8), 'RGB')
+    derivative_writer = DerivativeWriter([(50, WebpWriter()), (300, JpegWriter(80)), (120, PngWriter())])
+    assert [derivative.size for derivative, _ in derivative_writer.downscale(img)] == [(300, 450), (120, 180), (50, 75)]
+
+    encoder = BackgroundEncoder(max_jobs = 3)
+    paths = derivative_writer.submit(encoder, img, os.path.join(tmp_path, 'poster.png'))
+    encoder.shutdown()
+    assert [os.path.basename(path) for path in paths] == ['poster-300.jpg', 'poster-120.png', 'poster-50.webp']
+    assert Image.open(paths[1]).size == (120, 180)
@@ -0,0 +1,39 @@
+# Python libraries
+import os
+# Internal modules
+from caching.PosterCache import PosterCache
+
+
+def write_poster(path, size: int = 100) -> str:
+    path.write_bytes(bytes(range(256)) * size)
+    return str(path)
+
+
+def test_stored_poster_is_copied(tmp_path):
+    cache = PosterCache(str(tmp_path / 'cache'))
+    key = PosterCache.key({'heading': 'Heading', 'towns': ['Kiel']})
+    assert key == PosterCache.key({'towns': ['Kiel'], 'heading': 'Heading'})
+    assert not cache.load(key, str(tmp_path / 'copy.png'))
+
+    cache.store(key, write_poster(tmp_path / 'poster.png'))
+    assert cache.load(key, str(tmp_path / 'copy.png'))
+    assert (tmp_path / 'copy.png').read_bytes() == (tmp_path / 'poster.png').read_bytes()
+    # The copy replaced its partial file.
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'copy.png', 'poster.png']
+
+
+def test_refresh_ignores_cached_posters(tmp_path):
+    PosterCache(str(tmp_path / 'cache')).store('key', write_poster(tmp_path / 'poster.png'))
+    cache = PosterCache(str(tmp_path / 'cache'), refresh = True)
+    assert not cache.load('key', str(tmp_path / 'copy.png'))
+
+
+def test_least_recently_used_posters_are_evicted(tmp_path):
+    cache = PosterCache(str(tmp_path / 'cache'), max_mb = 1)
+    cache.store('first', write_poster(tmp_path / 'poster.png', 1024)) # 256 kB each
+    os.utime(tmp_path / 'cache' / 'first.png', (1, 1))
+    for key in ['second', 'third', 'fourth', 'fifth']:
+        cache.store(key, write_poster(tmp_path / 'poster.png', 1024))
+
+    assert not cache.load('first', str(tmp_path / 'copy.png'))
+    assert cache.load('fifth', str(tmp_path / 'copy.png'))
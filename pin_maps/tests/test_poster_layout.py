@@ -0,0 +1,74 @@
+# Internal modules
+from complete_image_transforms.Frame import Frame
+from input_parser.ParamsParser import ParamsParser
+from pin_maps import get_heading_font, prepare_body, render_body, render_heading
+from pipeline.PosterLayout import PosterLayout
+# External modules
+import numpy as np
+from PIL import Image
+import pytest
+# Typing
+from typing import Tuple
+
+
+def test_content_is_centered_in_frame():
+    layout = PosterLayout((1460, 1875), 930, 150)
+    assert layout.size == (1970, 2955)
+    assert layout.content_box == (255, 75, 1715, 2880)
+    assert layout.map_box == (255, 75, 1715, 1950)
+
+
+def test_canvas_is_allocated_with_frame():
+    layout = PosterLayout((100, 80), 40, 30)
+    poster = Frame(30, True, 1)(layout.canvas())
+    assert poster.size == layout.size
+    assert poster.getpixel((0, 0)) == (255, 255, 255, 255)
+    assert poster.getpixel((15, 15))[:3] == (0, 0, 0)
+
+
+def test_too_wide_map_raises_value_error():
+    with pytest.raises(ValueError):
+        PosterLayout((1000, 100), 0, 0)
+
+
+def compose_text(native: bool) -> Tuple[np.ndarray, int]:
+    """Writes heading, body and coats below a blank map, scaled back to the plain layout."""
+    args = [
+        '-c', 'de', '--heading', 'Unsere Reise', '-b', 'Von Berlin nach Garmisch und Bortfeld',
+        '-t', 'Berlin, Garmisch, Bortfeld'
+    ]
+    params = ParamsParser(args + ['--superscale', '--native-composition'] if native else args)
+    factor = params.superscale_factor if native else 1
+    layout = PosterLayout((1460 * factor, 1875 * factor), params.height_text_space, params.added_frame_px)
+    main_text_font, _ = prepare_body(params, [])
+    # Coats fitting the plain lines but narrower than the lines of a native composition.
+    coats = {town_name: Image.new('RGBA', (88, 104), (200, 0, 0, 255)) for town_name in ['berlin', 'garmisch', 'bortfeld']}
+
+    img, data = render_heading(params, layout, get_heading_font(params, layout), layout.canvas('RGB'), {})
+    img, _ = render_body(params, layout, main_text_font, coats, img, data)
+    return np.asarray(img.reduce(factor)), round(layout.content_box[1] / factor + data['end_y_heading'] / factor)
+
+
+def bbox(mask: np.ndarray) -> Tuple[int, int, int, int]:
+    rows, columns = np.nonzero(mask)
+    return columns.min(), rows.min(), columns.max(), rows.max()
+
+
+def text_boxes(img_arr: np.ndarray, end_y_heading: int) -> list:
+    """Returns the boxes of the heading, the body text and the coats."""
+    dark = img_arr.max(axis = 2) < 128
+    heading, body = dark.copy(), dark.copy()
+    heading[end_y_heading:] = False
+    body[:end_y_heading] = False
+    coats = (img_arr[..., 0] > 128) & (img_arr[..., 1] < 64)
+    return [bbox(heading), bbox(body), bbox(coats)]
+
+
+def test_native_composition_matches_plain_layout():
+    plain, plain_end_y_heading = compose_text(False)
+    native, native_end_y_heading = compose_text(True)
+    assert plain.shape == native.shape
+
+    # Glyph hinting differs between font sizes, so the boxes may be a few px apart.
+    for plain_box, native_box in zip(text_boxes(plain, plain_end_y_heading), text_boxes(native, native_end_y_heading)):
+        assert np.abs(np.subtract(plain_box, native_box)).max() <= 6
@@ -0,0 +1,29 @@
+# Internal modules
+from pipeline.PrefetchProgress import PrefetchProgress
+
+
+def test_progress_is_resumed(tmp_path):
+    path = str(tmp_path / 'progress.jsonl')
+    progress = PrefetchProgress(path)
+    progress.record('Kiel')
+    progress.record('Nirgendwo', 'No coordinates found.')
+    with open(path, 'a', encoding = 'utf-8') as progress_file:
+        progress_file.write('{"town": "dres') # Interrupted while writing.
+
+    resumed = PrefetchProgress(path)
+    assert 'kiel' in resumed and 'Nirgendwo' in resumed
+    assert 'Dresden' not in resumed
+    assert resumed.failed == {'nirgendwo': 'No coordinates found.'}
+
+    resumed.record('Dresden')
+    assert 'dresden' in PrefetchProgress(path)
+
+
+def test_later_success_replaces_failure(tmp_path):
+    path = str(tmp_path / 'progress.jsonl')
+    PrefetchProgress(path).record('Kiel', 'No coat of arms found.')
+    PrefetchProgress(path).record('Kiel')
+
+    resumed = PrefetchProgress(path)
+    assert resumed.done == {'kiel'}
+    assert resumed.failed == {}
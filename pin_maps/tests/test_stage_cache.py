@@ -0,0 +1,57 @@
+# Internal modules
+from caching.StageCache import StageCache
+# External modules
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+def test_stored_result_is_loaded(tmp_path):
+    cache = StageCache(str(tmp_path))
+    img = Image.fromarray(np.arange(4 * 5 * 4, dtype = np.uint8).reshape(4, 5, 4), 'RGBA')
+    key = cache.key('heading', ['Heading', 3])
+    cache.store(key, img, {'end_y_heading': 42})
+
+    loaded_img, data = cache.load(key)
+    assert loaded_img.mode == 'RGBA'
+    assert np.array_equal(np.asarray(loaded_img), np.asarray(img))
+    assert data == {'end_y_heading': 42}
+
+
+def test_changing_loaded_image_keeps_cached_result(tmp_path):
+    cache = StageCache(str(tmp_path))
+    key = cache.key('map', [])
+    cache.store(key, Image.new('RGB', (8, 8)))
+
+    loaded_img, _ = cache.load(key)
+    ImageDraw.Draw(loaded_img).rectangle((0, 0, 7, 7), fill = (255, 0, 0))
+    loaded_img.paste((0, 255, 0), (0, 0, 4, 4))
+    assert loaded_img.getpixel((0, 0)) == (0, 255, 0)
+    assert np.asarray(cache.load(key)[0]).max() == 0
+
+
+def test_changed_inputs_change_key(tmp_path):
+    cache = StageCache(str(tmp_path))
+    assert cache.key('body', ['a']) == cache.key('body', ['a'])
+    assert cache.key('body', ['a']) != cache.key('body', ['b'])
+    assert cache.key('body', ['a']) != StageCache(str(tmp_path), version = 'new').key('body', ['a'])
+
+
+def test_missing_and_refreshed_results_are_not_loaded(tmp_path):
+    cache = StageCache(str(tmp_path))
+    key = cache.key('map', [])
+    assert cache.load(key) is None
+
+    cache.store(key, None, {'value': 1})
+    assert cache.load(key) == (None, {'value': 1})
+    assert StageCache(str(tmp_path), refresh = True).load(key) is None
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = StageCache(str(tmp_path), max_mb = 1)
+    img = Image.new('RGB', (512, 512))
+    first_key, second_key = cache.key('map', [1]), cache.key('map', [2])
+    cache.store(first_key, img)
+    cache.store(second_key, img)
+
+    assert cache.load(first_key) is None
+    assert cache.load(second_key) is not None
@@ -0,0 +1,58 @@
+# Python libraries
+import threading
+from time import sleep
+# Internal modules
+from pipeline.StageGraph import StageGraph
+# External modules
+import pytest
+
+
+def test_stages_receive_results_of_dependencies():
+    graph = StageGraph(max_workers = 2)
+    graph.add('a', lambda: 2)
+    graph.add('b', lambda: 3)
+    graph.add('product', lambda a, b: a * b, ['a', 'b'])
+    graph.add('sum', lambda product, a: product + a, ['product', 'a'])
+
+    assert graph.run() == {'a': 2, 'b': 3, 'product': 6, 'sum': 8}
+
+
+def test_main_thread_stage_overlaps_pool_stages():
+    graph = StageGraph(max_workers = 2)
+    graph.add('slow', lambda: sleep(0.2))
+    graph.add('main', threading.get_ident, main_thread = True)
+    graph.add('after-main', lambda ident: ident, ['main'])
+    results = graph.run()
+
+    assert results['main'] == threading.get_ident()
+    assert graph.timings['main'][0] < graph.timings['slow'][1]
+
+
+def test_critical_path_follows_latest_dependency():
+    graph = StageGraph(max_workers = 2)
+    graph.add('fast', lambda: None)
+    graph.add('slow', lambda: sleep(0.2))
+    graph.add('last', lambda fast, slow: None, ['fast', 'slow'])
+    graph.run()
+
+    assert graph.critical_path() == ['slow', 'last']
+    assert 'critical path: slow > last' in graph.report()
+
+
+def test_failing_stage_raises():
+    graph = StageGraph(max_workers = 2)
+    graph.add('broken', lambda: 1 / 0)
+    graph.add('after', lambda broken: broken, ['broken'])
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+
+
+def test_unknown_dependency_raises_value_error():
+    graph = StageGraph()
+    graph.add('a', lambda: None)
+
+    with pytest.raises(ValueError):
+        graph.add('b', lambda missing: None, ['missing'])
+    with pytest.raises(ValueError):
+        graph.add('a', lambda: None)
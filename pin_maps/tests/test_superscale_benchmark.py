@@ -0,0 +1,36 @@
+# Python libraries
+import json
+# Internal modules
+from complete_image_transforms.Superscale import Superscale
+from pipeline.SuperscaleBenchmark import SuperscaleBenchmark
+# External modules
+import numpy as np
+from PIL import Image
+
+
+def write_throughputs(path, host: str) -> str:
+    throughputs = {'lapsrn': 0.1, 'fsrcnn': 1.0, 'espcn': 2.0, 'lanczos': 10.0}
+    path.write_text(json.dumps({f'{host}:x4': throughputs}))
+    return str(path)
+
+
+def test_best_model_within_budget_is_selected(tmp_path):
+    benchmark = SuperscaleBenchmark(str(tmp_path / 'benchmark.json'))
+    write_throughputs(tmp_path / 'benchmark.json', benchmark.host)
+
+    assert benchmark.select((1000, 1000), 20) == ('lapsrn', 10)
+    assert benchmark.select((1000, 1000), 1) == ('fsrcnn', 1)
+    assert benchmark.select((2000, 1000), 1) == ('espcn', 1)
+    assert benchmark.select((10000, 1000), 0.1) == ('lanczos', 1)
+
+
+def test_lanczos_fallback_upscales_in_bands():
+    # A gradient with noise, on which a seam between the bands would change pixels.
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 160, 30)[:, None, None] + np.zeros((30, 20, 3))
+    img = Image.fromarray((gradient + rng.integers(0, 96, (30, 20, 3))).astype('uint8'), 'RGB')
+    whole = Superscale(model_name = 'lanczos')(img)
+    banded = Superscale(model_name = 'lanczos', band_height = 8)(img)
+
+    assert whole.size == banded.size == (80, 120)
+    assert np.array_equal(np.asarray(whole), np.asarray(banded))
@@ -0,0 +1,40 @@
+# Internal modules
+from caching.WallpaperPyramid import WallpaperPyramid
+# External modules
+import numpy as np
+from PIL import Image
+
+
+def create_wallpaper(tmp_path) -> str:
+    pixels = np.random.default_rng(0).integers(0, 256, (300, 500, 3), dtype = np.uint8)
+    wallpaper_path = str(tmp_path / 'wallpaper.png')
+    Image.fromarray(pixels).save(wallpaper_path)
+    return wallpaper_path
+
+
+def test_full_resolution_window_matches_wallpaper(tmp_path):
+    wallpaper_path = create_wallpaper(tmp_path)
+    pyramid = WallpaperPyramid(str(tmp_path / 'pyramids'), tile_size = 64)
+    pixels, extent = pyramid.read(wallpaper_path, (0.0, 50.0, 0.0, 30.0), [10.0, 20.0, 5.0, 25.0], 10.0)
+
+    expected = np.asarray(Image.open(wallpaper_path))[50:250, 100:200]
+    assert np.array_equal(pixels, expected)
+    assert extent == (10.0, 20.0, 5.0, 25.0)
+
+
+def test_low_resolution_reads_smaller_level(tmp_path):
+    wallpaper_path = create_wallpaper(tmp_path)
+    pyramid = WallpaperPyramid(str(tmp_path / 'pyramids'), tile_size = 64)
+    pixels, extent = pyramid.read(wallpaper_path, (0.0, 50.0, 0.0, 30.0), [0.0, 50.0, 0.0, 30.0], 2.0)
+
+    assert pixels.shape == (75, 125, 3) # Level 2 has a quarter of the resolution.
+    assert extent == (0.0, 50.0, 0.0, 30.0)
+
+
+def test_extent_is_clipped_to_wallpaper(tmp_path):
+    wallpaper_path = create_wallpaper(tmp_path)
+    pyramid = WallpaperPyramid(str(tmp_path / 'pyramids'), tile_size = 64)
+    pixels, extent = pyramid.read(wallpaper_path, (0.0, 50.0, 0.0, 30.0), [-10.0, 5.0, 20.0, 40.0], 10.0)
+
+    assert pixels.shape == (100, 50, 3)
+    assert extent == (0.0, 5.0, 20.0, 30.0)